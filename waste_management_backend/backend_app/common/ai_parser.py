@@ -1,270 +1,240 @@
 import re
-import spacy
-import requests
-from spacy.matcher import Matcher
-from sentence_transformers import SentenceTransformer, util
 import os
 from dotenv import load_dotenv
 
+from backend_app.common.keyword_automaton import KeywordAutomaton
+from backend_app.common.lexicon import class_lexicon
+from backend_app.common.nlp_models import NLP_BATCH_SIZE, NLP_READY_TIMEOUT, NLP_SENTENCE_MODEL, NLP_WARMUP, models
+from backend_app.common.pagination import variables
+from backend_app.common.query_templates import ONTO_NS, iri_list
+from backend_app.common.vector_index import VECTOR_INDEX_MIN_SCORE, VECTOR_INDEX_TOP_K, VectorIndex
+from backend_app.common.vocabulary import class_hierarchy, dynamic_attributes
+
 load_dotenv()
 
-nlp = spacy.load("fr_core_news_sm")
-model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+# Closest class in the vector index when no keyword matches. Off by default: every uncached question
+# would then wait for the sentence model (add vector_index to NLP_WARMUP when enabling it)
+NLP_SEMANTIC_FALLBACK = os.environ.get("NLP_SEMANTIC_FALLBACK", "false").lower() == "true"
+# Subclasses listed in VALUES blocks from the cached class hierarchy instead of rdfs:subClassOf* paths
+NLP_SUBCLASS_VALUES = os.environ.get("NLP_SUBCLASS_VALUES", "true").lower() == "true"
 
-ontology_terms = ["nom", "codePostal", "adresse", "email", "ville", "username", "mdp", "created_at"]
-ontology_embeddings = model.encode(ontology_terms, convert_to_tensor=True)
 
+def get_dynamic_attributes():
+    # Last snapshot read from Fuseki (ontology_terms until the first refresh succeeds), never blocks
+    return dynamic_attributes.get()
 
-SPARQL_ENDPOINT = os.environ.get("SPARQL_ENDPOINT")
 
-def get_dynamic_attributes():
-    try:
-        query = """
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        SELECT DISTINCT ?attr WHERE { ?attr a rdf:Property. }
-        """
-        response = requests.post(SPARQL_ENDPOINT, data={"query": query},
-                                 headers={"Accept": "application/sparql-results+json"})
-        results = response.json()["results"]["bindings"]
-        return [r["attr"]["value"].split("#")[-1].lower() for r in results]
-    except:
-        return ontology_terms
-
-DYNAMIC_ATTRS = get_dynamic_attributes()
-
-
-CLASSES = [
-    "Producteur", "Producteur_Industriel", "Producteur_Agricole", "Producteur_Commercial",
-    "Producteur_Hospitalier", "Producteur_Residentiel",
-    "Dechet_Metal", "Dechet_Papier", "Dechets", "Dechets_Chimiques", "Dechets_Dangereux",
-    "Dechets_Electronique", "Dechets_Medicaux", "Dechets_Organique", "Dechets_Plastique",
-    "Dechets_Textile", "Dechets_Volumineux", "Dechets_verre",
-    "Superviseur", "Superviseur_Regional", "Superviseur_National", "Superviseur_Municipal",
-    "Superviseur_Environemenetal", "Superviseur_Securite", "Supervuseur_Qualite",
-    "Centre_traitement", "Centre_compostage", "Centre_tri", "Usine_recyclage",
-    "Centre_Compostage_Collectif", "Centre_Compostage_Individuel", "Centre_Compostage_Industriel",
-    "Centre_Tri_Automatise", "Centre_Tri_Densite", "Centre_Tri_Magnetique", "Centre_Tri_Manuel",
-    "Centre_Tri_Mixte", "Centre_Tri_Optique",
-    "Usine_Recyclage_Batteries", "Usine_Recyclage_Bois", "Usine_Recyclage_Electronique",
-    "Usine_Recyclage_Metal", "Usine_Recyclage_Plastique", "Usine_Recyclage_Textile", "Usine_Recyclage_Verre",
-    "Transporteur", "Transporteur_Camion-benne", "Transporteur_Camion-grue", "Transporteur_spécialisé",
-    "Collecteur", "Collecteur_Conteneur", "Collecteur_Municipal", "Collecteur_Prive",
-    "Centre_traitement", "Centre_compostage", "Centre_tri", 
-    "Centre_Compostage_Collectif", "Centre_Compostage_Individuel", "Centre_Compostage_Industriel",
-    "Centre_Tri_Automatise", "Centre_Tri_Densite", "Centre_Tri_Magnetique", "Centre_Tri_Manuel",
-    "Centre_Tri_Mixte", "Centre_Tri_Optique",
-    "Dechets_Organique", "Dechets_Plastique", "Dechets_Metal", "Dechets_Papier", "Dechets_Textile"
-]
+# Classes and keywords: ontology labels plus backend_app/common/class_lexicon.json, reloaded at runtime
+models.register("matcher", lambda: class_lexicon.get().matcher(models.get("spacy")))
 
-CLASS_KEYWORDS = {
-    "Producteur_Industriel": ["industriel", "usine", "industrie", "manufacture", "producteurs industriels", "producteur industriel", "usines"],
-    "Producteur_Agricole": ["ferme", "agricole", "agriculteur", "producteurs agricoles", "producteur agricole", "agriculteurs", "fermes"],
-    "Producteur_Commercial": ["commerce", "commercial", "magasin", "entreprise", "commerçant", "commerces"],
-    "Producteur_Hospitalier": ["hospitalier", "hôpital", "hopital", "clinique", "médical", "hôpitaux"],
-    "Producteur_Residentiel": ["résidentiel", "domicile", "ménage", "habitation", "résident", "ménages", "résidents"],
-    "Dechet_Metal": ["métal", "cuivre", "ferraille", "métallique", "déchets métalliques", "métaux"],
-    "Dechet_Papier": ["papier", "carton", "déchets papier", "papiers", "cartons"],
-    "Dechets_Organique": ["organique", "restes alimentaires", "déchets alimentaires", "biologique", "organiques"],
-    "Dechets_Plastique": ["plastique", "emballage plastique", "déchets plastiques", "plastiques"],
-    "Dechets_Textile": ["textile", "vêtement", "linge", "déchets textiles", "textiles", "vêtements"],
-    "Dechets_Chimiques": ["chimiques", "déchets chimiques", "produits chimiques"],
-    "Dechets_Electronique": ["électronique", "electronique", "déchets électroniques", "appareils électroniques", "électroniques"],
-    "Superviseur_Regional": ["superviseur régional", "superviseur regional", "superviseurs régionaux", "supervision régionale"],
-    "Superviseur_National": ["superviseur national", "superviseurs nationaux", "supervision nationale"],
-    "Superviseur_Municipal": ["superviseur municipal", "superviseurs municipaux", "supervision municipale"],
-    "Superviseur_Environemenetal": ["superviseur environnemental", "superviseur environnement", "superviseurs environnementaux", "supervision environnementale"],
-    "Superviseur_Securite": ["superviseur sécurité", "superviseur securite", "superviseurs sécurité", "supervision sécurité", "superviseur de sécurité"],
-    "Supervuseur_Qualite": ["superviseur qualité", "superviseur qualite", "superviseurs qualité", "supervision qualité", "superviseur de qualité"],
-    "Centre_compostage": ["centre compostage", "centres compostage", "compostage", "centre de compostage"],
-    "Centre_tri": ["centre tri", "centres tri", "tri", "centre de tri", "centres de tri"],
-    "Usine_recyclage": ["usine recyclage", "usines recyclage", "recyclage", "usine de recyclage", "usines de recyclage"],
-    "Centre_Compostage_Collectif": ["compostage collectif", "centre compostage collectif"],
-    "Centre_Compostage_Individuel": ["compostage individuel", "centre compostage individuel"],
-    "Centre_Compostage_Industriel": ["compostage industriel", "centre compostage industriel"],
-    "Centre_Tri_Automatise": ["tri automatisé", "tri automatise", "centre tri automatisé", "centre tri automatise"],
-    "Centre_Tri_Manuel": ["tri manuel", "centre tri manuel", "centres tri manuel"],
-    "Centre_Tri_Optique": ["tri optique", "centre tri optique", "centres tri optique"],
-    "Usine_Recyclage_Plastique": ["recyclage plastique", "usine recyclage plastique", "recyclage des plastiques"],
-    "Usine_Recyclage_Metal": ["recyclage métal", "recyclage metal", "usine recyclage métal", "recyclage des métaux"],
-    "Usine_Recyclage_Verre": ["recyclage verre", "usine recyclage verre", "recyclage du verre"],
-    "Usine_Recyclage_Batteries": ["recyclage batteries", "usine recyclage batteries", "recyclage des batteries"],
-    "Usine_Recyclage_Electronique": ["recyclage électronique", "recyclage electronique", "usine recyclage électronique", "recyclage des déchets électroniques"],
-    "Transporteur_Camion-benne": ["transporteur camion-benne", "camion-benne", "camion benne", "transporteur camion benne"],
-    "Transporteur_Camion-grue": ["transporteur camion-grue", "camion-grue", "camion grue", "transporteur camion grue"],
-    "Transporteur_spécialisé": ["transporteur spécialisé", "transporteur specialise", "transporteur spécialisé déchets", "transporteur spécialisé dangereux"],
-    "Collecteur_Conteneur": ["collecteur conteneur", "collecte conteneur", "collecteur à conteneur"],
-    "Collecteur_Municipal": ["collecteur municipal", "collecte municipale", "collecteur municipal", "collecte municipale"],
-    "Collecteur_Prive": ["collecteur privé", "collecteur prive", "collecte privée", "collecte privee"],
-        "Centre_compostage": ["centre compostage", "centres compostage", "compostage", "centre de compostage", "composteur"],
-    "Centre_tri": ["centre tri", "centres tri", "tri", "centre de tri", "centres de tri", "unité tri"],
-    "Centre_Compostage_Collectif": ["compostage collectif", "centre compostage collectif", "composteur collectif"],
-    "Centre_Compostage_Industriel": ["compostage industriel", "centre compostage industriel", "composteur industriel"],
-    "Centre_Tri_Automatise": ["tri automatisé", "tri automatise", "centre tri automatisé", "tri automatique"],
-    "Centre_Tri_Manuel": ["tri manuel", "centre tri manuel", "tri à la main"],
-    "Centre_Tri_Optique": ["tri optique", "centre tri optique", "tri par caméra"],
-    "Centre_Tri_Magnetique": ["tri magnétique", "tri magnetique", "aimant", "séparation magnétique"],
-    "Dechets_Organique": ["organique", "restes alimentaires", "déchets alimentaires", "biologique", "compostable", "biodéchet"],
-    "Dechets_Plastique": ["plastique", "emballage plastique", "déchets plastiques", "bouteille plastique"],
-    "Dechets_Metal": ["métal", "ferraille", "canette", "boîte conserve", "déchets métalliques"],
-    "Dechets_Papier": ["papier", "carton", "journal", "emballage carton"]
-}
 
+def semantic_entries(lexicon=None):
+    """(kind, text, label) rows of the vector index: class names, class keywords and ontology attributes"""
+    if lexicon is None:
+        lexicon = class_lexicon.get()
+    entries = []
+    for cls in lexicon.classes:
+        entries.append(("class", cls.replace("_", " ").replace("-", " ").lower(), cls))
+    for label, keywords in lexicon.phrases.items():
+        for kw in keywords:
+            entries.append(("class", kw, label))
+    for attr in dict.fromkeys(get_dynamic_attributes()):
+        entries.append(("attr", attr, attr))
+    return entries
 
-matcher = Matcher(nlp.vocab)
 
-for label, keywords in CLASS_KEYWORDS.items():
-    patterns = []
-    for kw in keywords:
-        
-        if " " in kw:
-            pattern = [{"LOWER": token.lower()} for token in kw.split()]
-            patterns.append(pattern)
-        
-        else:
-            pattern = [{"LOWER": kw.lower()}]
-            patterns.append(pattern)
-    
-    if patterns:
-        matcher.add(label, patterns)
+def build_vector_index():
+    index = VectorIndex(models.get("sentence_model"), NLP_SENTENCE_MODEL)
+    index.update(semantic_entries())
+    return index
 
+models.register("vector_index", build_vector_index)
 
-def detect_attribute(question: str):
-    attrs = []
-    doc = nlp(question.lower())
-
-    patterns = {
-        "nom": [
-            r'\bnom\s+(?:est|a pour|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bappel[ée]\s+([^"\n]+)',
-            r'\bnomm[ée]\s+([^"\n]+)',
-            r'\ba pour nom\s+([^"\n]+)'
-        ],
-        "codePostal": [
-            r'\bcode\s+postal\s+(\d+)',
-            r'\bcp\s+(\d+)',
-            r'\bpostal\s+(\d+)',
-            r'\bavec\s+codePostal\s+(\d+)',
-            r'\bcodePostal\s+(\d+)'
-        ],
-        "ville": [
-            r'\bdans\s+la\s+ville\s+(?:de\s+)?([A-ZÉÈÀ][a-zéèàêôûç\-]+)',
-            r'\bville\s+(?:de\s+)?([A-ZÉÈÀ][a-zéèàêôûç\-]+)',
-            r'\bà\s+(?!un\b|une\b|le\b|la\b|les\b|des\b|du\b|de\b)([A-ZÉÈÀ][a-zéèàêôûç\-]+)(?:\s|$|,)',
-            r'\ba\s+(?!un\b|une\b|le\b|la\b|les\b|des\b|du\b|de\b)([A-ZÉÈÀ][a-zéèàêôûç\-]+)(?:\s|$|,)'
-        ],
-        "adresse": [
-            r'\badresse\s+([\w\s\-\d,]+)'
-        ],
-        "codeMatiere": [
-            r'\bcode\s+mati[èe]re\s+([\w\-]+)',
-            r'\bmati[èe]re\s+([\w\-]+)'
-        ],
-        "nomCentre": [
-            r'\b(?:quel|le|un)\s+centre\s+(?:a pour nom|nommé|appelé|:)\s*["«]?([^"»\n?]+?)(?:\?|$|["»])',
-            r'\bcentre\s+(?:a pour nom|nommé|appelé|:)\s*["«]?([^"»\n?]+?)(?:\?|$|["»])',
-            r'\b(?:à\s+)?(?:un|le|la|les)?\s*centre\s+(?:de\s+)?(?:tri|compostage|recyclage|traitement)\s+([A-ZÉÈÀ][A-Za-zéèàêôûç\s\-]+)(?:\s|$|,|\?|\.|$)',
-            r'\bcentre\s+(?:de\s+)?(?:tri|compostage|recyclage|traitement)\s+([A-ZÉÈÀ][A-Za-zéèàêôûç\s\-]+)(?:\s|$|,|\?|\.|$)',
-            r'\b(?:le|un)\s+centre\s+(?:de\s+)?(?:tri|compostage|recyclage|traitement)\s+([A-ZÉÈÀ][A-Za-zéèàêôûç\s\-]+)(?:\s|$|,|\?|\.|$)',
-            r'\b(?:qui|que|le|la|les|un|une)\s+(?:audite|audit|affecte|supervise|contrôle)\s+(?:le|la|les|un|une)?\s*centre\s+(?:de\s+)?(?:tri|compostage|recyclage|traitement)\s+([A-ZÉÈÀ][A-Za-zéèàêôûç\s\-]+)(?:\s|$|,|\?|\.|$)',
-            r'\bnomCentre\s+["«]?([^"»\n]+)["»]?'
-        ],
-        "nomComplet": [
-            r'\bnom\s+complet\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bsuperviseur\s+["«]?([^"»\n]+)["»]?',
-            r'\bnomComplet\s+["«]?([^"»\n]+)["»]?'
-        ],
-        "statutOperationnel": [
-            r'\bstatut\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bstatut\s+opérationnel\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\b(en_service|maintenance|suspendu|fermé)',
-            r'\bstatutOperationnel\s+["«]?([^"»\n]+)["»]?'
-        ],
-        "fonction": [
-            r'\bfonction\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bfonction\s+["«]?([^"»\n]+)["»]?'
-        ],
-        "typeCentre": [
-            r'\btype\s+(?:de\s+)?centre\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\btype\s+centre\s+["«]?([^"»\n]+)["»]?',
-            r'\btypeCentre\s+["«]?([^"»\n]+)["»]?'
-        ],
-        "email": [
-            r'\bemail\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bemail\s+["«]?([\w@\.\-]+)["»]?'
-        ],
-        "telephone": [
-            r'\btéléphone\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\btelephone\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\btel\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
-        ],
-        "zoneAffectation": [
-            r'\bzone\s+d[\'"]?affectation\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bzone\s+affectation\s+["«]?([^"»\n]+)["»]?',
-            r'\bzoneAffectation\s+["«]?([^"»\n]+)["»]?'
-        ],
-        "actif": [
-            r'\bactifs?\b',
-            r'\bactif\s+(?:est|:)\s*["«]?(true|false|vrai|faux|oui|non)["»]?',
-            r'\bactif\s+["«]?(true|false|vrai|faux|oui|non)["»]?'
-        ],
-        "capciteCharge": [
-            r'\bcapacité\s+charge\s+(?:est|:)\s*(\d+\.?\d*)',
-            r'\bcapciteCharge\s+(?:est|:)\s*(\d+\.?\d*)',
-            r'\bcapacité\s+charge\s+["«]?(\d+\.?\d*)["»]?'
-        ],
-        "dateDernierControle": [
-            r'\bdate\s+dernier\s+contrôle\s+(?:est|:)\s*([\d\-T:]+)',
-            r'\bdate\s+dernier\s+controle\s+(?:est|:)\s*([\d\-T:]+)',
-            r'\bdateDernierControle\s+(?:est|:)\s*([\d\-T:]+)'
-        ],
-        "estCertifie": [
-            r'\bcertifi[ée]s?\b',
-            r'\bestCertifie\s+(?:est|:)\s*["«]?(true|false|vrai|faux|oui|non)["»]?',
-            r'\best\s+certifi[ée]\s+(?:est|:)\s*["«]?(true|false|vrai|faux|oui|non)["»]?'
-        ],
-        "idTransporteur": [
-            r'\bid\s+transporteur\s+(?:est|:)\s*["«]?([\w\-]+)["»]?',
-            r'\bidTransporteur\s+(?:est|:)\s*["«]?([\w\-]+)["»]?'
-        ],
-        "typeVehicule": [
-            r'\btype\s+véhicule\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\btype\s+vehicule\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\btypeVehicule\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
-        ],
-        "zoneIntervention": [
-            r'\bzone\s+d[\'"]?intervention\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bzone\s+intervention\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bzoneIntervention\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
-        ],
-        "dateAgrement": [
-            r'\bdate\s+agrément\s+(?:est|:)\s*([\d\-T:]+)',
-            r'\bdate\s+agrement\s+(?:est|:)\s*([\d\-T:]+)',
-            r'\bdateAgrement\s+(?:est|:)\s*([\d\-T:]+)'
-        ],
-        "estAgree": [
-            r'\bagr[ée]s?\b',
-            r'\bestAgree\s+(?:est|:)\s*["«]?(true|false|vrai|faux|oui|non)["»]?',
-            r'\best\s+agr[ée][ée]\s+(?:est|:)\s*["«]?(true|false|vrai|faux|oui|non)["»]?'
-        ],
-        "frequenceCollecte": [
-            r'\bfr[ée]quence\s+collecte\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bfrequenceCollecte\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
-        ],
-        "idCollecteur": [
-            r'\bid\s+collecteur\s+(?:est|:)\s*["«]?([\w\-]+)["»]?',
-            r'\bidCollecteur\s+(?:est|:)\s*["«]?([\w\-]+)["»]?'
-        ],
-        "typeCollecte": [
-            r'\btype\s+collecte\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\btypeCollecte\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
-        ],
-        "zoneCouverture": [
-            r'\bzone\s+de\s+couverture\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bzone\s+couverture\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
-            r'\bzoneCouverture\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
-        ],
-
-         "capacite_journaliere": [
+_indexed_vocabulary = (None, None)
+
+
+def semantic_matches(question: str, kind: str, k=VECTOR_INDEX_TOP_K, min_score=VECTOR_INDEX_MIN_SCORE):
+    """Labels of kind "class" or "attr" closest to the question: [(label, matched text, cosine score)]"""
+    global _indexed_vocabulary
+    index = models.get("vector_index")
+    vocabulary = (get_dynamic_attributes(), class_lexicon.get())
+    if vocabulary[0] is not _indexed_vocabulary[0] or vocabulary[1] is not _indexed_vocabulary[1]:
+        # New attribute snapshot or lexicon: only the new terms are encoded
+        index.update(semantic_entries(vocabulary[1]))
+        _indexed_vocabulary = vocabulary
+    return index.search(index.encode_query(question), kind, k, min_score)
+
+
+# Models needed by extract_entities
+PARSER_MODELS = ("spacy", "matcher", "vector_index") if NLP_SEMANTIC_FALLBACK else ("spacy", "matcher")
+# Former module attributes, now loaded on first access
+_LAZY_ATTRIBUTES = {
+    "nlp": "spacy",
+    "model": "sentence_model",
+    "vector_index": "vector_index",
+}
+
+
+def __getattr__(name):
+    if name == "DYNAMIC_ATTRS":
+        return get_dynamic_attributes()
+    if name == "CLASSES":
+        return class_lexicon.get().classes
+    if name == "CLASS_KEYWORDS":
+        return class_lexicon.get().phrases
+    if name == "matcher":
+        return class_lexicon.get().matcher(models.get("spacy"))
+    if name in _LAZY_ATTRIBUTES:
+        return models.get(_LAZY_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def warm_up_models(names=NLP_WARMUP):
+    """Start loading the NLP models, and the periodic reloads of the attribute list, class lexicon and hierarchy (server startup)"""
+    models.warm_up(names)
+    dynamic_attributes.start()
+    class_lexicon.start()
+    class_hierarchy.start()
+
+
+def wait_until_ready(timeout=NLP_READY_TIMEOUT):
+    """Block until the parser models are loaded; raises ModelNotReady after `timeout` seconds"""
+    models.wait_ready(PARSER_MODELS, timeout)
+
+
+# Attribute patterns, tried in this order for every question (case-insensitive)
+ATTRIBUTE_PATTERNS = {
+    "nom": [
+        r'\bnom\s+(?:est|a pour|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bappel[ée]\s+([^"\n]+)',
+        r'\bnomm[ée]\s+([^"\n]+)',
+        r'\ba pour nom\s+([^"\n]+)'
+    ],
+    "codePostal": [
+        r'\bcode\s+postal\s+(\d+)',
+        r'\bcp\s+(\d+)',
+        r'\bpostal\s+(\d+)',
+        r'\bavec\s+codePostal\s+(\d+)',
+        r'\bcodePostal\s+(\d+)'
+    ],
+    "ville": [
+        r'\bdans\s+la\s+ville\s+(?:de\s+)?([A-ZÉÈÀ][a-zéèàêôûç\-]+)',
+        r'\bville\s+(?:de\s+)?([A-ZÉÈÀ][a-zéèàêôûç\-]+)',
+        r'\bà\s+(?!un\b|une\b|le\b|la\b|les\b|des\b|du\b|de\b)([A-ZÉÈÀ][a-zéèàêôûç\-]+)(?:\s|$|,)',
+        r'\ba\s+(?!un\b|une\b|le\b|la\b|les\b|des\b|du\b|de\b)([A-ZÉÈÀ][a-zéèàêôûç\-]+)(?:\s|$|,)'
+    ],
+    "adresse": [
+        r'\badresse\s+([\w\s\-\d,]+)'
+    ],
+    "codeMatiere": [
+        r'\bcode\s+mati[èe]re\s+([\w\-]+)',
+        r'\bmati[èe]re\s+([\w\-]+)'
+    ],
+    "nomCentre": [
+        r'\b(?:quel|le|un)\s+centre\s+(?:a pour nom|nommé|appelé|:)\s*["«]?([^"»\n?]+?)(?:\?|$|["»])',
+        r'\bcentre\s+(?:a pour nom|nommé|appelé|:)\s*["«]?([^"»\n?]+?)(?:\?|$|["»])',
+        r'\b(?:à\s+)?(?:un|le|la|les)?\s*centre\s+(?:de\s+)?(?:tri|compostage|recyclage|traitement)\s+([A-ZÉÈÀ][A-Za-zéèàêôûç\s\-]+)(?:\s|$|,|\?|\.|$)',
+        r'\bcentre\s+(?:de\s+)?(?:tri|compostage|recyclage|traitement)\s+([A-ZÉÈÀ][A-Za-zéèàêôûç\s\-]+)(?:\s|$|,|\?|\.|$)',
+        r'\b(?:le|un)\s+centre\s+(?:de\s+)?(?:tri|compostage|recyclage|traitement)\s+([A-ZÉÈÀ][A-Za-zéèàêôûç\s\-]+)(?:\s|$|,|\?|\.|$)',
+        r'\b(?:qui|que|le|la|les|un|une)\s+(?:audite|audit|affecte|supervise|contrôle)\s+(?:le|la|les|un|une)?\s*centre\s+(?:de\s+)?(?:tri|compostage|recyclage|traitement)\s+([A-ZÉÈÀ][A-Za-zéèàêôûç\s\-]+)(?:\s|$|,|\?|\.|$)',
+        r'\bnomCentre\s+["«]?([^"»\n]+)["»]?'
+    ],
+    "nomComplet": [
+        r'\bnom\s+complet\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bsuperviseur\s+["«]?([^"»\n]+)["»]?',
+        r'\bnomComplet\s+["«]?([^"»\n]+)["»]?'
+    ],
+    "statutOperationnel": [
+        r'\bstatut\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bstatut\s+opérationnel\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\b(en_service|maintenance|suspendu|fermé)',
+        r'\bstatutOperationnel\s+["«]?([^"»\n]+)["»]?'
+    ],
+    "fonction": [
+        r'\bfonction\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bfonction\s+["«]?([^"»\n]+)["»]?'
+    ],
+    "typeCentre": [
+        r'\btype\s+(?:de\s+)?centre\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\btype\s+centre\s+["«]?([^"»\n]+)["»]?',
+        r'\btypeCentre\s+["«]?([^"»\n]+)["»]?'
+    ],
+    "email": [
+        r'\bemail\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bemail\s+["«]?([\w@\.\-]+)["»]?'
+    ],
+    "telephone": [
+        r'\btéléphone\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\btelephone\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\btel\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
+    ],
+    "zoneAffectation": [
+        r'\bzone\s+d[\'"]?affectation\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bzone\s+affectation\s+["«]?([^"»\n]+)["»]?',
+        r'\bzoneAffectation\s+["«]?([^"»\n]+)["»]?'
+    ],
+    "actif": [
+        r'\bactifs?\b',
+        r'\bactif\s+(?:est|:)\s*["«]?(true|false|vrai|faux|oui|non)["»]?',
+        r'\bactif\s+["«]?(true|false|vrai|faux|oui|non)["»]?'
+    ],
+    "capciteCharge": [
+        r'\bcapacité\s+charge\s+(?:est|:)\s*(\d+\.?\d*)',
+        r'\bcapciteCharge\s+(?:est|:)\s*(\d+\.?\d*)',
+        r'\bcapacité\s+charge\s+["«]?(\d+\.?\d*)["»]?'
+    ],
+    "dateDernierControle": [
+        r'\bdate\s+dernier\s+contrôle\s+(?:est|:)\s*([\d\-T:]+)',
+        r'\bdate\s+dernier\s+controle\s+(?:est|:)\s*([\d\-T:]+)',
+        r'\bdateDernierControle\s+(?:est|:)\s*([\d\-T:]+)'
+    ],
+    "estCertifie": [
+        r'\bcertifi[ée]s?\b',
+        r'\bestCertifie\s+(?:est|:)\s*["«]?(true|false|vrai|faux|oui|non)["»]?',
+        r'\best\s+certifi[ée]\s+(?:est|:)\s*["«]?(true|false|vrai|faux|oui|non)["»]?'
+    ],
+    "idTransporteur": [
+        r'\bid\s+transporteur\s+(?:est|:)\s*["«]?([\w\-]+)["»]?',
+        r'\bidTransporteur\s+(?:est|:)\s*["«]?([\w\-]+)["»]?'
+    ],
+    "typeVehicule": [
+        r'\btype\s+véhicule\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\btype\s+vehicule\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\btypeVehicule\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
+    ],
+    "zoneIntervention": [
+        r'\bzone\s+d[\'"]?intervention\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bzone\s+intervention\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bzoneIntervention\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
+    ],
+    "dateAgrement": [
+        r'\bdate\s+agrément\s+(?:est|:)\s*([\d\-T:]+)',
+        r'\bdate\s+agrement\s+(?:est|:)\s*([\d\-T:]+)',
+        r'\bdateAgrement\s+(?:est|:)\s*([\d\-T:]+)'
+    ],
+    "estAgree": [
+        r'\bagr[ée]s?\b',
+        r'\bestAgree\s+(?:est|:)\s*["«]?(true|false|vrai|faux|oui|non)["»]?',
+        r'\best\s+agr[ée][ée]\s+(?:est|:)\s*["«]?(true|false|vrai|faux|oui|non)["»]?'
+    ],
+    "frequenceCollecte": [
+        r'\bfr[ée]quence\s+collecte\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bfrequenceCollecte\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
+    ],
+    "idCollecteur": [
+        r'\bid\s+collecteur\s+(?:est|:)\s*["«]?([\w\-]+)["»]?',
+        r'\bidCollecteur\s+(?:est|:)\s*["«]?([\w\-]+)["»]?'
+    ],
+    "typeCollecte": [
+        r'\btype\s+collecte\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\btypeCollecte\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
+    ],
+    "zoneCouverture": [
+        r'\bzone\s+de\s+couverture\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bzone\s+couverture\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?',
+        r'\bzoneCouverture\s+(?:est|:)\s*["«]?([^"»\n]+)["»]?'
+    ],
+    "capacite_journaliere": [
         r'capacit[ée]\s+(?:est|:)\s*(\d+\.?\d*)',
         r'capacit[ée]\s+journali[èe]re\s+(?:est|:)\s*(\d+\.?\d*)',
         r'peut traiter\s+(\d+\.?\d*)\s+tonnes',
@@ -298,97 +268,135 @@ def detect_attribute(question: str):
         r'localis[ée]\s+[àa]\s+(?!un\b|une\b|le\b|la\b|les\b|des\b|du\b|de\b)([A-ZÉÈÀ][a-zéèàêôûç\-]+)',
         r'situ[ée]\s+[àa]\s+(?!un\b|une\b|le\b|la\b|les\b|des\b|du\b|de\b)([A-ZÉÈÀ][a-zéèàêôûç\-]+)'
     ]
-    }
-
-    # First check for boolean attributes separately to avoid duplicates
-    if re.search(r'\bactifs?\b', question, re.IGNORECASE):
-        attrs.append({"name": "actif", "value": "true"})
-    if re.search(r'\bcertifi[ée]s?\b', question, re.IGNORECASE):
-        attrs.append({"name": "estCertifie", "value": "true"})
-    if re.search(r'\bagr[ée]s?\b', question, re.IGNORECASE):
-        attrs.append({"name": "estAgree", "value": "true"})
-    
-    # Check if question is about "centre" - if so, prioritize nomCentre over nom
-    is_about_centre = "centre" in question.lower()
-    
-    # Then process other attributes
-    for attr_name, pattern_list in patterns.items():
-        if attr_name in ["actif", "estCertifie", "estAgree"]:
-            continue  # Already handled above
-        
-        # Skip "nom" if we're talking about centres and will detect nomCentre
-        if attr_name == "nom" and is_about_centre:
-            continue
-        
-        for pattern in pattern_list:
-            matches = re.finditer(pattern, question, re.IGNORECASE)
-            for match in matches:
-                if match.groups():
-                    value = match.group(1).strip()
-                    # Clean up value - remove trailing punctuation but keep the name
-                    value = value.rstrip('?.,!;:')
-                    if value and value.lower() not in ['pour', 'nom', 'est', 'a', 'dans', 'la', 'de', 'a pour nom']:
-                        attrs.append({"name": attr_name, "value": value})
+}
+
+# Boolean attributes: mentioning them is enough ("actifs", "certifiés"), their value is "true"
+BOOLEAN_ATTRIBUTES = {
+    "actif": r'\bactifs?\b',
+    "estCertifie": r'\bcertifi[ée]s?\b',
+    "estAgree": r'\bagr[ée]s?\b',
+}
+
+# Captured values that are only words of the question
+IGNORED_VALUES = {'pour', 'nom', 'est', 'a', 'dans', 'la', 'de', 'a pour nom'}
+
+_LEADING_WORD = re.compile(r'(?:\\b)?([^\W\d_]+)(.?)')
+
+
+def _has_top_level_alternation(pattern):
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+    return False
+
+
+def required_keyword(pattern):
+    """Literal word every match of `pattern` starts with (casefolded), or None"""
+    match = _LEADING_WORD.match(pattern)
+    if not match or _has_top_level_alternation(pattern):
+        return None
+    word, following = match.groups()
+    if following in ("?", "*", "{"):
+        # The last letter is optional: "actifs?" only guarantees "actif"
+        word = word[:-1]
+    return word.casefold() or None
+
+
+class AttributeScanner:
+    """
+    ATTRIBUTE_PATTERNS compiled once. A pattern only runs when its leading keyword occurs in the
+    question: a substring test on the casefolded question, much cheaper than a regex scan, and
+    casefold is at least as lenient as re.IGNORECASE. Each pattern keeps its own finditer, so
+    overlapping matches of different patterns are all found, in the original order.
+    """
+
+    def __init__(self, patterns=ATTRIBUTE_PATTERNS, booleans=BOOLEAN_ATTRIBUTES):
+        self.booleans = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in booleans.items()]
+        self.rules = [
+            (name, required_keyword(pattern), re.compile(pattern, re.IGNORECASE))
+            for name, pattern_list in patterns.items() if name not in booleans
+            for pattern in pattern_list
+        ]
+
+    def scan(self, question):
+        """Every (name, value) found, in pattern order, before deduplication"""
+        attrs = [{"name": name, "value": "true"} for name, regex in self.booleans if regex.search(question)]
+        # re.IGNORECASE also matches the dotless "ı" with "i", casefold does not
+        folded = question.casefold().replace("ı", "i")
+        # If the question is about a "centre", nomCentre replaces nom
+        is_about_centre = "centre" in question.lower()
+        for name, keyword, regex in self.rules:
+            if name == "nom" and is_about_centre:
+                continue
+            if keyword is not None and keyword not in folded:
+                continue
+            if not regex.groups:
+                continue
+            for match in regex.finditer(question):
+                # Clean up value - remove trailing punctuation but keep the name
+                value = match.group(1).strip().rstrip('?.,!;:')
+                if value and value.lower() not in IGNORED_VALUES:
+                    attrs.append({"name": name, "value": value})
+        return attrs
+
+
+attribute_scanner = AttributeScanner()
+
+
+def detect_attribute(question: str):
+    attrs = attribute_scanner.scan(question)
+
+    # If several nomCentre values were found, keep only the longest one (most complete)
+    centre_names = [attr["value"] for attr in attrs if attr["name"] == "nomCentre"]
+    nomCentre_value = max(centre_names, key=len) if centre_names else None
+    if len(centre_names) > 1:
+        attrs = [attr for attr in attrs if attr["name"] != "nomCentre"]
+        attrs.append({"name": "nomCentre", "value": nomCentre_value})
+    nomCentre_lower = nomCentre_value.lower() if nomCentre_value else None
 
-    
-    # Remove duplicates and prioritize specific attributes
     unique_attrs = []
     seen = set()
-    nomCentre_values = []
-    
-    # First pass: collect all nomCentre values
     for attr in attrs:
-        if attr['name'] == 'nomCentre':
-            nomCentre_values.append(attr['value'])
-    
-    # If we have multiple nomCentre values, keep only the longest one (most complete)
-    nomCentre_value = None
-    if len(nomCentre_values) > 1:
-        nomCentre_value = max(nomCentre_values, key=len)
-        # Remove all nomCentre attributes from attrs
-        attrs = [attr for attr in attrs if attr['name'] != 'nomCentre']
-        # Add back only the longest nomCentre value
-        attrs.append({"name": "nomCentre", "value": nomCentre_value})
-    elif len(nomCentre_values) == 1:
-        nomCentre_value = nomCentre_values[0]
-    
-    # Second pass: add attributes, excluding nom and localisation if nomCentre exists
-    for attr in attrs:
-        attr_name = attr['name']
-        attr_value = attr['value']
-        
-        # If we have nomCentre, skip nom with the same value or if nom is a substring of nomCentre
-        if attr_name == "nom" and nomCentre_value:
-            if attr_value == nomCentre_value or attr_value.lower() in nomCentre_value.lower():
-                continue
-        
-        # If we have nomCentre, skip localisation that is a substring of nomCentre
+        attr_name = attr["name"]
+        attr_value = attr["value"]
+
+        # If we have nomCentre, skip nom and localisation values that are part of it
         # (e.g., "Nord" should be removed if nomCentre is "Ariana Nord")
-        if attr_name == "localisation" and nomCentre_value:
-            if attr_value.lower() in nomCentre_value.lower():
-                continue
-        
-        # Skip nomCentre values that are substrings of other nomCentre values
-        if attr_name == "nomCentre" and nomCentre_value:
-            if attr_value != nomCentre_value and attr_value.lower() in nomCentre_value.lower():
+        if nomCentre_value and attr_name in ("nom", "localisation"):
+            if attr_value == nomCentre_value or attr_value.lower() in nomCentre_lower:
                 continue
-        
+
         key = (attr_name, attr_value)
         if key not in seen:
             seen.add(key)
             unique_attrs.append(attr)
-    
+
     return unique_attrs
 
 
-def detect_intent(question: str):
+def detect_intent(question: str, hits=None):
     """Detect higher-level intents for template queries.
 
     Currently recognizes recycling chain questions like:
     - "produit final" with "usine" or "recyclage"
     - mentions of produit + recycl*
     """
-    q = question.lower()
+    q = scan_keywords(question) if hits is None else hits
     # robust to accents/variants by using partial stems
     has_produit_final = ("produit final" in q) or ("produits finaux" in q) or ("produitfinal" in q)
     has_recyclage = ("recycl" in q)  # matches recyclage / recyclé / recycler
@@ -412,97 +420,136 @@ RELATIONS = {
     "accepte_pour_tri": ["accepte pour tri", "accepte au tri", "prend pour tri", "reçoit pour tri"]
 }
 
-def detect_relation(question: str):
-    q_lower = question.lower()
+# Substrings tested by extract_entities and detect_intent
+CLASS_HINTS = [
+    "tous les producteurs", "liste des producteurs", "tous les déchets", "liste des déchets",
+    "tous les superviseurs", "liste des superviseurs", "superviseurs", "superviseur", "tous les centres", "liste des centres",
+    "centres de traitement", "centre", "traitement", "compostage", "tri", "recyclage",
+    "tous les transporteurs", "liste des transporteurs", "transporteurs",
+    "tous les collecteurs", "liste des collecteurs", "collecteurs",
+    "automat", "manuel", "optique", "magnétique", "magnetique", "industriel", "collectif", "individuel",
+    "organique", "compostable", "plastique", "métal", "metal", "papier", "carton", "trie", "triage", "compost",
+]
+INTENT_HINTS = ["produit final", "produits finaux", "produitfinal", "recycl", "usine", "usine de recyclage", "produit"]
+# Words that make a relation explicit even without both subject and object classes
+EXPLICIT_RELATION_WORDS = [
+    "qui affecte", "qui audite", "qui supervise", "qui transporte", "qui transportent", "qui collecte",
+    "qui collectent", "affecté", "supervise", "audite", "transporté", "collecté",
+]
+
+# Every keyword list in one automaton: a single pass over the question finds all of them
+keyword_automaton = KeywordAutomaton(
+    CLASS_HINTS + INTENT_HINTS + EXPLICIT_RELATION_WORDS + [kw for keywords in RELATIONS.values() for kw in keywords]
+)
+# Relation keyword -> position of its relation in RELATIONS (the first relation listed wins)
+_RELATION_RANKS = {}
+for _rank, (_rel, _keywords) in enumerate(RELATIONS.items()):
+    for _kw in _keywords:
+        _RELATION_RANKS.setdefault(_kw, (_rank, _rel))
+
+
+def scan_keywords(question: str):
+    """Keywords of the automaton found in the lowercased question"""
+    return keyword_automaton.scan(question.lower())
+
+
+def detect_relation(question: str, hits=None):
+    if hits is None:
+        hits = scan_keywords(question)
     # Use word boundaries to avoid false positives
-    import re
-    for rel, keywords in RELATIONS.items():
-        for kw in keywords:
-            # Create a pattern with word boundaries to match whole words/phrases
-            pattern = r'\b' + re.escape(kw) + r'\b'
-            if re.search(pattern, q_lower):
-                return rel
-    return None
+    ranks = [_RELATION_RANKS[kw] for kw in hits.words if kw in _RELATION_RANKS]
+    return min(ranks)[1] if ranks else None
 
 
-def extract_entities(question: str):
-    doc = nlp(question)
+def parse_question(question: str):
+    """Tokenizer-only Doc: the Matcher only uses the LOWER attribute, no pipeline component is needed"""
+    return models.get("spacy").make_doc(question)
+
+
+def extract_entities(question: str, doc=None):
+    # One lexicon for the whole question, even if a reload swaps it meanwhile
+    matcher = class_lexicon.get().matcher(models.get("spacy"))
+    if doc is None:
+        doc = parse_question(question)
     matches = matcher(doc)
     entities = {"classes": [], "relations": [], "attrs": []}
 
     found_classes = set()
     for match_id, start, end in matches:
-        label = nlp.vocab.strings[match_id]
+        label = doc.vocab.strings[match_id]
         found_classes.add(label)
 
     q_lower = question.lower()
+    hints = keyword_automaton.scan(q_lower)
 
-    if "tous les producteurs" in q_lower or "liste des producteurs" in q_lower:
+    if "tous les producteurs" in hints or "liste des producteurs" in hints:
         found_classes.add("Producteur")
-    if "tous les déchets" in q_lower or "liste des déchets" in q_lower:
+    if "tous les déchets" in hints or "liste des déchets" in hints:
         found_classes.add("Dechets")
-    if "tous les superviseurs" in q_lower or "liste des superviseurs" in q_lower or "superviseurs" in q_lower:
+    if "tous les superviseurs" in hints or "liste des superviseurs" in hints or "superviseurs" in hints:
         found_classes.add("Superviseur")
-    if "tous les centres" in q_lower or "liste des centres" in q_lower or "centres de traitement" in q_lower:
+    if "tous les centres" in hints or "liste des centres" in hints or "centres de traitement" in hints:
         found_classes.add("Centre_traitement")
-    if "centre" in q_lower and ("traitement" in q_lower or "compostage" in q_lower or "tri" in q_lower or "recyclage" in q_lower):
-        if "compostage" in q_lower:
+    if "centre" in hints and ("traitement" in hints or "compostage" in hints or "tri" in hints or "recyclage" in hints):
+        if "compostage" in hints:
             found_classes.add("Centre_compostage")
-        elif "tri" in q_lower:
+        elif "tri" in hints:
             found_classes.add("Centre_tri")
-        elif "recyclage" in q_lower:
+        elif "recyclage" in hints:
             found_classes.add("Usine_recyclage")
         else:
             found_classes.add("Centre_traitement")
-    if "tous les transporteurs" in q_lower or "liste des transporteurs" in q_lower or "transporteurs" in q_lower:
+    if "tous les transporteurs" in hints or "liste des transporteurs" in hints or "transporteurs" in hints:
         found_classes.add("Transporteur")
-    if "tous les collecteurs" in q_lower or "liste des collecteurs" in q_lower or "collecteurs" in q_lower:
+    if "tous les collecteurs" in hints or "liste des collecteurs" in hints or "collecteurs" in hints:
         found_classes.add("Collecteur")
 
-            # Détection spécifique pour tri et compostage
-    if any(word in q_lower for word in ["tri", "trie", "triage"]):
-        if "automat" in q_lower:
+    # Détection spécifique pour tri et compostage
+    if any(word in hints for word in ["tri", "trie", "triage"]):
+        if "automat" in hints:
             found_classes.add("Centre_Tri_Automatise")
-        elif "manuel" in q_lower:
+        elif "manuel" in hints:
             found_classes.add("Centre_Tri_Manuel")
-        elif "optique" in q_lower:
+        elif "optique" in hints:
             found_classes.add("Centre_Tri_Optique")
-        elif "magnétique" in q_lower or "magnetique" in q_lower:
+        elif "magnétique" in hints or "magnetique" in hints:
             found_classes.add("Centre_Tri_Magnetique")
         else:
             found_classes.add("Centre_tri")
-    
-    if any(word in q_lower for word in ["compost", "compostage"]):
-        if "industriel" in q_lower:
+
+    if any(word in hints for word in ["compost", "compostage"]):
+        if "industriel" in hints:
             found_classes.add("Centre_Compostage_Industriel")
-        elif "collectif" in q_lower:
+        elif "collectif" in hints:
             found_classes.add("Centre_Compostage_Collectif")
-        elif "individuel" in q_lower:
+        elif "individuel" in hints:
             found_classes.add("Centre_Compostage_Individuel")
         else:
             found_classes.add("Centre_compostage")
-    
+
     # Détection des déchets spécifiques
-    if "organique" in q_lower or "compostable" in q_lower:
+    if "organique" in hints or "compostable" in hints:
         found_classes.add("Dechets_Organique")
-    if "plastique" in q_lower:
+    if "plastique" in hints:
         found_classes.add("Dechets_Plastique")
-    if "métal" in q_lower or "metal" in q_lower:
+    if "métal" in hints or "metal" in hints:
         found_classes.add("Dechets_Metal")
-    if "papier" in q_lower or "carton" in q_lower:
+    if "papier" in hints or "carton" in hints:
         found_classes.add("Dechets_Papier")
 
+    # Paraphrases: no keyword matched, use the closest class of the vector index
+    if not found_classes and NLP_SEMANTIC_FALLBACK:
+        found_classes.update(label for label, _, _ in semantic_matches(question, "class", k=1))
 
-    
-
-    classes_list = list(found_classes)
+    # Sorted: set order changes with the hash seed, the generated query must not
+    classes_list = sorted(found_classes)
     subject_classes = [cls for cls in classes_list if "Producteur" in cls or "Superviseur" in cls or "Transporteur" in cls or "Collecteur" in cls]
     object_classes = [cls for cls in classes_list if ("Dechet" in cls or "Dechets" in cls or "Centre" in cls or "Usine" in cls)]
     ordered_classes = subject_classes + object_classes
     entities["classes"] = ordered_classes
 
     # Only detect relation if there are both subject and object classes, or explicit relation words
-    rel = detect_relation(question)
+    rel = detect_relation(question, hints)
     if rel:
         # Only add relation if we have both subject and object classes, or if explicitly mentioned
         if subject_classes and object_classes:
@@ -510,9 +557,9 @@ def extract_entities(question: str):
         elif len(subject_classes) > 0 and len(object_classes) > 0:
             entities["relations"].append(rel)
         # Also add if explicitly asking about a relation (e.g., "qui affecte", "qui audite", "qui transporte", "qui collecte")
-        elif any(word in question.lower() for word in ["qui affecte", "qui audite", "qui supervise", "qui transporte", "qui transportent", "qui collecte", "qui collectent", "affecté", "supervise", "audite", "transporté", "collecté"]):
+        elif any(word in hints for word in EXPLICIT_RELATION_WORDS):
             entities["relations"].append(rel)
-    
+
     attrs = detect_attribute(question)
     if attrs:
         entities["attrs"] = attrs
@@ -520,17 +567,53 @@ def extract_entities(question: str):
     # Detect if question asks for names (noms, nom complet, etc.)
     if re.search(r'\b(?:les\s+)?noms?\b', q_lower) or re.search(r'\bnom\s+complet', q_lower):
         # Check if it's about supervisors or other entities
-        if "superviseur" in q_lower or any("Superviseur" in cls for cls in found_classes):
+        if "superviseur" in hints or any("Superviseur" in cls for cls in found_classes):
             entities["request_nomComplet"] = True
 
     # High-level intent detection
-    intent = detect_intent(question)
+    intent = detect_intent(question, hints)
     if intent:
         entities["intent"] = intent
 
     return entities
 
 
+def extract_entities_batch(questions, batch_size=NLP_BATCH_SIZE):
+    """extract_entities for many questions, tokenized together in one nlp.pipe stream"""
+    nlp = models.get("spacy")
+    docs = nlp.pipe(questions, batch_size=batch_size, disable=nlp.pipe_names)
+    return [extract_entities(question, doc) for question, doc in zip(questions, docs)]
+
+
+# Variables only used to test class membership, never displayed
+TYPE_VARIABLES = {"?type", "?sujetType", "?objetType"}
+
+
+def subclass_pattern(var: str, cls: str) -> str:
+    """`var` is `cls` or one of its subclasses: VALUES from the cached class hierarchy, property path until it is loaded"""
+    hierarchy = class_hierarchy.get()
+    if not (NLP_SUBCLASS_VALUES and class_hierarchy.loaded):
+        return f"{var} rdfs:subClassOf* ex:{cls} ."
+    return f"VALUES {var} {{ {iri_list(hierarchy.closure(ONTO_NS + cls))} }}"
+
+
+def generator_version() -> str:
+    """Changes whenever generate_sparql_from_entities may produce a different query for the same entities"""
+    return class_hierarchy.get().fingerprint if NLP_SUBCLASS_VALUES and class_hierarchy.loaded else ""
+
+
+def parser_version() -> str:
+    """Changes whenever extract_entities may return other entities for the same question (lexicon swap)"""
+    return class_lexicon.get().fingerprint
+
+
+def translation_version(parser=None) -> str:
+    """
+    Changes whenever a question may get other entities or another query at runtime (lexicon swap, hierarchy reload).
+    `parser` is the parser_version() of the process that extracted the entities (the NLP server), if not this one.
+    """
+    return f"{parser or parser_version()}:{generator_version()}"
+
 
 def generate_sparql_from_entities(entities: dict) -> str:
     PREFIX = """PREFIX ex: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
@@ -596,44 +679,44 @@ PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
         if relation in ["trie", "traite_par_compostage", "accepte_pour_tri"]:
             # Relations entre Centre_tri/Centre_compostage et Dechets
             query_lines.append(f"?sujet a ?sujetType .")
-            query_lines.append(f"?sujetType rdfs:subClassOf* ex:{subject_class} .")
+            query_lines.append(subclass_pattern("?sujetType", subject_class))
             query_lines.append(f"?sujet ex:{relation} ?objet .")
             query_lines.append(f"?objet a ?objetType .")
-            query_lines.append(f"?objetType rdfs:subClassOf* ex:{object_class} .")
+            query_lines.append(subclass_pattern("?objetType", object_class))
             select_vars.append("?objet")
         
         elif relation == "envoie_vers_compostage":
             # Relation entre Centre_tri et Centre_compostage
             query_lines.append(f"?sujet a ?sujetType .")
-            query_lines.append(f"?sujetType rdfs:subClassOf* ex:{subject_class} .")
+            query_lines.append(subclass_pattern("?sujetType", subject_class))
             query_lines.append(f"?sujet ex:{relation} ?objet .")
             query_lines.append(f"?objet a ?objetType .")
-            query_lines.append(f"?objetType rdfs:subClassOf* ex:{object_class} .")
+            query_lines.append(subclass_pattern("?objetType", object_class))
             select_vars.append("?objet")
         # Check if relation is inverse
         if relation in inverse_relations:
             # For régulé_par: Dechet régulé_par Superviseur
             if "Dechet" in object_class or "Dechets" in object_class:
                 query_lines.append(f"?objet a ?objetType .")
-                query_lines.append(f"?objetType rdfs:subClassOf* ex:{object_class} .")
+                query_lines.append(subclass_pattern("?objetType", object_class))
                 query_lines.append(f"?objet ex:{relation} ?sujet .")
                 query_lines.append(f"?sujet a ?sujetType .")
-                query_lines.append(f"?sujetType rdfs:subClassOf* ex:{subject_class} .")
+                query_lines.append(subclass_pattern("?sujetType", subject_class))
                 select_vars.append("?objet")
             else:
                 query_lines.append(f"?sujet a ?sujetType .")
-                query_lines.append(f"?sujetType rdfs:subClassOf* ex:{subject_class} .")
+                query_lines.append(subclass_pattern("?sujetType", subject_class))
                 query_lines.append(f"?sujet ex:{relation} ?objet .")
                 query_lines.append(f"?objet a ?objetType .")
-                query_lines.append(f"?objetType rdfs:subClassOf* ex:{object_class} .")
+                query_lines.append(subclass_pattern("?objetType", object_class))
                 select_vars.append("?objet")
         else:
             # Include subclasses for both subject and object
             query_lines.append(f"?sujet a ?sujetType .")
-            query_lines.append(f"?sujetType rdfs:subClassOf* ex:{subject_class} .")
+            query_lines.append(subclass_pattern("?sujetType", subject_class))
             query_lines.append(f"?sujet ex:{relation} ?objet .")
             query_lines.append(f"?objet a ?objetType .")
-            query_lines.append(f"?objetType rdfs:subClassOf* ex:{object_class} .")
+            query_lines.append(subclass_pattern("?objetType", object_class))
             select_vars.append("?objet")
         
         # Add nomComplet if requested (for supervisor names)
@@ -667,7 +750,7 @@ PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
     elif subject_class and relation:
         # Include subclasses for subject
         query_lines.append(f"?sujet a ?sujetType .")
-        query_lines.append(f"?sujetType rdfs:subClassOf* ex:{subject_class} .")
+        query_lines.append(subclass_pattern("?sujetType", subject_class))
         query_lines.append(f"?sujet ex:{relation} ?objet .")
         select_vars.append("?objet")
 
@@ -683,7 +766,7 @@ PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
     elif subject_class:
         # Simple approach - check if subject is of type subject_class or any subclass
         query_lines.append(f"?sujet a ?type .")
-        query_lines.append(f"?type rdfs:subClassOf* ex:{subject_class} .")
+        query_lines.append(subclass_pattern("?type", subject_class))
         
         for attr in attrs:
             # Handle boolean attributes - use FILTER for boolean comparison
@@ -718,7 +801,7 @@ PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
     elif object_class and attrs and not relation:
         # Handle case where we have object_class (like Centre) with attributes but no relation
         query_lines.append(f"?sujet a ?type .")
-        query_lines.append(f"?type rdfs:subClassOf* ex:{object_class} .")
+        query_lines.append(subclass_pattern("?type", object_class))
         
         for attr in attrs:
             # Handle boolean attributes - use FILTER for boolean comparison
@@ -744,9 +827,12 @@ PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
         query_lines.append("?sujet ?p ?o .")
         select_vars.append("?o")
 
-    # Project all bound variables so the frontend can optionally show a full table
-    select_clause = "SELECT *"
+    # VALUES blocks first: the engine binds ?type before matching "?sujet a ?type" (index lookups per class)
+    query_lines.sort(key=lambda line: not line.startswith("VALUES "))
     where_clause = "\n".join(query_lines)
+    # Project the displayed variables only; without the class helpers, rows differing by type are duplicates
+    projection = [var for var in variables(where_clause) if var not in TYPE_VARIABLES]
+    select_clause = "SELECT DISTINCT " + " ".join(projection)
     
     return f"{PREFIX}{select_clause} WHERE {{\n{where_clause}\n}}"
 
@@ -784,10 +870,9 @@ if __name__ == "__main__":
         "Liste des collecteurs",
         "Quels collecteurs sont agréés",
         "Quel collecteur collecte des déchets organiques",
-        "Quels déchets sont collectés par un collecteur municipal"
-
+        "Quels déchets sont collectés par un collecteur municipal",
 
-                "Quels centres de tri traitent les déchets plastiques",
+        "Quels centres de tri traitent les déchets plastiques",
         "Liste des centres de tri automatique",
         "Quel centre trie les déchets métalliques",
         "Centres de compostage industriel à Paris",
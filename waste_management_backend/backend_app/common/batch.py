@@ -0,0 +1,207 @@
+import inspect
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from backend_app.common.ai_parser import generate_sparql_from_entities
+from backend_app.common.nlp_client import extract_entities_versioned, wait_until_ready
+from backend_app.common.pagination import NLP_PAGE_SIZE, run_page
+from backend_app.common.sparql_utils import fuseki_client, get_all_classes, get_class_properties
+from backend_app.common.translation_cache import translation_cache
+from backend_app.production.producer_queries import (
+    get_all_producers,
+    get_producers_by_type,
+    get_producer_wastes,
+    get_producers_statistics,
+    search_producers,
+    get_producer_details,
+    get_producers_by_city,
+    get_producers_with_waste_stats,
+    get_producer_by_id,
+    get_producer_types,
+    get_producer_wastes_detailed,
+)
+from backend_app.supervision.supervisor_queries import (
+    get_all_supervisors,
+    get_supervisors_by_type,
+    get_supervisor_centers,
+    get_supervisors_statistics,
+    search_supervisors,
+    get_supervisor_details,
+)
+from backend_app.tri_compostage.center_queries import (
+    get_all_sorting_centers,
+    get_sorting_centers_by_type,
+    get_center_wastes,
+    get_sorting_centers_statistics,
+    search_sorting_centers,
+    get_center_details,
+)
+
+load_dotenv()
+
+# Nombre de requêtes Fuseki exécutées en parallèle pour un lot (pool partagé par le processus)
+BATCH_MAX_WORKERS = int(os.environ.get("BATCH_MAX_WORKERS", "8"))
+# Nombre maximum d'opérations acceptées dans un lot
+BATCH_MAX_OPERATIONS = int(os.environ.get("BATCH_MAX_OPERATIONS", "20"))
+# Nombre maximum de questions acceptées dans un lot de questions en langage naturel
+BATCH_MAX_QUESTIONS = int(os.environ.get("BATCH_MAX_QUESTIONS", "5000"))
+
+# Opérations de lecture autorisées dans un lot (aucune écriture)
+BATCH_OPERATIONS = {function.__name__: function for function in (
+    get_all_classes,
+    get_class_properties,
+    get_all_producers,
+    get_producers_by_type,
+    get_producer_wastes,
+    get_producers_statistics,
+    search_producers,
+    get_producer_details,
+    get_producers_by_city,
+    get_producers_with_waste_stats,
+    get_producer_by_id,
+    get_producer_types,
+    get_producer_wastes_detailed,
+    get_all_supervisors,
+    get_supervisors_by_type,
+    get_supervisor_centers,
+    get_supervisors_statistics,
+    search_supervisors,
+    get_supervisor_details,
+    get_all_sorting_centers,
+    get_sorting_centers_by_type,
+    get_center_wastes,
+    get_sorting_centers_statistics,
+    search_sorting_centers,
+    get_center_details,
+)}
+
+_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="batch")
+
+
+class BatchError(ValueError):
+    """Lot invalide (format, nombre d'opérations, nom inconnu)"""
+
+
+def _run_operation(function, params):
+    start = time.perf_counter()
+    try:
+        result = function(**params)
+    except Exception as e:
+        result = {"status": "error", "message": str(e)}
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def parse_operations(operations):
+    """
+    Valide une liste [{"id": "...", "op": "get_producers_statistics", "params": {...}}]
+    et renvoie [(id, fonction, params)]. Lève BatchError si le lot est invalide.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise BatchError("Le champ 'operations' doit être une liste non vide")
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        raise BatchError(f"Trop d'opérations (maximum {BATCH_MAX_OPERATIONS})")
+
+    parsed = []
+    seen = set()
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise BatchError(f"Opération {index}: objet attendu")
+        name = operation.get("op")
+        function = BATCH_OPERATIONS.get(name)
+        if function is None:
+            raise BatchError(f"Opération {index}: '{name}' inconnue. Opérations valides: {', '.join(BATCH_OPERATIONS)}")
+        operation_id = str(operation.get("id") or name)
+        if operation_id in seen:
+            raise BatchError(f"Opération {index}: identifiant '{operation_id}' en double")
+        seen.add(operation_id)
+        params = operation.get("params") or {}
+        if not isinstance(params, dict):
+            raise BatchError(f"Opération {index}: 'params' doit être un objet")
+        try:
+            inspect.signature(function).bind(**params)
+        except TypeError as e:
+            raise BatchError(f"Opération {index} ({name}): paramètres invalides: {e}")
+        parsed.append((operation_id, function, params))
+    return parsed
+
+
+def run_batch(operations):
+    """
+    Exécute les opérations en parallèle (pool borné) et renvoie {id: résultat},
+    chaque résultat portant son propre statut et sa durée (duration_ms)
+    """
+    futures = [(operation_id, _executor.submit(_run_operation, function, params))
+               for operation_id, function, params in parse_operations(operations)]
+    return {operation_id: future.result() for operation_id, future in futures}
+
+
+def parse_questions(questions):
+    """Valide une liste de questions et renvoie les questions distinctes, dans l'ordre. Lève BatchError si le lot est invalide."""
+    if not isinstance(questions, list) or not questions:
+        raise BatchError("Le champ 'questions' doit être une liste non vide")
+    if len(questions) > BATCH_MAX_QUESTIONS:
+        raise BatchError(f"Trop de questions (maximum {BATCH_MAX_QUESTIONS})")
+    for index, question in enumerate(questions):
+        if not isinstance(question, str) or not question.strip():
+            raise BatchError(f"Question {index}: texte non vide attendu")
+    return list(dict.fromkeys(questions))
+
+
+def translate_questions(questions):
+    """
+    {question: (entities, sparql)} : questions déjà traduites lues dans le cache de traductions,
+    les autres analysées ensemble (extract_entities_versioned) puis mémorisées
+    """
+    translations = {}
+    missing = []
+    for question in questions:
+        cached = translation_cache.get(question)
+        if cached is None:
+            missing.append(question)
+        else:
+            translations[question] = cached
+    if missing:
+        # Lève ModelNotReady si les modèles sont encore en cours de chargement
+        wait_until_ready()
+        entities_list, version = extract_entities_versioned(missing)
+        for question, entities in zip(missing, entities_list):
+            sparql_query = generate_sparql_from_entities(entities)
+            if version is not None:
+                translation_cache.put(question, entities, sparql_query, version)
+            translations[question] = (entities, sparql_query)
+    return translations
+
+
+def _run_query(sparql_query, transform, size):
+    start = time.perf_counter()
+    result = run_page(fuseki_client, sparql_query, size)
+    if transform is not None:
+        result = transform(result)
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def run_question_batch(questions, execute=True, transform=None, size=NLP_PAGE_SIZE):
+    """
+    Traduit un lot de questions et exécute en parallèle (pool borné) chaque requête SPARQL distincte
+    une seule fois. Renvoie ({question: {"entities", "sparql", "result"}}, nombre de requêtes distinctes).
+    Chaque résultat est la première page de `size` lignes (suite avec next_cursor sur /api/nlp_query/).
+    `execute=False` ne fait que la traduction (tests de non-régression de l'analyseur) ;
+    `transform` est appliqué une fois au résultat de chaque requête (ex. to_columnar).
+    """
+    translations = translate_questions(parse_questions(questions))
+    queries = list(dict.fromkeys(sparql_query for _, sparql_query in translations.values()))
+    results = {}
+    if execute:
+        futures = [(sparql_query, _executor.submit(_run_query, sparql_query, transform, size)) for sparql_query in queries]
+        results = {sparql_query: future.result() for sparql_query, future in futures}
+    response = {}
+    for question, (entities, sparql_query) in translations.items():
+        response[question] = {"entities": entities, "sparql": sparql_query}
+        if execute:
+            response[question]["result"] = results[sparql_query]
+    return response, len(queries)
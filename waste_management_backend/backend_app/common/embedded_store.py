@@ -0,0 +1,196 @@
+import asyncio
+import io
+import json
+import os
+import threading
+
+from dotenv import load_dotenv
+from pyparsing import ParseException
+from rdflib import Graph
+from rdflib.plugins.sparql.results.jsonresults import JSONResultSerializer
+from rdflib.util import guess_format
+
+from backend_app.common.fuseki_transport import FusekiError, STREAM_CHUNK_SIZE
+
+load_dotenv()
+
+# Fichiers RDF (dump de l'ontologie et des individus) chargés au démarrage du store embarqué,
+# séparés par os.pathsep ; le format est déduit de l'extension (.ttl, .owl, .rdf, .nt, .jsonld...)
+EMBEDDED_STORE_DATA = os.environ.get("EMBEDDED_STORE_DATA", "")
+
+
+class ReadWriteLock:
+    """Verrou lecteurs/rédacteur : les lectures sont simultanées, une mise à jour est exclusive"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        with self._condition:
+            # Un rédacteur en attente passe avant les nouveaux lecteurs
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                while self._writing or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+
+    def release_write(self):
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+
+def load_graph(paths=EMBEDDED_STORE_DATA):
+    """
+    Graphe rdflib en mémoire (store Memory : index SPO, POS et OSP ;
+    SimpleMemory échoue sur DELETE WHERE, qui supprime pendant le parcours de ses index)
+    chargé avec les fichiers de `paths` (chaîne séparée par os.pathsep ou liste)
+    """
+    graph = Graph(store="Memory")
+    if isinstance(paths, str):
+        paths = [path for path in paths.split(os.pathsep) if path]
+    for path in paths:
+        graph.parse(path, format=guess_format(path) or "turtle")
+    return graph
+
+
+class EmbeddedTransport:
+    """
+    Transport sans réseau : exécute les requêtes SPARQL sur un graphe rdflib du processus.
+    Même interface que FusekiTransport (query, query_raw, query_stream, update, stats) ;
+    l'URL reçue est ignorée. Les erreurs de syntaxe lèvent FusekiError(400), les autres FusekiError(500),
+    comme le ferait Fuseki.
+    Le délai `timeout` est accepté mais ignoré : une requête rdflib ne peut pas être interrompue.
+    Les mises à jour restent en mémoire : elles ne sont pas écrites dans les fichiers chargés
+    et chaque processus (worker) a sa propre copie du graphe.
+    """
+
+    def __init__(self, graph=None, data=EMBEDDED_STORE_DATA):
+        self.graph = graph if graph is not None else load_graph(data)
+        self._rw_lock = ReadWriteLock()
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._updates = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    def _run(self, operation, write):
+        with self._lock:
+            self._requests += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        acquire, release = ((self._rw_lock.acquire_write, self._rw_lock.release_write) if write
+                            else (self._rw_lock.acquire_read, self._rw_lock.release_read))
+        acquire()
+        failed = True
+        try:
+            result = operation()
+            failed = False
+            return result
+        except ParseException as e:
+            raise FusekiError(400, f"Parse error: {e}")
+        except Exception as e:
+            raise FusekiError(500, f"{type(e).__name__}: {e}")
+        finally:
+            release()
+            with self._lock:
+                self._in_flight -= 1
+                if failed:
+                    self._errors += 1
+                elif write:
+                    self._updates += 1
+
+    def _select(self, sparql_query):
+        # Le résultat est sérialisé sous le verrou : rdflib évalue les lignes à la demande
+        buffer = io.StringIO()
+        JSONResultSerializer(self.graph.query(sparql_query)).serialize(buffer)
+        return buffer.getvalue().encode("utf-8")
+
+    def query(self, url, sparql_query, timeout=None):
+        """Execute une requête SPARQL (SELECT/ASK) et renvoie le JSON décodé"""
+        return json.loads(self.query_raw(url, sparql_query))
+
+    def query_raw(self, url, sparql_query, timeout=None):
+        """Execute une requête SPARQL (SELECT/ASK) et renvoie le corps JSON (bytes)"""
+        return self._run(lambda: self._select(sparql_query), write=False)
+
+    def query_stream(self, url, sparql_query, chunk_size=STREAM_CHUNK_SIZE, timeout=None):
+        """Même contrat que FusekiTransport.query_stream : erreurs levées avant la lecture"""
+        body = self.query_raw(url, sparql_query)
+        return (body[start:start + chunk_size] for start in range(0, len(body), chunk_size))
+
+    def update(self, url, sparql_update, timeout=None):
+        """Execute une requête SPARQL UPDATE sur le graphe"""
+        self._run(lambda: self.graph.update(sparql_update), write=True)
+
+    def stats(self):
+        """Compteurs d'utilisation du store embarqué"""
+        self._rw_lock.acquire_read()
+        try:
+            triples = len(self.graph)
+        finally:
+            self._rw_lock.release_read()
+        with self._lock:
+            return {
+                "backend": "embedded",
+                "triples": triples,
+                "requests": self._requests,
+                "updates": self._updates,
+                "errors": self._errors,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+            }
+
+
+class AsyncEmbeddedTransport:
+    """
+    Interface de AsyncFusekiTransport sur un EmbeddedTransport (exécuté dans un thread).
+    À l'échéance l'appelant est libéré, mais le thread termine la requête en cours.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+
+    async def query(self, url, sparql_query, timeout=None):
+        """Execute une requête SPARQL (SELECT/ASK) et renvoie le JSON décodé"""
+        return await asyncio.to_thread(self.transport.query, url, sparql_query)
+
+    async def query_raw(self, url, sparql_query, timeout=None):
+        """Execute une requête SPARQL (SELECT/ASK) et renvoie le corps JSON (bytes)"""
+        return await asyncio.to_thread(self.transport.query_raw, url, sparql_query)
+
+    async def query_stream(self, url, sparql_query, chunk_size=STREAM_CHUNK_SIZE, timeout=None):
+        """Version asynchrone de EmbeddedTransport.query_stream (générateur asynchrone de bytes)"""
+        body = await self.query_raw(url, sparql_query)
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    async def update(self, url, sparql_update, timeout=None):
+        """Execute une requête SPARQL UPDATE"""
+        await asyncio.to_thread(self.transport.update, url, sparql_update)
+
+    async def aclose(self):
+        """Rien à fermer : pas de connexion"""
+
+    def stats(self):
+        """Les compteurs sont ceux du transport synchrone partagé"""
+        return {"backend": "embedded", "shared_with": "transport"}
@@ -0,0 +1,106 @@
+from django.http import JsonResponse
+
+ONTO_NS = "http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#"
+XSD_NS = "http://www.w3.org/2001/XMLSchema#"
+
+# Préfixes utilisés pour compacter les URI (CURIE) dans le format colonnes
+PREFIXES = {
+    "onto": ONTO_NS,
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "xsd": XSD_NS,
+}
+_CURIE_BY_NS = {namespace: prefix for prefix, namespace in PREFIXES.items()}
+
+COLUMNAR_CONTENT_TYPE = "application/vnd.waste.columnar+json"
+
+_INTEGER_TYPES = {XSD_NS + name for name in (
+    "integer", "int", "long", "short", "byte", "nonNegativeInteger", "positiveInteger",
+    "nonPositiveInteger", "negativeInteger", "unsignedInt", "unsignedLong", "unsignedShort", "unsignedByte",
+)}
+_FLOAT_TYPES = {XSD_NS + name for name in ("decimal", "double", "float")}
+_BOOLEAN_TYPE = XSD_NS + "boolean"
+
+
+def wants_columnar(request):
+    """True si le client demande le format colonnes (?format=columnar ou en-tête Accept)"""
+    if request.GET.get("format") == "columnar":
+        return True
+    return COLUMNAR_CONTENT_TYPE in request.headers.get("Accept", "")
+
+
+def compact_uri(uri):
+    """Remplace l'espace de noms connu par son préfixe (onto:Producteur)"""
+    index = max(uri.rfind("#"), uri.rfind("/"))
+    prefix = _CURIE_BY_NS.get(uri[:index + 1])
+    return f"{prefix}:{uri[index + 1:]}" if prefix else uri
+
+
+def native_value(cell):
+    """Valeur JSON native d'une cellule SPARQL JSON (URI compactée, nombres et booléens typés)"""
+    kind = cell["type"]
+    value = cell["value"]
+    if kind == "uri":
+        return compact_uri(value)
+    if kind == "bnode":
+        return "_:" + value
+    datatype = cell.get("datatype")
+    if datatype is None:
+        return value
+    try:
+        if datatype in _INTEGER_TYPES:
+            return int(value)
+        if datatype in _FLOAT_TYPES:
+            return float(value)
+    except ValueError:
+        return value
+    if datatype == _BOOLEAN_TYPE:
+        return value in ("true", "1")
+    return value
+
+
+def to_columnar(result):
+    """
+    Convertit {"status", "data": <SPARQL JSON>} en colonnes :
+    {"columns": [...], "kinds": {col: "uri" | "literal" | "mixed"}, "rows": n, "values": {col: [...]}}.
+    Les variables non liées (OPTIONAL) valent null. Les autres réponses sont renvoyées telles quelles.
+    """
+    data = result.get("data") if result.get("status") == "success" else None
+    if not isinstance(data, dict) or "results" not in data:
+        return result
+    columns = list(data.get("head", {}).get("vars", []))
+    bindings = data["results"].get("bindings", [])
+    values = {column: [None] * len(bindings) for column in columns}
+    kinds = {column: None for column in columns}
+
+    for row_index, row in enumerate(bindings):
+        for column, cell in row.items():
+            if column not in values:
+                columns.append(column)
+                values[column] = [None] * len(bindings)
+                kinds[column] = None
+            values[column][row_index] = native_value(cell)
+            kind = "uri" if cell["type"] == "uri" else "literal"
+            if kinds[column] is None:
+                kinds[column] = kind
+            elif kinds[column] != kind:
+                kinds[column] = "mixed"
+
+    columnar = {key: value for key, value in result.items() if key != "data"}
+    columnar["format"] = "columnar"
+    columnar["prefixes"] = PREFIXES
+    columnar["data"] = {
+        "columns": columns,
+        "kinds": kinds,
+        "rows": len(bindings),
+        "values": values,
+    }
+    return columnar
+
+
+def sparql_response(request, result, **kwargs):
+    """JsonResponse d'un résultat SPARQL, au format colonnes si le client l'a demandé"""
+    if wants_columnar(request):
+        return JsonResponse(to_columnar(result), content_type=COLUMNAR_CONTENT_TYPE, **kwargs)
+    return JsonResponse(result, **kwargs)
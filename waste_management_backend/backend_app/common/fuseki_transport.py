@@ -0,0 +1,275 @@
+import asyncio
+import json
+import os
+import threading
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Taille du pool de connexions keep-alive par worker (par hôte Fuseki)
+FUSEKI_POOL_SIZE = int(os.environ.get("FUSEKI_POOL_SIZE", "10"))
+# Si activé, les threads attendent une connexion libre au lieu d'en ouvrir une en plus
+FUSEKI_POOL_BLOCK = os.environ.get("FUSEKI_POOL_BLOCK", "false").lower() == "true"
+FUSEKI_CONNECT_TIMEOUT = float(os.environ.get("FUSEKI_CONNECT_TIMEOUT", "3.05"))
+FUSEKI_READ_TIMEOUT = float(os.environ.get("FUSEKI_READ_TIMEOUT", "30"))
+# Nombre maximum de requêtes asynchrones simultanées vers Fuseki (par boucle d'évènements)
+FUSEKI_ASYNC_MAX_CONCURRENCY = int(os.environ.get("FUSEKI_ASYNC_MAX_CONCURRENCY", "256"))
+
+SPARQL_RESULTS_JSON = "application/sparql-results+json"
+# Taille des morceaux lus sur le flux de résultats en mode streaming
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class FusekiError(Exception):
+    """Erreur HTTP renvoyée par Fuseki (le message contient la réponse du serveur)"""
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+        super().__init__(f"Fuseki HTTP {status_code}: {body[:500]}")
+
+
+def query_form(sparql_query, timeout=None):
+    """Formulaire d'une requête ; le délai est transmis à Fuseki (paramètre timeout, en secondes)"""
+    data = {"query": sparql_query}
+    if timeout is not None:
+        data["timeout"] = f"{timeout:.3f}"
+    return data
+
+
+class FusekiTransport:
+    """Transport HTTP partagé vers Fuseki avec un pool de connexions persistantes"""
+
+    def __init__(self, pool_size=FUSEKI_POOL_SIZE, connect_timeout=FUSEKI_CONNECT_TIMEOUT,
+                 read_timeout=FUSEKI_READ_TIMEOUT, pool_block=FUSEKI_POOL_BLOCK):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=pool_block)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    def post(self, url, data, accept=None, stream=False, timeout=None):
+        """
+        POST un formulaire vers Fuseki et renvoie la réponse (lève FusekiError si non 2xx).
+        `timeout` (secondes) réduit les délais de connexion et de lecture configurés.
+        """
+        headers = {"Accept": accept} if accept else {}
+        if timeout is not None:
+            timeout = (min(self.timeout[0], timeout), min(self.timeout[1], timeout))
+        with self._lock:
+            self._requests += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            response = self.session.post(url, data=data, headers=headers,
+                                         timeout=timeout or self.timeout, stream=stream)
+            if response.status_code >= 400:
+                body = response.text
+                response.close()
+                raise FusekiError(response.status_code, body)
+            return response
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def query(self, url, sparql_query):
+        """Execute une requête SPARQL (SELECT/ASK) et renvoie le JSON décodé"""
+        return json.loads(self.query_raw(url, sparql_query))
+
+    def query_raw(self, url, sparql_query, timeout=None):
+        """Execute une requête SPARQL (SELECT/ASK) et renvoie le corps JSON brut"""
+        response = self.post(url, query_form(sparql_query, timeout), accept=SPARQL_RESULTS_JSON, timeout=timeout)
+        return response.content
+
+    def query_stream(self, url, sparql_query, chunk_size=STREAM_CHUNK_SIZE, timeout=None):
+        """
+        Execute une requête SPARQL et renvoie un itérateur sur le corps brut (bytes).
+        La requête est envoyée immédiatement : les erreurs HTTP sont levées avant la lecture.
+        """
+        response = self.post(url, query_form(sparql_query, timeout), accept=SPARQL_RESULTS_JSON,
+                             stream=True, timeout=timeout)
+
+        def chunks():
+            try:
+                yield from response.iter_content(chunk_size=chunk_size)
+            finally:
+                response.close()
+
+        return chunks()
+
+    def update(self, url, sparql_update, timeout=None):
+        """Execute une requête SPARQL UPDATE"""
+        response = self.post(url, {"update": sparql_update}, timeout=timeout)
+        response.close()
+
+    def stats(self):
+        """Compteurs d'utilisation du pool de connexions"""
+        opened = 0
+        reused = 0
+        idle = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            reused += max(pool.num_requests - pool.num_connections, 0)
+            if pool.pool is not None:
+                idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "requests": self._requests,
+                "errors": self._errors,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "connections_opened": opened,
+                "connections_reused": reused,
+                "idle_connections": idle,
+            }
+
+
+class AsyncFusekiTransport:
+    """Transport HTTP asynchrone vers Fuseki (httpx), utilisé par les vues async sous ASGI"""
+
+    def __init__(self, max_concurrency=FUSEKI_ASYNC_MAX_CONCURRENCY, connect_timeout=FUSEKI_CONNECT_TIMEOUT,
+                 read_timeout=FUSEKI_READ_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_concurrency,
+                                   max_keepalive_connections=max_concurrency)
+        # Un client et un sémaphore par boucle : ils ne peuvent pas être partagés entre boucles
+        self._loops = weakref.WeakKeyDictionary()
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._waiting = 0
+        self._peak_waiting = 0
+
+    def _timeout(self, timeout):
+        if timeout is None:
+            return self.timeout
+        return httpx.Timeout(min(self.read_timeout, timeout), connect=min(self.connect_timeout, timeout))
+
+    def _loop_state(self):
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            state = (client, asyncio.Semaphore(self.max_concurrency))
+            self._loops[loop] = state
+        return state
+
+    async def _acquire(self, semaphore):
+        with self._lock:
+            self._waiting += 1
+            self._peak_waiting = max(self._peak_waiting, self._waiting)
+        try:
+            await semaphore.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        with self._lock:
+            self._requests += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def _release(self, semaphore, failed):
+        semaphore.release()
+        with self._lock:
+            self._in_flight -= 1
+            if failed:
+                self._errors += 1
+
+    async def post(self, url, data, accept=None, timeout=None):
+        """POST un formulaire vers Fuseki et renvoie la réponse (lève FusekiError si non 2xx)"""
+        client, semaphore = self._loop_state()
+        headers = {"Accept": accept} if accept else {}
+        await self._acquire(semaphore)
+        failed = True
+        try:
+            response = await client.post(url, data=data, headers=headers, timeout=self._timeout(timeout))
+            if response.status_code >= 400:
+                raise FusekiError(response.status_code, response.text)
+            failed = False
+            return response
+        finally:
+            self._release(semaphore, failed)
+
+    async def query(self, url, sparql_query):
+        """Execute une requête SPARQL (SELECT/ASK) et renvoie le JSON décodé"""
+        return json.loads(await self.query_raw(url, sparql_query))
+
+    async def query_raw(self, url, sparql_query, timeout=None):
+        """Execute une requête SPARQL (SELECT/ASK) et renvoie le corps JSON brut"""
+        response = await self.post(url, query_form(sparql_query, timeout), accept=SPARQL_RESULTS_JSON,
+                                   timeout=timeout)
+        return response.content
+
+    async def query_stream(self, url, sparql_query, chunk_size=STREAM_CHUNK_SIZE, timeout=None):
+        """Version asynchrone de FusekiTransport.query_stream (générateur asynchrone de bytes)"""
+        client, semaphore = self._loop_state()
+        headers = {"Accept": SPARQL_RESULTS_JSON}
+        await self._acquire(semaphore)
+        failed = True
+        try:
+            async with client.stream("POST", url, data=query_form(sparql_query, timeout), headers=headers,
+                                     timeout=self._timeout(timeout)) as response:
+                if response.status_code >= 400:
+                    body = (await response.aread()).decode("utf-8", "replace")
+                    raise FusekiError(response.status_code, body)
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+            failed = False
+        except GeneratorExit:
+            # Lecture interrompue par le client : ce n'est pas une erreur Fuseki
+            failed = False
+            raise
+        finally:
+            # Le créneau reste pris tant que le flux est lu
+            self._release(semaphore, failed)
+
+    async def update(self, url, sparql_update, timeout=None):
+        """Execute une requête SPARQL UPDATE"""
+        await self.post(url, {"update": sparql_update}, timeout=timeout)
+
+    async def aclose(self):
+        """Ferme le client de la boucle courante"""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[0].aclose()
+
+    def stats(self):
+        """Compteurs d'utilisation du transport asynchrone"""
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "requests": self._requests,
+                "errors": self._errors,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "waiting": self._waiting,
+                "peak_waiting": self._peak_waiting,
+                "event_loops": len(self._loops),
+            }
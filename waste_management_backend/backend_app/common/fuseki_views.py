@@ -0,0 +1,35 @@
+"""
+Vues écrites une seule fois pour WSGI et ASGI : une méthode HTTP peut être un générateur d'appels Fuseki
+(voir sparql_utils.FusekiOperation), la lecture de la requête et la réponse sont communes.
+
+    class GetProducerWastesView(FusekiView):
+        def get(self, request):
+            ...
+            result = yield from get_producer_wastes.steps(producer_uri)
+            return sparql_response(request, result)
+
+FusekiView exécute les appels de façon synchrone ; asynchronous(GetProducerWastesView) est la même vue
+en version async (async_views.py), dont seuls les appels à Fuseki passent par les transports asynchrones.
+"""
+from django.views import View
+
+from backend_app.common.sparql_utils import arun_steps, run_steps
+
+
+class FusekiView(View):
+    """Vue dont les méthodes HTTP cèdent leurs appels à Fuseki"""
+
+    def dispatch(self, request, *args, **kwargs):
+        steps = super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return arun_steps(steps)
+        return run_steps(steps)
+
+
+def asynchronous(view_class):
+    """Version async (ASGI) d'une FusekiView : même nom, mêmes méthodes, appels à Fuseki non bloquants"""
+    return type(view_class.__name__, (view_class,), {
+        "__module__": view_class.__module__,
+        "__qualname__": view_class.__qualname__,
+        "view_is_async": True,
+    })
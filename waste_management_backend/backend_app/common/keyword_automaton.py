@@ -0,0 +1,83 @@
+"""
+Recherche simultanée de mots-clés (automate d'Aho-Corasick) : un seul passage sur le texte,
+quel que soit le nombre de mots-clés.
+"""
+
+
+def is_word_char(char):
+    """Caractère de mot au sens de \\w (lettre, chiffre ou _)"""
+    return char.isalnum() or char == "_"
+
+
+class KeywordHits:
+    """Mots-clés trouvés dans un texte : `anywhere` (sous-chaînes) et `words` (entre deux limites de mot, comme \\b...\\b)"""
+
+    __slots__ = ("anywhere", "words")
+
+    def __init__(self, anywhere, words):
+        self.anywhere = anywhere
+        self.words = words
+
+    def __contains__(self, keyword):
+        return keyword in self.anywhere
+
+    def word(self, keyword):
+        return keyword in self.words
+
+
+class KeywordAutomaton:
+    """
+    Automate construit une fois pour une liste de mots-clés. Les transitions sont complètes
+    (liens d'échec résolus à la construction) : une consultation de dictionnaire par caractère.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        goto = [{}]
+        outputs = [[]]
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].append(keyword)
+
+        # Parcours en largeur : lien d'échec = plus long suffixe propre présent dans l'arbre
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = list(goto[0].values())
+        for state in queue:
+            # Transitions de l'état d'échec, remplacées par celles propres à l'état
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+                queue.append(child)
+        self._delta = delta
+        self._outputs = [tuple((keyword, len(keyword)) for keyword in output) for output in outputs]
+
+    def scan(self, text):
+        """Mots-clés présents dans `text` (comparaison exacte : passer un texte déjà en minuscules)"""
+        delta = self._delta
+        outputs = self._outputs
+        anywhere = set()
+        words = set()
+        state = 0
+        last = len(text) - 1
+        for end, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if not outputs[state]:
+                continue
+            for keyword, length in outputs[state]:
+                anywhere.add(keyword)
+                if keyword in words:
+                    continue
+                start = end - length + 1
+                before = start > 0 and is_word_char(text[start - 1])
+                after = end < last and is_word_char(text[end + 1])
+                if before != is_word_char(keyword[0]) and after != is_word_char(keyword[-1]):
+                    words.add(keyword)
+        return KeywordHits(anywhere, words)
@@ -0,0 +1,163 @@
+"""
+Lexique des classes de l'analyseur : classes et libellés (rdfs:label) lus dans l'ontologie, complétés
+par la table de mots-clés class_lexicon.json, puis compilés en motifs du PhraseMatcher spaCy sans doublons.
+
+Le lexique est une valeur rechargée comme le vocabulaire (class_lexicon) : chaque rechargement construit
+un nouveau Lexicon, dont le PhraseMatcher est compilé avant l'échange quand spaCy est chargé. Une question est
+analysée avec un seul lexique de bout en bout ; aucun redémarrage des workers n'est nécessaire.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from backend_app.common.nlp_models import models
+from backend_app.common.query_templates import ONTO_NS, register
+from backend_app.common.sparql_utils import fuseki_client
+from backend_app.common.vocabulary import RefreshingSnapshot
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Table des mots-clés par classe, et classes utilisées tant que l'ontologie n'a pas été lue (relue à chaque rechargement)
+LEXICON_PATH = os.environ.get("LEXICON_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                           "class_lexicon.json"))
+
+
+def normalize_phrase(text):
+    """Mot-clé en minuscules, espaces compactés"""
+    return " ".join(text.lower().split())
+
+
+def read_lexicon_file(path=LEXICON_PATH):
+    """(classes, {classe: [mots-clés]}) du fichier ; lève une exception s'il est illisible ou mal formé"""
+    with open(path, encoding="utf-8") as source:
+        data = json.load(source)
+    classes = data.get("classes", [])
+    keywords = data.get("keywords", {})
+    if not (isinstance(classes, list) and all(isinstance(cls, str) for cls in classes)):
+        raise ValueError(f"{path}: 'classes' doit être une liste de noms de classes")
+    if not (isinstance(keywords, dict) and all(isinstance(texts, list) and all(isinstance(text, str) for text in texts)
+                                               for texts in keywords.values())):
+        raise ValueError(f"{path}: 'keywords' doit associer à chaque classe une liste de mots-clés")
+    return classes, keywords
+
+
+class Lexicon:
+    """
+    Classes connues et expressions de chaque classe (libellés puis mots-clés, sans doublons).
+    Le PhraseMatcher est compilé une fois par lexique : les motifs sont tokenisés par spaCy comme les questions
+    ("camion-benne" donne trois tokens) et un même motif n'est ajouté qu'une fois par classe.
+    """
+
+    def __init__(self, classes, keywords, labels=None, source="fichier"):
+        self.source = source
+        self.classes = list(dict.fromkeys([*classes, *keywords]))
+        self.duplicates = 0
+        phrases = {}
+        for table in (labels or {}, keywords):
+            for cls, texts in table.items():
+                entry = phrases.setdefault(cls, {})
+                for text in texts:
+                    phrase = normalize_phrase(text)
+                    if not phrase:
+                        continue
+                    if phrase in entry:
+                        self.duplicates += 1
+                    entry[phrase] = None
+        self.phrases = {cls: list(entry) for cls, entry in phrases.items() if entry}
+        # Mots-clés de classes absentes de l'ontologie : gardés, mais signalés
+        self.unknown_classes = sorted(set(keywords) - set(classes)) if source == "ontologie" else []
+        digest = hashlib.sha256(json.dumps([self.classes, self.phrases], ensure_ascii=False).encode("utf-8"))
+        self.fingerprint = digest.hexdigest()[:16]
+
+        self._lock = threading.Lock()
+        self._matcher = None
+        self.patterns = None
+        self.build_seconds = None
+
+    def __len__(self):
+        return len(self.classes)
+
+    def matcher(self, nlp):
+        """PhraseMatcher spaCy du lexique (sur LOWER), compilé au premier appel"""
+        if self._matcher is None:
+            with self._lock:
+                if self._matcher is None:
+                    self._matcher = self._compile(nlp)
+        return self._matcher
+
+    def _compile(self, nlp):
+        from spacy.matcher import PhraseMatcher
+
+        start = time.perf_counter()
+        # Motifs exacts sur LOWER : table de hachage, coût de recherche indépendant du nombre de motifs
+        matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        phrases = [(cls, phrase) for cls, texts in self.phrases.items() for phrase in texts]
+        docs = {}
+        for (cls, _), doc in zip(phrases, nlp.tokenizer.pipe(phrase for _, phrase in phrases)):
+            docs.setdefault(cls, {}).setdefault(tuple(token.lower_ for token in doc), doc)
+        patterns = 0
+        for cls, by_tokens in docs.items():
+            matcher.add(cls, list(by_tokens.values()))
+            patterns += len(by_tokens)
+        self.patterns = patterns
+        self.build_seconds = round(time.perf_counter() - start, 4)
+        logger.info("Lexique %s compilé : %d motifs pour %d classes en %.3f s",
+                    self.fingerprint, patterns, len(docs), self.build_seconds)
+        return matcher
+
+    def stats(self):
+        return {
+            "source": self.source,
+            "fingerprint": self.fingerprint,
+            "classes": len(self.classes),
+            "phrases": sum(len(texts) for texts in self.phrases.values()),
+            "duplicates_dropped": self.duplicates,
+            "unknown_classes": self.unknown_classes,
+            "patterns": self.patterns,
+            "build_seconds": self.build_seconds,
+        }
+
+
+CLASS_LABELS_QUERY = register("class_labels", """
+SELECT ?class ?label WHERE {
+  ?class a owl:Class .
+  FILTER(isIRI(?class))
+  OPTIONAL { ?class rdfs:label ?label }
+}
+""")
+
+
+def load_class_lexicon():
+    """Lexique des classes de l'ontologie et du fichier de mots-clés ; lève une exception si Fuseki échoue"""
+    response = fuseki_client.execute_query(CLASS_LABELS_QUERY.bind())
+    if response["status"] != "success":
+        raise RuntimeError(response["message"])
+    classes = {}
+    for row in response["data"]["results"]["bindings"]:
+        iri = row["class"]["value"]
+        if not iri.startswith(ONTO_NS):
+            continue
+        labels = classes.setdefault(iri[len(ONTO_NS):], [])
+        if "label" in row:
+            labels.append(row["label"]["value"])
+    _, keywords = read_lexicon_file()
+    lexicon = Lexicon(classes, keywords, classes, source="ontologie")
+    if lexicon.unknown_classes:
+        logger.info("Mots-clés de classes absentes de l'ontologie: %s", ", ".join(lexicon.unknown_classes))
+    if models.ready("spacy"):
+        # Compilé ici, dans le thread de rechargement : aucune requête n'attend la compilation
+        lexicon.matcher(models.get("spacy"))
+    return lexicon
+
+
+# Rechargé après toute écriture sur les classes ou leurs libellés, et passé VOCABULARY_TTL (fichier relu)
+class_lexicon = RefreshingSnapshot("class_lexicon", CLASS_LABELS_QUERY.text, load_class_lexicon,
+                                   Lexicon(*read_lexicon_file()))
+fuseki_client.add_update_listener(class_lexicon.on_update)
@@ -0,0 +1,166 @@
+"""
+Accès à l'analyseur depuis les workers web. Avec NLP_SERVER_URL, les questions sont envoyées au
+serveur NLP (python manage.py runnlpserver) et aucun modèle n'est chargé dans le worker ;
+sinon l'analyseur (ai_parser) tourne dans le processus, comme avant.
+"""
+import os
+import threading
+
+import httpx
+import numpy as np
+from dotenv import load_dotenv
+
+from backend_app.common import ai_parser
+from backend_app.common.lexicon import class_lexicon
+from backend_app.common.nlp_models import ModelNotReady, models
+from backend_app.common.query_cache import QueryDependencies
+from backend_app.common.sparql_utils import fuseki_client
+from backend_app.common.vocabulary import class_hierarchy
+
+load_dotenv()
+
+# Serveur NLP : "unix:/chemin/nlp.sock" ou "http://127.0.0.1:8765" ; vide = modèles dans chaque worker
+NLP_SERVER_URL = os.environ.get("NLP_SERVER_URL", "")
+# Délai maximal d'une réponse du serveur NLP (secondes)
+NLP_SERVER_TIMEOUT = float(os.environ.get("NLP_SERVER_TIMEOUT", "30"))
+
+
+class NLPServerUnavailable(ModelNotReady):
+    """Serveur NLP injoignable, ou dont les modèles sont en cours de chargement"""
+
+    def __init__(self, message):
+        self.name = "nlp_server"
+        self.error = message
+        Exception.__init__(self, f"Serveur NLP indisponible: {message}")
+
+
+class NLPClient:
+    """Client HTTP (socket Unix ou TCP local) du serveur NLP ; les connexions sont réutilisées"""
+
+    def __init__(self, url=NLP_SERVER_URL, timeout=NLP_SERVER_TIMEOUT):
+        self.url = url
+        if url.startswith("unix:"):
+            transport = httpx.HTTPTransport(uds=url[len("unix:"):])
+            base_url = "http://nlp-server"
+        else:
+            transport = httpx.HTTPTransport()
+            base_url = url
+        self._http = httpx.Client(base_url=base_url, transport=transport, timeout=timeout)
+        self._lock = threading.Lock()
+        # (empreinte du lexique du worker, dernier parser_version() rapporté par le serveur)
+        self._parser_version = (None, None)
+
+    def _request(self, method, path, payload=None):
+        try:
+            response = self._http.request(method, path, json=payload)
+            body = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise NLPServerUnavailable(f"{type(e).__name__}: {e}")
+        if response.status_code == 503:
+            raise NLPServerUnavailable(body.get("message", "modèles en cours de chargement"))
+        if body.get("status") != "success":
+            raise RuntimeError(f"Serveur NLP: {body.get('message', response.status_code)}")
+        return body
+
+    def extract_entities_batch(self, questions):
+        return self.extract(questions)[0]
+
+    def extract(self, questions):
+        """(entités des questions, parser_version() du lexique du serveur qui les a extraites, ou None)"""
+        body = self._request("POST", "/extract", {"questions": list(questions)})
+        version = body.get("parser_version")
+        if version is not None:
+            with self._lock:
+                self._parser_version = (class_lexicon.get().fingerprint, version)
+        return body["entities"], version
+
+    def parser_version(self):
+        """
+        Dernier parser_version() rapporté par le serveur. None tant qu'aucune réponse n'est arrivée,
+        ou si le lexique du worker a changé depuis : celui du serveur a pu changer aussi
+        """
+        fingerprint, version = self._parser_version
+        return version if fingerprint == class_lexicon.get().fingerprint else None
+
+    def reload(self):
+        """Demande au serveur de recharger son lexique des classes"""
+        self._request("POST", "/reload")
+
+    def encode(self, texts):
+        """Vecteurs normalisés des textes (calculés par le serveur)"""
+        return np.asarray(self._request("POST", "/encode", {"texts": list(texts)})["vectors"], dtype=np.float32)
+
+    def health(self):
+        return self._request("GET", "/health")
+
+
+remote = NLPClient() if NLP_SERVER_URL else None
+
+
+def _on_update(sparql_update):
+    # Écriture faite par ce worker sur les classes ou leurs libellés : le serveur recharge aussi son lexique
+    if remote is not None and class_lexicon.dependencies.conflicts_with(QueryDependencies(sparql_update)):
+        remote.reload()
+
+
+fuseki_client.add_update_listener(_on_update)
+
+
+def translation_version(parser=None):
+    """
+    ai_parser.translation_version() des traductions de ce worker. Avec un serveur NLP, les entités viennent du
+    lexique du serveur : `parser` est le parser_version() renvoyé avec elles, par défaut le dernier rapporté
+    (None s'il n'est pas connu). La requête SPARQL est toujours générée par le worker.
+    """
+    if remote is None:
+        return ai_parser.translation_version()
+    parser = parser or remote.parser_version()
+    return ai_parser.translation_version(parser) if parser else None
+
+
+def extract_entities(question):
+    if remote is not None:
+        return remote.extract_entities_batch([question])[0]
+    return ai_parser.extract_entities(question)
+
+
+def extract_entities_batch(questions):
+    if remote is not None:
+        return remote.extract_entities_batch(questions)
+    return ai_parser.extract_entities_batch(questions)
+
+
+def extract_entities_versioned(questions):
+    """(entités des questions, translation_version() de ces traductions, None si elle est inconnue)"""
+    if remote is not None:
+        entities, parser = remote.extract(questions)
+        return entities, translation_version(parser) if parser else None
+    version = ai_parser.translation_version()
+    entities = ai_parser.extract_entities_batch(questions)
+    return entities, version if ai_parser.translation_version() == version else None
+
+
+def wait_until_ready():
+    """Attend les modèles locaux ; avec un serveur NLP, c'est le serveur qui répond 503 tant qu'ils chargent"""
+    if remote is None:
+        ai_parser.wait_until_ready()
+
+
+def warm_up():
+    """Démarrage d'un worker web : modèles locaux, ou seulement le lexique et la hiérarchie des classes (clés du cache, génération SPARQL)"""
+    if remote is None:
+        ai_parser.warm_up_models()
+    else:
+        class_lexicon.start()
+        class_hierarchy.start()
+
+
+def stats():
+    """État des modèles locaux, ou du serveur NLP"""
+    if remote is None:
+        return models.stats()
+    try:
+        health = remote.health()
+    except Exception as e:
+        return {"server": remote.url, "error": str(e)}
+    return {"server": remote.url, "pid": health["pid"], "parser_version": health["parser_version"], "models": health["models"], "batches": health["batches"]}
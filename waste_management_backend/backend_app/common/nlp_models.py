@@ -0,0 +1,175 @@
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+NLP_SPACY_MODEL = os.environ.get("NLP_SPACY_MODEL", "fr_core_news_sm")
+# Composants du pipeline spaCy non chargés : l'analyseur n'utilise que le tokenizer (attribut LOWER)
+NLP_SPACY_EXCLUDE = os.environ.get("NLP_SPACY_EXCLUDE", "tok2vec,morphologizer,parser,senter,attribute_ruler,lemmatizer,ner")
+# Nombre de questions tokenisées ensemble par nlp.pipe en mode lot
+NLP_BATCH_SIZE = int(os.environ.get("NLP_BATCH_SIZE", "64"))
+NLP_SENTENCE_MODEL = os.environ.get("NLP_SENTENCE_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+# Modèles chargés en arrière-plan au démarrage du serveur (wsgi.py / asgi.py), séparés par des virgules ;
+# "all" pour tous, vide pour aucun (chargement au premier usage) ; ajouter vector_index avec NLP_SEMANTIC_FALLBACK
+NLP_WARMUP = os.environ.get("NLP_WARMUP", "spacy,matcher")
+# Attente maximale d'une requête NLP pendant le chargement des modèles (secondes)
+NLP_READY_TIMEOUT = float(os.environ.get("NLP_READY_TIMEOUT", "30"))
+
+
+class ModelNotReady(Exception):
+    """Modèle encore en cours de chargement, ou dont le chargement a échoué"""
+
+    def __init__(self, name, error=None):
+        self.name = name
+        self.error = error
+        if error is None:
+            message = f"Modèle NLP '{name}' en cours de chargement"
+        else:
+            message = f"Échec du chargement du modèle NLP '{name}': {error}"
+        super().__init__(message)
+
+
+class LazyModel:
+    """
+    Modèle chargé une seule fois : au premier get(), ou dans un thread de préchauffage (start()).
+    Un chargement en échec n'est pas mémorisé : l'appel suivant réessaie.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._attempt_done = threading.Event()
+        self._thread = None
+        self._value = None
+        self.error = None
+        self.load_seconds = None
+
+    @property
+    def ready(self):
+        return self._loaded.is_set()
+
+    def get(self):
+        """Le modèle, chargé dans le thread appelant s'il ne l'est pas encore"""
+        if self._loaded.is_set():
+            return self._value
+        with self._lock:
+            if not self._loaded.is_set():
+                start = time.perf_counter()
+                try:
+                    self._value = self.loader()
+                    self.error = None
+                    self.load_seconds = round(time.perf_counter() - start, 3)
+                    self._loaded.set()
+                except Exception as e:
+                    self.error = f"{type(e).__name__}: {e}"
+                    raise
+                finally:
+                    # Après _loaded : wait() réveillé par la fin de la tentative voit le modèle prêt
+                    self._attempt_done.set()
+        return self._value
+
+    def _load_in_background(self):
+        try:
+            self.get()
+        except Exception:
+            logger.exception("Chargement du modèle NLP %s impossible", self.name)
+        finally:
+            # Le modèle a pu être chargé par un autre thread pendant l'attente du verrou
+            self._attempt_done.set()
+
+    def start(self):
+        """Lance le chargement dans un thread (sans effet si le modèle est chargé ou en cours de chargement)"""
+        with self._state_lock:
+            if self._loaded.is_set() or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._attempt_done.clear()
+            self._thread = threading.Thread(target=self._load_in_background,
+                                            name=f"nlp-warmup-{self.name}", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout):
+        """Attend la fin du chargement en cours ; True si le modèle est prêt"""
+        self._attempt_done.wait(timeout)
+        return self._loaded.is_set()
+
+    def stats(self):
+        loading = self._thread is not None and self._thread.is_alive()
+        return {
+            "ready": self.ready,
+            "loading": loading and not self.ready,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    """Modèles NLP du processus, par nom ; aucun n'est chargé à l'import"""
+
+    def __init__(self):
+        self._models = {}
+
+    def register(self, name, loader):
+        """Déclare un modèle ; `loader` est appelé sans argument au premier usage"""
+        model = LazyModel(name, loader)
+        self._models[name] = model
+        return model
+
+    def get(self, name):
+        return self._models[name].get()
+
+    def ready(self, name):
+        """True si le modèle est chargé (sans lancer son chargement)"""
+        return self._models[name].ready
+
+    def _names(self, names):
+        if isinstance(names, str):
+            names = list(self._models) if names.strip() == "all" else [name.strip() for name in names.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self._models]
+        if unknown:
+            raise ValueError(f"Modèles NLP inconnus: {', '.join(unknown)}. Modèles: {', '.join(self._models)}")
+        return names
+
+    def warm_up(self, names=NLP_WARMUP):
+        """Lance le chargement des modèles `names` (liste ou chaîne comme NLP_WARMUP) en arrière-plan"""
+        for name in self._names(names):
+            self._models[name].start()
+
+    def wait_ready(self, names, timeout=NLP_READY_TIMEOUT):
+        """Lance si besoin le chargement des modèles et les attend au plus `timeout` secondes (ModelNotReady sinon)"""
+        end = time.monotonic() + timeout
+        for name in self._names(names):
+            model = self._models[name]
+            if model.ready:
+                continue
+            model.start()
+            if not model.wait(max(end - time.monotonic(), 0)):
+                raise ModelNotReady(name, model.error)
+
+    def stats(self):
+        """État de chargement de chaque modèle"""
+        return {name: model.stats() for name, model in self._models.items()}
+
+
+def load_spacy():
+    import spacy
+    exclude = [name.strip() for name in NLP_SPACY_EXCLUDE.split(",") if name.strip()]
+    return spacy.load(NLP_SPACY_MODEL, exclude=exclude)
+
+
+def load_sentence_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(NLP_SENTENCE_MODEL)
+
+
+models = ModelRegistry()
+models.register("spacy", load_spacy)
+models.register("sentence_model", load_sentence_model)
@@ -0,0 +1,267 @@
+"""
+Serveur NLP local (python manage.py runnlpserver) : un processus possède les modèles spaCy et
+SentenceTransformer, les workers web l'interrogent (common/nlp_client.py) au lieu de charger
+chacun leur copie des modèles.
+
+    POST /extract {"questions": [...]}  -> {"status": "success", "entities": [...], "parser_version": "..."}
+    POST /encode  {"texts": [...]}      -> {"status": "success", "vectors": [[...], ...]}
+    POST /reload                        -> recharge le lexique des classes (écriture faite par un worker)
+    GET  /health                        -> état des modèles et des lots
+
+Les appels concurrents sont regroupés en lots (MicroBatcher) avant extract_entities_batch / encode.
+"""
+import concurrent.futures
+import json
+import logging
+import os
+import queue
+import resource
+import signal
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+from backend_app.common import ai_parser
+from backend_app.common.lexicon import class_lexicon
+from backend_app.common.nlp_models import NLP_BATCH_SIZE, ModelNotReady, models
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Attente maximale des appels suivants avant de traiter un lot (secondes)
+NLP_SERVER_BATCH_WAIT = float(os.environ.get("NLP_SERVER_BATCH_WAIT", "0.002"))
+# Taille maximale d'un corps de requête (octets)
+NLP_SERVER_MAX_BODY = int(os.environ.get("NLP_SERVER_MAX_BODY", str(8 * 1024 * 1024)))
+
+
+class MicroBatcher:
+    """
+    Regroupe les appels concurrents à une fonction de lot : chaque appel dépose ses éléments,
+    un thread les traite ensemble (au plus max_items, ou dès que max_wait est écoulé)
+    et rend à chaque appel ses propres résultats, dans l'ordre.
+    """
+
+    def __init__(self, name, function, max_items=NLP_BATCH_SIZE, max_wait=NLP_SERVER_BATCH_WAIT):
+        self.name = name
+        self.function = function
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._calls = 0
+        self._batches = 0
+        self._items = 0
+        self._largest = 0
+
+    def submit(self, items):
+        """Résultats de `function` pour `items`, calculés avec ceux des appels concurrents"""
+        items = list(items)
+        if not items:
+            return []
+        future = concurrent.futures.Future()
+        with self._lock:
+            # Thread démarré au premier appel : après un éventuel fork du serveur
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"batch-{self.name}", daemon=True)
+                self._thread.start()
+            self._calls += 1
+        self._queue.put((items, future))
+        return future.result()
+
+    def _collect(self):
+        jobs = [self._queue.get()]
+        count = len(jobs[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            jobs.append(job)
+            count += len(job[0])
+        return jobs, count
+
+    def _run(self):
+        while True:
+            jobs, count = self._collect()
+            with self._lock:
+                self._batches += 1
+                self._items += count
+                self._largest = max(self._largest, count)
+            try:
+                results = self.function([item for items, _ in jobs for item in items])
+            except Exception as e:
+                for _, future in jobs:
+                    future.set_exception(e)
+                continue
+            position = 0
+            for items, future in jobs:
+                future.set_result(results[position:position + len(items)])
+                position += len(items)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._largest,
+            }
+
+
+def encode_texts(texts):
+    vectors = models.get("sentence_model").encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    return [vector.tolist() for vector in vectors]
+
+
+extract_batcher = MicroBatcher("extract", ai_parser.extract_entities_batch)
+encode_batcher = MicroBatcher("encode", encode_texts)
+
+
+class NLPRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "NLPServer"
+
+    def address_string(self):
+        # Socket Unix : pas d'adresse IP
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 503:
+            self.send_header("Retry-After", "5")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._reply(status, {"status": "error", "message": message})
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._error(404, f"Chemin inconnu: {self.path}")
+        self._reply(200, {
+            "status": "success",
+            "pid": os.getpid(),
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+            "parser_version": ai_parser.parser_version(),
+            "models": models.stats(),
+            "batches": {"extract": extract_batcher.stats(), "encode": encode_batcher.stats()},
+        })
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > NLP_SERVER_MAX_BODY:
+            self.close_connection = True
+            return self._error(413, f"Corps trop volumineux (maximum {NLP_SERVER_MAX_BODY} octets)")
+        try:
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            return self._error(400, f"JSON invalide: {e}")
+
+        try:
+            if self.path == "/extract":
+                questions = data.get("questions")
+                if not isinstance(questions, list) or not all(isinstance(question, str) for question in questions):
+                    return self._error(400, "Le champ 'questions' doit être une liste de chaînes")
+                ai_parser.wait_until_ready()
+                version = ai_parser.parser_version()
+                entities = extract_batcher.submit(questions)
+                if ai_parser.parser_version() != version:
+                    # Lexique échangé pendant l'analyse : version inconnue, le worker ne mémorise pas ces traductions
+                    version = None
+                self._reply(200, {"status": "success", "entities": entities, "parser_version": version})
+            elif self.path == "/reload":
+                # Les écritures passent par les workers : ils signalent celles qui touchent aux classes
+                class_lexicon.refresh()
+                self._reply(200, {"status": "success"})
+            elif self.path == "/encode":
+                texts = data.get("texts")
+                if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                    return self._error(400, "Le champ 'texts' doit être une liste de chaînes")
+                models.wait_ready(["sentence_model"])
+                self._reply(200, {"status": "success", "vectors": encode_batcher.submit(texts)})
+            else:
+                self._error(404, f"Chemin inconnu: {self.path}")
+        except ModelNotReady as e:
+            self._error(503, str(e))
+        except Exception as e:
+            logger.exception("Erreur du serveur NLP sur %s", self.path)
+            self._error(500, str(e))
+
+
+class TCPNLPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class UnixNLPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(address):
+    """Serveur à l'écoute sur "unix:/chemin/socket" ou "hôte:port" """
+    if address.startswith("unix:"):
+        path = address[len("unix:"):]
+        if os.path.exists(path):
+            # Socket laissée par un serveur arrêté
+            os.unlink(path)
+        return UnixNLPServer(path, NLPRequestHandler)
+    host, _, port = address.rpartition(":")
+    return TCPNLPServer((host or "127.0.0.1", int(port)), NLPRequestHandler)
+
+
+def _serve(server):
+    # Modèles chargés dans chaque processus, après le fork (pas de threads hérités du parent)
+    ai_parser.warm_up_models()
+    server.serve_forever()
+
+
+def serve(address, workers=1):
+    """
+    Sert les requêtes NLP sur `address` avec `workers` processus partageant la même socket
+    (chaque processus charge une copie des modèles). Bloque jusqu'à l'arrêt (Ctrl+C ou SIGTERM).
+    """
+    server = make_server(address)
+    children = []
+    for _ in range(workers - 1):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                _serve(server)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        _serve(server)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+        server.server_close()
+        if address.startswith("unix:") and os.path.exists(address[len("unix:"):]):
+            os.unlink(address[len("unix:"):])
@@ -0,0 +1,126 @@
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+
+from dotenv import load_dotenv
+
+from backend_app.common.query_cache import normalize_query
+
+load_dotenv()
+
+# Nombre de lignes par page des requêtes générées, sans paramètre page_size
+NLP_PAGE_SIZE = int(os.environ.get("NLP_PAGE_SIZE", "100"))
+# Taille de page maximale acceptée (borne la taille d'une réponse)
+NLP_MAX_PAGE_SIZE = int(os.environ.get("NLP_MAX_PAGE_SIZE", "1000"))
+
+_SELECT = re.compile(r"^\s*SELECT\b", re.IGNORECASE | re.MULTILINE)
+_PROJECTION = re.compile(r"SELECT\s+(?:DISTINCT\s+|REDUCED\s+)?(.*?)\s*WHERE\b", re.IGNORECASE | re.DOTALL)
+_VARIABLE = re.compile(r"[?$]\w+")
+# Littéraux et IRI, retirés avant de chercher les variables
+_TERMS = re.compile(r'"(?:[^"\\]|\\.)*"|<[^<>\s]*>')
+
+
+class CursorError(ValueError):
+    """Curseur ou taille de page invalide"""
+
+
+def variables(text):
+    """Variables SPARQL de `text`, dans l'ordre d'apparition, hors littéraux et IRI"""
+    return list(dict.fromkeys(_VARIABLE.findall(_TERMS.sub(" ", text))))
+
+
+def order_variables(sparql_query):
+    """Variables projetées (toutes celles du motif pour SELECT *) : clé de tri stable des pages"""
+    select = _SELECT.search(sparql_query)
+    body = sparql_query[select.start():]
+    projection = _PROJECTION.match(body.lstrip())
+    if projection and projection.group(1).strip() != "*":
+        return variables(projection.group(1))
+    return variables(body)
+
+
+def page_size(value):
+    """Taille de page demandée (NLP_PAGE_SIZE par défaut), entre 1 et NLP_MAX_PAGE_SIZE"""
+    if value in (None, ""):
+        return NLP_PAGE_SIZE
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise CursorError(f"Taille de page invalide: {value!r}")
+    if not 1 <= size <= NLP_MAX_PAGE_SIZE:
+        raise CursorError(f"La taille de page doit être comprise entre 1 et {NLP_MAX_PAGE_SIZE}")
+    return size
+
+
+def _fingerprint(sparql_query):
+    return hashlib.sha256(normalize_query(sparql_query).encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(sparql_query, offset):
+    """Curseur opaque de la page commençant à `offset`, lié à la requête"""
+    payload = json.dumps({"q": _fingerprint(sparql_query), "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sparql_query):
+    """Position indiquée par le curseur ; CursorError s'il est illisible ou pris d'une autre requête"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(payload["o"])
+        fingerprint = payload["q"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise CursorError("Curseur invalide")
+    if fingerprint != _fingerprint(sparql_query) or offset < 0:
+        raise CursorError("Curseur invalide pour cette question (la traduction a changé ?)")
+    return offset
+
+
+def page_query(sparql_query, size, offset=0):
+    """
+    Page de `size` lignes à partir de `offset` : tri sur les variables projetées (pages stables)
+    et une ligne de plus que demandé pour savoir s'il reste une page
+    """
+    lines = [sparql_query.rstrip(), f"ORDER BY {' '.join(order_variables(sparql_query))}", f"LIMIT {size + 1}"]
+    if offset:
+        lines.append(f"OFFSET {offset}")
+    return "\n".join(lines)
+
+
+def count_query(sparql_query):
+    """Nombre total de lignes de la requête (sous-requête, mêmes PREFIX)"""
+    select = _SELECT.search(sparql_query)
+    prologue, body = sparql_query[:select.start()], sparql_query[select.start():].strip()
+    return f"{prologue}SELECT (COUNT(*) AS ?total) WHERE {{\n{body}\n}}"
+
+
+def run_page(client, sparql_query, size=NLP_PAGE_SIZE, cursor=None, count=False):
+    """
+    Exécute une page de `sparql_query` : résultat SPARQL habituel et clé "page"
+    (taille, position, next_cursor, total si `count`). Les pages et le total passent par le cache
+    de résultats du client, le total n'est donc calculé qu'une fois tant que les données ne changent pas.
+    """
+    offset = decode_cursor(cursor, sparql_query) if cursor else 0
+    result = client.execute_query(page_query(sparql_query, size, offset))
+    if result["status"] != "success":
+        return result
+    bindings = result["data"]["results"]["bindings"]
+    has_more = len(bindings) > size
+    del bindings[size:]
+    page = {
+        "size": size,
+        "offset": offset,
+        "rows": len(bindings),
+        "next_cursor": encode_cursor(sparql_query, offset + size) if has_more else None,
+    }
+    if count:
+        total = client.execute_query(count_query(sparql_query))
+        if total["status"] == "success":
+            page["total"] = int(total["data"]["results"]["bindings"][0]["total"]["value"])
+        else:
+            page["total"] = None
+            page["total_error"] = total["message"]
+    result["page"] = page
+    return result
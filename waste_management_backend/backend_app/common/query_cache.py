@@ -0,0 +1,290 @@
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Taille maximale du cache de résultats (octets de JSON), 0 pour le désactiver
+FUSEKI_CACHE_MAX_BYTES = int(os.environ.get("FUSEKI_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Durée de vie d'une entrée (seule borne de la péremption due aux écritures des autres processus
+# si FUSEKI_CACHE_SHARED est vide)
+FUSEKI_CACHE_TTL = float(os.environ.get("FUSEKI_CACHE_TTL", "300"))
+# Cache Django (settings.CACHES) partagé par les workers, où chaque écriture change le jeton d'invalidation ;
+# vide pour s'en passer (un seul processus)
+FUSEKI_CACHE_SHARED = os.environ.get("FUSEKI_CACHE_SHARED", "fuseki")
+
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+# IRI, littéraux et commentaires : on les traite avant de chercher les noms préfixés
+_TOKEN = re.compile(
+    r'(?P<iri><[^<>"\s]*>)'
+    r'|(?P<literal>"""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^\'\\]|\\.|\'(?!\'\'))*\'\'\''
+    r'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\')'
+    r'|(?P<comment>#[^\n]*)'
+)
+_PREFIX_DECL = re.compile(r'PREFIX\s+([A-Za-z][\w.-]*)?:\s*<>', re.IGNORECASE)
+# Types de littéraux (^^xsd:boolean) : ne désignent pas des ressources du graphe
+_DATATYPE = re.compile(r'\^\^\s*(?:<>|(?:[A-Za-z][\w.-]*)?:[\w-]*)')
+_PNAME = re.compile(r'(?<![\w?$:])([A-Za-z][\w.-]*)?:([A-Za-z_][\w-]*)?')
+_TERM = r'(?:<>|""|[?$]\w+|(?:[A-Za-z][\w.-]*)?:[\w-]*|\d[\w.]*)'
+# Motif dont le prédicat est une variable : peut toucher n'importe quel triplet de son sujet
+_VAR_PREDICATE = re.compile(r'(?:' + _TERM + r'|;)\s+[?$]\w+\s+' + _TERM)
+# Projections et tris ne contiennent pas de motifs de triplets
+_PROJECTION = re.compile(r'\bSELECT\b[^{]*?(?=\bWHERE\b|\{)|\b(?:ORDER|GROUP)\s+BY\b[^{}]*', re.IGNORECASE)
+_TYPE_PREDICATE = re.compile(r'(?:(?<=\s)a|<type>)(?=\s)')
+_OPEN_TYPE = re.compile(r'(?:(?<=\s)a|<type>)\s+[?$]\w+')
+
+
+def normalize_query(text):
+    """Clé de cache : requête sans commentaires, espaces compactés hors littéraux"""
+    parts = []
+    position = 0
+    for match in _TOKEN.finditer(text):
+        parts.append(" ".join(text[position:match.start()].split()))
+        if match.lastgroup != "comment":
+            parts.append(match.group(0))
+        position = match.end()
+    parts.append(" ".join(text[position:].split()))
+    return " ".join(part for part in parts if part)
+
+
+class QueryDependencies:
+    """IRI mentionnées par une requête, utilisées pour l'invalidation ciblée"""
+
+    __slots__ = ("iris", "wildcard", "uses_type", "open_type")
+
+    def __init__(self, text):
+        iris = []
+        skeleton = []
+        position = 0
+        for match in _TOKEN.finditer(text):
+            skeleton.append(text[position:match.start()])
+            if match.lastgroup == "iri":
+                if text[max(match.start() - 8, 0):match.start()].rstrip().endswith("^^"):
+                    position = match.end()
+                    continue
+                iris.append(match.group(0)[1:-1])
+                skeleton.append("<type>" if iris[-1] == RDF_TYPE else "<>")
+            elif match.lastgroup == "literal":
+                skeleton.append('""')
+            position = match.end()
+        skeleton.append(text[position:])
+        skeleton = "".join(skeleton)
+
+        # Les déclarations PREFIX ont été réduites à "PREFIX p: <>" : on retrouve leurs IRI dans l'ordre
+        prefixes = {}
+        declarations = list(_PREFIX_DECL.finditer(skeleton))
+        declared_iris = iter(iris[:len(declarations)])
+        for declaration in declarations:
+            prefixes[declaration.group(1) or ""] = next(declared_iris, "")
+        iris = iris[len(declarations):]
+        body = _DATATYPE.sub(" ", _PROJECTION.sub(" ", _PREFIX_DECL.sub(" ", skeleton)))
+
+        for match in _PNAME.finditer(body):
+            prefix, local = match.group(1) or "", match.group(2) or ""
+            # "onto:" seul (ex. STR(onto:)) désigne l'espace de noms, pas une ressource
+            if local and prefix in prefixes:
+                iris.append(prefixes[prefix] + local)
+
+        self.iris = frozenset(iri for iri in iris if iri != RDF_TYPE)
+        # "rdf:type" est omniprésent : on le suit à part pour ne pas tout invalider à chaque écriture
+        body = body.replace("rdf:type", "<type>")
+        self.uses_type = bool(_TYPE_PREDICATE.search(body))
+        self.open_type = bool(_OPEN_TYPE.search(body))
+        self.wildcard = bool(_VAR_PREDICATE.search(body)) or not (self.iris or self.uses_type)
+
+    def conflicts_with(self, other):
+        """True si une écriture décrite par `other` peut changer le résultat de cette requête"""
+        if self.wildcard or other.wildcard:
+            return True
+        if (self.open_type and other.uses_type) or (other.open_type and self.uses_type):
+            return True
+        return not self.iris.isdisjoint(other.iris)
+
+
+class _Entry:
+    __slots__ = ("body", "size", "expires_at", "dependencies")
+
+    def __init__(self, body, expires_at, dependencies):
+        self.body = body
+        self.size = len(body)
+        self.expires_at = expires_at
+        self.dependencies = dependencies
+
+
+class SharedGeneration:
+    """
+    Jeton d'invalidation partagé par les workers, dans le cache Django `alias` : chaque écriture le remplace
+    par une valeur unique. Un simple set suffit (pas d'incrément atomique) : deux écritures concurrentes
+    donnent deux jetons différents de celui que les autres processus ont vu.
+    """
+
+    KEY = "fuseki:query_cache:generation"
+
+    def __init__(self, alias=FUSEKI_CACHE_SHARED):
+        self.alias = alias
+        self.errors = 0
+
+    def _cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def _error(self, action, error):
+        self.errors += 1
+        if self.errors == 1:
+            logger.warning("Cache partagé '%s' indisponible (%s): %s", self.alias, action, error)
+
+    def current(self):
+        """Jeton actuel, ou None si le cache partagé ne répond pas"""
+        try:
+            return self._cache().get(self.KEY, "")
+        except Exception as e:
+            self._error("lecture", e)
+            return None
+
+    def change(self):
+        try:
+            self._cache().set(self.KEY, uuid.uuid4().hex, None)
+        except Exception as e:
+            self._error("écriture", e)
+
+
+class QueryCache:
+    """
+    Cache LRU (borné en octets) des réponses SPARQL brutes, invalidé par les écritures.
+    Les entrées sont stockées en JSON sérialisé : chaque lecture obtient sa propre copie.
+
+    Avec `shared` (SharedGeneration), chaque lecture et chaque stockage comparent d'abord le jeton partagé
+    à celui que le cache a vu : s'il a changé, un autre processus (ou celui-ci) a écrit, et toutes les
+    entrées sont supprimées. Si le cache partagé ne répond pas, le cache n'est ni lu ni rempli.
+    """
+
+    def __init__(self, max_bytes=FUSEKI_CACHE_MAX_BYTES, ttl=FUSEKI_CACHE_TTL, shared=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Incrémenté à chaque écriture : une lecture lancée avant une écriture ne doit pas être stockée
+        self.generation = 0
+        # Dernier jeton partagé vu (None : pas encore lu)
+        self._token = None
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0 and self.ttl > 0
+
+    def _sync(self):
+        """Vide le cache si le jeton partagé a changé ; False si le cache partagé ne répond pas"""
+        if self.shared is None:
+            return True
+        token = self.shared.current()
+        if token is None:
+            return False
+        with self._lock:
+            if token != self._token:
+                self._drop_all()
+                self._token = token
+        return True
+
+    def get(self, key):
+        """Renvoie la réponse brute en cache pour `key`, ou None"""
+        if not self._sync():
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.body
+
+    def put(self, key, query, body, generation):
+        """Stocke la réponse si aucune écriture n'a eu lieu depuis `generation`"""
+        if len(body) > self.max_bytes or not self._sync():
+            return
+        dependencies = QueryDependencies(query)
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(body, time.monotonic() + self.ttl, dependencies)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def invalidate(self, sparql_update):
+        """Supprime les entrées dont le résultat peut être modifié par cette mise à jour"""
+        dependencies = QueryDependencies(sparql_update)
+        with self._lock:
+            self.generation += 1
+            stale = [key for key, entry in self._entries.items()
+                     if entry.dependencies.conflicts_with(dependencies)]
+            for key in stale:
+                self._remove(key)
+            self._invalidations += len(stale)
+        if self.shared is not None:
+            # Le nouveau jeton n'est pas adopté ici : une écriture concurrente d'un autre processus a pu
+            # être écrasée, le prochain _sync vide donc aussi ce cache
+            self.shared.change()
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._drop_all()
+
+    def _drop_all(self):
+        self.generation += 1
+        self._invalidations += len(self._entries)
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def stats(self):
+        """Compteurs du cache de résultats"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "shared": self.shared.alias if self.shared is not None else None,
+                "shared_errors": self.shared.errors if self.shared is not None else 0,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
@@ -0,0 +1,189 @@
+import functools
+import inspect
+import re
+from decimal import Decimal, InvalidOperation
+
+from backend_app.common.query_cache import normalize_query
+
+ONTO_NS = "http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#"
+
+# Bloc PREFIX commun à tous les modèles
+PREFIXES = f"""
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX owl: <http://www.w3.org/2002/07/owl#>
+PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+PREFIX onto: <{ONTO_NS}>
+"""
+
+# Paramètre dans le texte d'un modèle : {{nom}}
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+# Caractères interdits dans un IRIREF SPARQL
+_INVALID_IRI = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+_LOCAL_NAME = re.compile(r"^[^\W\d][\w-]*$")
+_ESCAPES = {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_ESCAPE = re.compile(r'[\\"\n\r\t]')
+
+
+class TemplateError(ValueError):
+    """Valeur de paramètre invalide ou modèle inconnu"""
+
+
+def literal(value):
+    """Littéral chaîne SPARQL échappé : "..." """
+    return '"' + _ESCAPE.sub(lambda match: _ESCAPES[match.group(0)], str(value)) + '"'
+
+
+def iri(value):
+    """IRI SPARQL <...>, refusée si elle contient un caractère interdit"""
+    value = str(value)
+    if not value or _INVALID_IRI.search(value):
+        raise TemplateError(f"IRI invalide: {value!r}")
+    return f"<{value}>"
+
+
+def onto_name(value):
+    """Nom local de l'ontologie (classe, propriété ou individu) : onto:Nom"""
+    value = str(value)
+    if not _LOCAL_NAME.match(value):
+        raise TemplateError(f"Nom local invalide: {value!r}")
+    return f"onto:{value}"
+
+
+def iri_list(values):
+    """Suite d'IRI séparées par des espaces, pour un bloc VALUES"""
+    return " ".join(iri(value) for value in values)
+
+
+def literal_row(values):
+    """Ligne d'un bloc VALUES de littéraux chaînes ; None donne UNDEF (variable non liée)"""
+    return " ".join("UNDEF" if value is None else literal(value) for value in values)
+
+
+def integer(value):
+    try:
+        return f'"{int(value)}"^^xsd:integer'
+    except (TypeError, ValueError):
+        raise TemplateError(f"Entier invalide: {value!r}")
+
+
+def decimal(value):
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise TemplateError(f"Nombre invalide: {value!r}")
+    if not number.is_finite():
+        raise TemplateError(f"Nombre invalide: {value!r}")
+    return f'"{number}"^^xsd:decimal'
+
+
+def boolean(value):
+    """Booléen xsd ; accepte aussi les chaînes "true", "1" et "oui" comme vrai"""
+    if not isinstance(value, bool):
+        value = str(value).lower() in ("true", "1", "oui")
+    return '"true"^^xsd:boolean' if value else '"false"^^xsd:boolean'
+
+
+# Types de paramètres : fonction qui transforme la valeur en terme SPARQL sûr
+PARAM_TYPES = {
+    "iri": iri,
+    "string": literal,
+    "onto": onto_name,
+    "iris": iri_list,
+    "row": literal_row,
+    "integer": integer,
+    "decimal": decimal,
+    "boolean": boolean,
+}
+
+
+class BoundQuery(str):
+    """
+    Texte d'une requête obtenue à partir d'un modèle. Le modèle étant normalisé une fois
+    (normalize_query), ce texte sert directement de clé de cache, sans nouvelle normalisation.
+    """
+
+    template = None
+
+
+class QueryTemplate:
+    """
+    Requête SPARQL nommée, préparée une fois au chargement du module : bloc PREFIX ajouté,
+    texte normalisé et découpé autour des paramètres {{nom}}. bind() ne fait plus que
+    formater les valeurs (échappées selon leur type) et les assembler.
+    """
+
+    def __init__(self, name, body, **params):
+        unknown = set(params.values()) - set(PARAM_TYPES)
+        if unknown:
+            raise TemplateError(f"{name}: type de paramètre inconnu {', '.join(sorted(unknown))}")
+        self.name = name
+        self.params = params
+        text = normalize_query(PREFIXES + body)
+        pieces = _PLACEHOLDER.split(text)
+        # pieces = [texte, paramètre, texte, paramètre, ..., texte]
+        self._texts = pieces[0::2]
+        self._slots = pieces[1::2]
+        missing = set(self._slots) - set(params)
+        unused = set(params) - set(self._slots)
+        if missing or unused:
+            raise TemplateError(f"{name}: paramètres non déclarés {sorted(missing)} ou inutilisés {sorted(unused)}")
+        self.text = text
+
+    def bind(self, **values):
+        """Requête prête à exécuter (BoundQuery) ; lève TemplateError si une valeur est invalide ou manquante"""
+        if values.keys() != self.params.keys():
+            raise TemplateError(f"{self.name}: paramètres attendus {', '.join(self.params) or 'aucun'}")
+        terms = {name: PARAM_TYPES[kind](values[name]) for name, kind in self.params.items()}
+        parts = [self._texts[0]]
+        for slot, text in zip(self._slots, self._texts[1:]):
+            parts.append(terms[slot])
+            parts.append(text)
+        query = BoundQuery("".join(parts))
+        query.template = self.name
+        return query
+
+
+# Registre des modèles, par nom
+TEMPLATES = {}
+
+
+def register(name, body, **params):
+    """Déclare un modèle de requête (nom unique) et le renvoie"""
+    if name in TEMPLATES:
+        raise TemplateError(f"Modèle déjà déclaré: {name}")
+    template = QueryTemplate(name, body, **params)
+    TEMPLATES[name] = template
+    return template
+
+
+def render(name, **values):
+    """Lie les paramètres du modèle `name`"""
+    template = TEMPLATES.get(name)
+    if template is None:
+        raise TemplateError(f"Modèle inconnu: {name}")
+    return template.bind(**values)
+
+
+def template_errors(function):
+    """
+    Décorateur des fonctions de lecture : une valeur de paramètre refusée (TemplateError)
+    donne la réponse d'erreur habituelle {"status": "error", "message": ...} au lieu d'une exception
+    """
+    if inspect.isgeneratorfunction(function):
+        # Opération Fuseki (sparql_utils.fuseki_operation) : l'erreur survient pendant l'exécution du générateur
+        @functools.wraps(function)
+        def steps_wrapper(*args, **kwargs):
+            try:
+                return (yield from function(*args, **kwargs))
+            except TemplateError as e:
+                return {"status": "error", "message": str(e)}
+        return steps_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        try:
+            return function(*args, **kwargs)
+        except TemplateError as e:
+            return {"status": "error", "message": str(e)}
+    return wrapper
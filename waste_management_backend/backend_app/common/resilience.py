@@ -0,0 +1,271 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+import httpx
+import requests
+from dotenv import load_dotenv
+
+from backend_app.common.fuseki_transport import FusekiError
+
+load_dotenv()
+
+# Échéance de chaque opération (secondes), nouvelles tentatives comprises ;
+# pour les lectures elle est aussi transmise à Fuseki (paramètre timeout)
+FUSEKI_QUERY_DEADLINE = float(os.environ.get("FUSEKI_QUERY_DEADLINE", "10"))
+FUSEKI_UPDATE_DEADLINE = float(os.environ.get("FUSEKI_UPDATE_DEADLINE", "30"))
+# Nouvelles tentatives des lectures (idempotentes) après une erreur transitoire ; jamais pour les mises à jour
+FUSEKI_READ_RETRIES = int(os.environ.get("FUSEKI_READ_RETRIES", "2"))
+FUSEKI_RETRY_BASE_DELAY = float(os.environ.get("FUSEKI_RETRY_BASE_DELAY", "0.1"))
+FUSEKI_RETRY_MAX_DELAY = float(os.environ.get("FUSEKI_RETRY_MAX_DELAY", "1"))
+# Disjoncteur : ouvert après N erreurs transitoires consécutives, nouvel essai après FUSEKI_BREAKER_RESET secondes
+FUSEKI_BREAKER_FAILURES = int(os.environ.get("FUSEKI_BREAKER_FAILURES", "5"))
+FUSEKI_BREAKER_RESET = float(os.environ.get("FUSEKI_BREAKER_RESET", "30"))
+
+# Réponses HTTP d'un Fuseki surchargé ou indisponible (derrière un proxy)
+TRANSIENT_STATUSES = (502, 503, 504)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class DeadlineExceeded(FusekiError):
+    """Échéance de l'opération atteinte"""
+
+    def __init__(self, deadline):
+        self.status_code = 504
+        self.body = ""
+        Exception.__init__(self, f"Fuseki: échéance de {deadline:g} s dépassée")
+
+
+class CircuitOpenError(FusekiError):
+    """Disjoncteur ouvert : Fuseki n'est pas appelé"""
+
+    def __init__(self, retry_in):
+        self.status_code = 503
+        self.body = ""
+        Exception.__init__(self, f"Fuseki indisponible (disjoncteur ouvert, nouvel essai dans {retry_in:.1f} s)")
+
+
+def is_timeout(error):
+    return isinstance(error, (DeadlineExceeded, requests.Timeout, httpx.TimeoutException, asyncio.TimeoutError))
+
+
+def is_transient(error):
+    """Erreur due à l'état de Fuseki (réseau, délai, surcharge) et non à la requête elle-même"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, FusekiError):
+        return error.status_code in TRANSIENT_STATUSES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout, httpx.TransportError,
+                              asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur partagé par les threads d'un worker. Fermé : les appels passent.
+    Ouvert (après `failures` erreurs transitoires consécutives) : les appels échouent
+    immédiatement pendant `reset_timeout` secondes. Semi-ouvert : un seul appel de test passe,
+    son résultat referme ou rouvre le disjoncteur.
+    """
+
+    def __init__(self, failures=FUSEKI_BREAKER_FAILURES, reset_timeout=FUSEKI_BREAKER_RESET):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._opened = 0
+        self._rejected = 0
+
+    def before_call(self):
+        """Lève CircuitOpenError si l'appel ne doit pas être tenté"""
+        if self.failures <= 0:
+            return
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            retry_in = self._opened_at + self.reset_timeout - time.monotonic()
+            if self._state == OPEN and retry_in <= 0:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self._rejected += 1
+            raise CircuitOpenError(max(retry_in, 0.0))
+
+    def record(self, error=None):
+        """Résultat d'un appel autorisé par before_call (error=None : succès)"""
+        with self._lock:
+            self._probing = False
+            if error is None or not is_transient(error):
+                # Fuseki a répondu (même une erreur de syntaxe) : il est disponible
+                self._state = CLOSED
+                self._consecutive = 0
+                return
+            self._consecutive += 1
+            if self._state == HALF_OPEN or self._consecutive >= self.failures:
+                if self._state != OPEN:
+                    self._opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def abandon(self):
+        """Appel autorisé puis interrompu sans résultat (client parti) : libère l'appel de test"""
+        with self._lock:
+            self._probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive,
+                "failure_threshold": self.failures,
+                "reset_timeout": self.reset_timeout,
+                "opened": self._opened,
+                "rejected": self._rejected,
+            }
+
+
+class FusekiGuard:
+    """
+    Encadre les appels au transport : échéance par opération, nouvelles tentatives
+    (attente exponentielle avec gigue, lectures seulement) et disjoncteur.
+    L'opération reçoit le temps restant (secondes), à utiliser comme délai de l'appel.
+    """
+
+    def __init__(self, breaker=None, query_deadline=FUSEKI_QUERY_DEADLINE, update_deadline=FUSEKI_UPDATE_DEADLINE,
+                 retries=FUSEKI_READ_RETRIES, base_delay=FUSEKI_RETRY_BASE_DELAY, max_delay=FUSEKI_RETRY_MAX_DELAY):
+        self.breaker = breaker or CircuitBreaker()
+        self.query_deadline = query_deadline
+        self.update_deadline = update_deadline
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._timeouts = 0
+        self._deadlines_exceeded = 0
+
+    def _backoff(self, attempt):
+        # « Full jitter » : les workers ne relancent pas Fuseki tous au même instant
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _failed(self, error):
+        self.breaker.record(error)
+        if is_timeout(error):
+            with self._lock:
+                self._timeouts += 1
+                if isinstance(error, DeadlineExceeded):
+                    self._deadlines_exceeded += 1
+
+    def _next_delay(self, attempt, error, end, idempotent):
+        """Attente avant une nouvelle tentative, ou None s'il ne faut pas réessayer"""
+        if not idempotent or attempt >= self.retries or not is_transient(error):
+            return None
+        delay = self._backoff(attempt)
+        if time.monotonic() + delay >= end:
+            return None
+        with self._lock:
+            self._retries += 1
+        return delay
+
+    def call(self, operation, deadline, idempotent=False):
+        """Exécute operation(temps_restant) ; lève l'erreur de la dernière tentative"""
+        end = time.monotonic() + deadline
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                error = DeadlineExceeded(deadline)
+                self._failed(error)
+                raise error
+            try:
+                result = operation(remaining)
+            except Exception as e:
+                # Un délai de lecture qui atteint l'échéance est un dépassement d'échéance
+                error = DeadlineExceeded(deadline) if is_timeout(e) and time.monotonic() >= end else e
+                self._failed(error)
+                delay = self._next_delay(attempt, error, end, idempotent)
+                if delay is None:
+                    if error is e:
+                        raise
+                    raise error from e
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record()
+            return result
+
+    async def acall(self, operation, deadline, idempotent=False):
+        """Version asynchrone de call : operation(temps_restant) renvoie une coroutine, annulée à l'échéance"""
+        end = time.monotonic() + deadline
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            remaining = end - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise DeadlineExceeded(deadline)
+                try:
+                    result = await asyncio.wait_for(operation(remaining), remaining)
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(deadline)
+            except Exception as e:
+                error = DeadlineExceeded(deadline) if is_timeout(e) and time.monotonic() >= end else e
+                self._failed(error)
+                delay = self._next_delay(attempt, error, end, idempotent)
+                if delay is None:
+                    if error is e:
+                        raise
+                    raise error from e
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record()
+            return result
+
+    async def astream(self, open_stream, timeout):
+        """
+        Flux asynchrone protégé par le disjoncteur (sans nouvelle tentative : les octets déjà envoyés
+        ne peuvent pas être rejoués). Le résultat est enregistré à la réception du premier morceau.
+        """
+        self.breaker.before_call()
+        settled = False
+        try:
+            async for chunk in open_stream(timeout):
+                if not settled:
+                    settled = True
+                    self.breaker.record()
+                yield chunk
+            if not settled:
+                settled = True
+                self.breaker.record()
+        except Exception as e:
+            if not settled:
+                settled = True
+                self._failed(e)
+            raise
+        finally:
+            if not settled:
+                self.breaker.abandon()
+
+    def stats(self):
+        """État du disjoncteur et compteurs de délais et de nouvelles tentatives"""
+        with self._lock:
+            counters = {
+                "query_deadline": self.query_deadline,
+                "update_deadline": self.update_deadline,
+                "max_retries": self.retries,
+                "retries": self._retries,
+                "timeouts": self._timeouts,
+                "deadlines_exceeded": self._deadlines_exceeded,
+            }
+        return {"breaker": self.breaker.stats(), **counters}
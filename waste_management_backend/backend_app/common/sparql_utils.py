@@ -1,89 +1,298 @@
-from SPARQLWrapper import SPARQLWrapper, JSON, POST
+from asgiref.sync import sync_to_async
 from dotenv import load_dotenv
+import functools
+import inspect
+import json
+import logging
 import os
+
+from backend_app.common.fuseki_transport import AsyncFusekiTransport, FusekiError, FusekiTransport
+from backend_app.common.query_cache import FUSEKI_CACHE_SHARED, QueryCache, SharedGeneration, normalize_query
+from backend_app.common.query_templates import BoundQuery, register, template_errors
+from backend_app.common.resilience import FusekiGuard
+
 load_dotenv() 
+logger = logging.getLogger(__name__)
 FUSEKI_URL = os.environ.get("SPARQL_ENDPOINT")
+# "fuseki" : serveur Fuseki distant (HTTP) ; "embedded" : store rdflib dans le processus (EMBEDDED_STORE_DATA)
+SPARQL_BACKEND = os.environ.get("SPARQL_BACKEND", "fuseki").lower()
+SPARQL_BACKENDS = ("fuseki", "embedded")
+
+def make_transports(backend=SPARQL_BACKEND):
+    """Transports (synchrone, asynchrone) du backend SPARQL choisi"""
+    if backend == "embedded":
+        from backend_app.common.embedded_store import AsyncEmbeddedTransport, EmbeddedTransport
+        transport = EmbeddedTransport()
+        return transport, AsyncEmbeddedTransport(transport)
+    if backend != "fuseki":
+        raise ValueError(f"SPARQL_BACKEND invalide: '{backend}'. Backends valides: {', '.join(SPARQL_BACKENDS)}")
+    return FusekiTransport(), AsyncFusekiTransport()
+
+def cache_key(sparql_query):
+    """Clé de cache d'une requête ; le texte d'une requête issue d'un modèle est déjà une clé stable"""
+    if isinstance(sparql_query, BoundQuery):
+        return str(sparql_query)
+    return normalize_query(sparql_query)
 
 class FusekiClient:
-    def __init__(self):
-        self.query_endpoint = FUSEKI_URL + "/query"
-        self.update_endpoint = FUSEKI_URL + "/update"
+    """
+    Client SPARQL de l'application. Le backend est interchangeable : tout objet exposant
+    query_raw, query_stream, update et stats (FusekiTransport, EmbeddedTransport...)
+    peut servir de transport, avec son équivalent asynchrone.
+    Chaque appel passe par un FusekiGuard : échéance, nouvelles tentatives des lectures et disjoncteur.
+    """
+
+    def __init__(self, transport=None, async_transport=None, cache=None, backend=SPARQL_BACKEND, guard=None):
+        self.query_endpoint = (FUSEKI_URL or "") + "/query"
+        self.update_endpoint = (FUSEKI_URL or "") + "/update"
+        if transport is None:
+            # Transport partagé : connexions keep-alive réutilisées entre les requêtes,
+            # et transport non bloquant pour les vues async (ASGI)
+            transport, default_async_transport = make_transports(backend)
+            async_transport = async_transport or default_async_transport
+        self.transport = transport
+        self.async_transport = async_transport or AsyncFusekiTransport()
+        # Cache des résultats de lecture, invalidé par execute_update ; les workers partagent le serveur Fuseki,
+        # donc le jeton d'invalidation (le store embarqué est propre à chaque processus)
+        if cache is None:
+            shared = backend == "fuseki" and FUSEKI_CACHE_SHARED
+            cache = QueryCache(shared=SharedGeneration() if shared else None)
+        self.cache = cache
+        self.guard = guard or FusekiGuard()
+        # Fonctions appelées avec le texte de chaque mise à jour (données dérivées à rafraîchir)
+        self._update_listeners = []
+
+    def add_update_listener(self, listener):
+        """Enregistre listener(sparql_update), appelé après chaque mise à jour, même en échec"""
+        self._update_listeners.append(listener)
+
+    def _notify_update(self, sparql_update):
+        for listener in self._update_listeners:
+            try:
+                listener(sparql_update)
+            except Exception:
+                logger.exception("Écouteur de mise à jour en échec")
     
     def execute_query(self, sparql_query):
         """Execute une requête SPARQL SELECT"""
         try:
-            sparql = SPARQLWrapper(self.query_endpoint)
-            sparql.setQuery(sparql_query)
-            sparql.setReturnFormat(JSON)
-            results = sparql.query().convert()
-            return {"status": "success", "data": results}
+            key = cache_key(sparql_query) if self.cache.enabled else None
+            body = self.cache.get(key) if key else None
+            if body is None:
+                generation = self.cache.generation
+                body = self.guard.call(
+                    lambda timeout: self.transport.query_raw(self.query_endpoint, sparql_query, timeout=timeout),
+                    self.guard.query_deadline, idempotent=True)
+                if key:
+                    self.cache.put(key, sparql_query, body, generation)
+            return {"status": "success", "data": json.loads(body)}
+        except FusekiError as e:
+            return {"status": "error", "message": str(e), "http_status": e.status_code}
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
     def execute_update(self, sparql_update):
         """Execute une requête SPARQL UPDATE (INSERT)"""
         try:
-            sparql = SPARQLWrapper(self.update_endpoint)
-            sparql.setQuery(sparql_update)
-            sparql.setMethod(POST)
-            results = sparql.query()
+            self.guard.call(
+                lambda timeout: self.transport.update(self.update_endpoint, sparql_update, timeout=timeout),
+                self.guard.update_deadline)
+            return {"status": "success", "message": "Update executed successfully"}
+        except FusekiError as e:
+            return {"status": "error", "message": str(e), "http_status": e.status_code}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+        finally:
+            # Même en cas d'erreur (ex. timeout) la mise à jour a pu être appliquée
+            self.cache.invalidate(sparql_update)
+            self._notify_update(sparql_update)
+
+    def stream_query(self, sparql_query):
+        """
+        Execute une requête SPARQL SELECT sans charger le résultat en mémoire :
+        renvoie un itérateur sur le corps JSON brut (pas de cache), lève une exception en cas d'erreur.
+        L'échéance des lectures borne l'attente de chaque morceau, pas la durée totale du flux.
+        """
+        return self.guard.call(
+            lambda timeout: self.transport.query_stream(self.query_endpoint, sparql_query, timeout=timeout),
+            self.guard.query_deadline)
+
+    def astream_query(self, sparql_query):
+        """Version asynchrone de stream_query (générateur asynchrone)"""
+        return self.guard.astream(
+            lambda timeout: self.async_transport.query_stream(self.query_endpoint, sparql_query, timeout=timeout),
+            self.guard.query_deadline)
+
+    async def aexecute_query(self, sparql_query):
+        """Version asynchrone de execute_query"""
+        try:
+            key = cache_key(sparql_query) if self.cache.enabled else None
+            body = self.cache.get(key) if key else None
+            if body is None:
+                generation = self.cache.generation
+                body = await self.guard.acall(
+                    lambda timeout: self.async_transport.query_raw(self.query_endpoint, sparql_query, timeout=timeout),
+                    self.guard.query_deadline, idempotent=True)
+                if key:
+                    self.cache.put(key, sparql_query, body, generation)
+            return {"status": "success", "data": json.loads(body)}
+        except FusekiError as e:
+            return {"status": "error", "message": str(e), "http_status": e.status_code}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    async def aexecute_update(self, sparql_update):
+        """Version asynchrone de execute_update"""
+        try:
+            await self.guard.acall(
+                lambda timeout: self.async_transport.update(self.update_endpoint, sparql_update, timeout=timeout),
+                self.guard.update_deadline)
             return {"status": "success", "message": "Update executed successfully"}
+        except FusekiError as e:
+            return {"status": "error", "message": str(e), "http_status": e.status_code}
         except Exception as e:
             return {"status": "error", "message": str(e)}
+        finally:
+            self.cache.invalidate(sparql_update)
+            self._notify_update(sparql_update)
+
+    def stats(self):
+        """Compteurs d'utilisation du client Fuseki"""
+        return {
+            "transport": self.transport.stats(),
+            "async_transport": self.async_transport.stats(),
+            "cache": self.cache.stats(),
+            "resilience": self.guard.stats(),
+        }
 
 fuseki_client = FusekiClient()
 
+class FusekiCall:
+    """Appel cédé par une opération : run() l'exécute dans le code synchrone, arun() (coroutine) sous ASGI"""
+
+    __slots__ = ("run", "arun")
+
+    def __init__(self, run, arun):
+        self.run = run
+        self.arun = arun
+
+def select(sparql_query):
+    """Appel de execute_query (aexecute_query sous ASGI)"""
+    return FusekiCall(lambda: fuseki_client.execute_query(sparql_query),
+                      lambda: fuseki_client.aexecute_query(sparql_query))
+
+def update(sparql_update):
+    """Appel de execute_update (aexecute_update sous ASGI)"""
+    return FusekiCall(lambda: fuseki_client.execute_update(sparql_update),
+                      lambda: fuseki_client.aexecute_update(sparql_update))
+
+def blocking(function, *args, **kwargs):
+    """Appel d'une fonction synchrone (ex. écritures groupées par WriteBatcher), exécutée dans un thread sous ASGI"""
+    return FusekiCall(lambda: function(*args, **kwargs), lambda: sync_to_async(function)(*args, **kwargs))
+
+def run_steps(steps):
+    """
+    Exécute un générateur d'appels FusekiCall et renvoie sa valeur de retour : le résultat de chaque appel
+    est renvoyé au générateur, une exception y est relevée. Toute autre valeur est renvoyée telle quelle.
+    """
+    if not inspect.isgenerator(steps):
+        return steps
+    result, error = None, None
+    while True:
+        try:
+            call = steps.throw(error) if error is not None else steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            result, error = call.run(), None
+        except Exception as e:
+            result, error = None, e
+
+async def arun_steps(steps):
+    """Version asynchrone de run_steps (appels exécutés par arun())"""
+    if inspect.isawaitable(steps):
+        return await steps
+    if not inspect.isgenerator(steps):
+        return steps
+    result, error = None, None
+    while True:
+        try:
+            call = steps.throw(error) if error is not None else steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            result, error = await call.arun(), None
+        except Exception as e:
+            result, error = None, e
+
+class FusekiOperation:
+    """
+    Fonction d'accès à Fuseki écrite une seule fois pour les vues synchrones et async :
+    un générateur qui cède ses appels (select, update...) et reçoit leurs résultats.
+
+        @fuseki_operation
+        def get_all_classes():
+            return (yield select(all_classes_query()))
+
+    get_all_classes() l'exécute de façon synchrone, await get_all_classes.acall() sous ASGI,
+    et `yield from get_all_classes.steps()` l'enchaîne dans une autre opération ou une vue (fuseki_views).
+    """
+
+    def __init__(self, steps):
+        functools.update_wrapper(self, steps)
+        self.steps = steps
+
+    def __call__(self, *args, **kwargs):
+        return run_steps(self.steps(*args, **kwargs))
+
+    async def acall(self, *args, **kwargs):
+        return await arun_steps(self.steps(*args, **kwargs))
+
+def fuseki_operation(steps):
+    """Décorateur des opérations Fuseki (voir FusekiOperation)"""
+    return FusekiOperation(steps)
+
+TEST_CONNECTION_QUERY = "SELECT * WHERE { ?s ?p ?o } LIMIT 1"
+
+@fuseki_operation
 def test_sparql_connection():
     """Simple function to test if we can connect to Fuseki"""
-    try:
-        sparql = SPARQLWrapper(FUSEKI_URL + "/query")
-        sparql.setQuery("SELECT * WHERE { ?s ?p ?o } LIMIT 1")
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        return {"status": "success", "message": "Connected to Fuseki!", "data": results}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    result = yield select(TEST_CONNECTION_QUERY)
+    if result["status"] == "success":
+        result["message"] = "Connected to Fuseki!"
+    return result
+
+ALL_CLASSES_QUERY = register("all_classes", """
+SELECT DISTINCT ?class ?label WHERE {
+    ?class a owl:Class .
+    OPTIONAL { ?class rdfs:label ?label }
+}
+ORDER BY ?class
+""")
 
+def all_classes_query():
+    """Construit la requête SPARQL de get_all_classes"""
+    return ALL_CLASSES_QUERY.bind()
+
+@fuseki_operation
 def get_all_classes():
     """Récupère toutes les classes de l'ontologie"""
-    try:
-        sparql = SPARQLWrapper(FUSEKI_URL + "/query")
-        query = """
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        
-        SELECT DISTINCT ?class ?label WHERE {
-            ?class a owl:Class .
-            OPTIONAL { ?class rdfs:label ?label }
-        }
-        ORDER BY ?class
-        """
-        sparql.setQuery(query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        return {"status": "success", "data": results}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    return (yield select(all_classes_query()))
 
+CLASS_PROPERTIES_QUERY = register("class_properties", """
+SELECT DISTINCT ?property ?label WHERE {
+    ?property rdfs:domain {{class_uri}} .
+    OPTIONAL { ?property rdfs:label ?label }
+}
+ORDER BY ?property
+""", class_uri="iri")
+
+def class_properties_query(class_uri):
+    """Construit la requête SPARQL de get_class_properties"""
+    return CLASS_PROPERTIES_QUERY.bind(class_uri=class_uri)
+
+@fuseki_operation
+@template_errors
 def get_class_properties(class_uri):
     """Récupère les propriétés d'une classe spécifique"""
-    try:
-        sparql = SPARQLWrapper(FUSEKI_URL + "/query")
-        query = f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        
-        SELECT DISTINCT ?property ?label WHERE {{
-            ?property rdfs:domain <{class_uri}> .
-            OPTIONAL {{ ?property rdfs:label ?label }}
-        }}
-        ORDER BY ?property
-        """
-        sparql.setQuery(query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        return {"status": "success", "data": results}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+    return (yield select(class_properties_query(class_uri)))
@@ -0,0 +1,307 @@
+import codecs
+import json
+import os
+import re
+
+from django.http import JsonResponse, StreamingHttpResponse
+from dotenv import load_dotenv
+
+from backend_app.common.sparql_utils import FusekiCall, fuseki_client
+
+load_dotenv()
+
+STREAM_FORMATS = ("ndjson", "json", "sse")
+
+# Nombre maximal de lignes par événement "rows" en SSE (les lignes d'un même morceau reçu de Fuseki sont groupées)
+SSE_ROWS_PER_EVENT = int(os.environ.get("SSE_ROWS_PER_EVENT", "500"))
+
+_VARS = re.compile(r'"vars"\s*:\s*')
+_BINDINGS = re.compile(r'"bindings"\s*:\s*\[')
+_decoder = json.JSONDecoder()
+
+
+class BindingsParser:
+    """
+    Parseur incrémental d'une réponse SPARQL JSON (SELECT).
+    On lui donne le flux par morceaux avec feed(), il renvoie les lignes complètes
+    au fur et à mesure : seule la ligne en cours de lecture est gardée en mémoire.
+    """
+
+    def __init__(self):
+        self.vars = None
+        self.done = False
+        self._buffer = ""
+        self._in_bindings = False
+        self._text = codecs.getincrementaldecoder("utf-8")()
+
+    def feed(self, chunk):
+        """Ajoute un morceau (bytes) du corps et renvoie les lignes désormais complètes"""
+        self._buffer += self._text.decode(chunk)
+        rows = []
+        if not self._in_bindings:
+            if self.vars is None:
+                match = _VARS.search(self._buffer)
+                if match:
+                    try:
+                        self.vars, _ = _decoder.raw_decode(self._buffer, match.end())
+                    except json.JSONDecodeError:
+                        return rows
+            match = _BINDINGS.search(self._buffer)
+            if not match:
+                return rows
+            self._buffer = self._buffer[match.end():]
+            self._in_bindings = True
+
+        position = 0
+        buffer = self._buffer
+        while not self.done:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer):
+                break
+            if buffer[position] == "]":
+                self.done = True
+                break
+            try:
+                row, position = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Ligne incomplète : on attend le morceau suivant
+                break
+            rows.append(row)
+        self._buffer = buffer[position:]
+        return rows
+
+    def close(self):
+        """Vérifie que le flux s'est terminé sur la fin du tableau de bindings"""
+        self._buffer += self._text.decode(b"", final=True)
+        if not self.done:
+            raise ValueError("Réponse SPARQL JSON tronquée ou sans tableau 'bindings'")
+
+
+def iter_bindings(chunks, parser=None):
+    """Itère sur les lignes d'une réponse SPARQL JSON lue morceau par morceau"""
+    parser = parser or BindingsParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+
+
+async def aiter_bindings(chunks, parser=None):
+    """Version asynchrone de iter_bindings"""
+    parser = parser or BindingsParser()
+    async for chunk in chunks:
+        for row in parser.feed(chunk):
+            yield row
+    parser.close()
+
+
+def _ndjson_lines(vars, rows):
+    yield json.dumps({"head": {"vars": vars}}) + "\n"
+    try:
+        for row in rows:
+            yield json.dumps(row) + "\n"
+    except Exception as e:
+        yield json.dumps({"status": "error", "message": str(e)}) + "\n"
+
+
+def _json_chunks(vars, rows):
+    # Même forme que la réponse non streamée : {"status", "data": {"head", "results": {"bindings"}}}
+    yield '{"status": "success", "data": {"head": {"vars": %s}, "results": {"bindings": [' % json.dumps(vars)
+    error = None
+    try:
+        separator = ""
+        for row in rows:
+            yield separator + json.dumps(row)
+            separator = ", "
+    except Exception as e:
+        error = str(e)
+    if error is None:
+        yield "]}}}"
+    else:
+        yield "]}}, \"error\": %s}" % json.dumps(error)
+
+
+def _with_head(rows):
+    """Lit le flux jusqu'aux noms de variables, puis renvoie (vars, lignes)"""
+    parser = BindingsParser()
+    iterator = iter_bindings(rows, parser)
+    first = next(iterator, None)
+    head = [] if first is None else [first]
+
+    def all_rows():
+        yield from head
+        yield from iterator
+
+    return parser.vars or [], all_rows()
+
+
+def sse_event(event, data):
+    """Événement server-sent events ; json.dumps n'émet pas de saut de ligne, data tient sur une ligne"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class _SSERows:
+    """Découpe en événements head / rows / end les lignes lues morceau par morceau"""
+
+    def __init__(self, max_rows):
+        self.max_rows = max_rows
+        self.parser = BindingsParser()
+        self.head_sent = False
+        self.count = 0
+
+    def feed(self, chunk):
+        rows = self.parser.feed(chunk)
+        events = []
+        if not self.head_sent and (self.parser.vars is not None or rows):
+            events.append(sse_event("head", {"vars": self.parser.vars or []}))
+            self.head_sent = True
+        for start in range(0, len(rows), self.max_rows):
+            events.append(sse_event("rows", rows[start:start + self.max_rows]))
+        self.count += len(rows)
+        return events
+
+    def close(self):
+        self.parser.close()
+        events = [] if self.head_sent else [sse_event("head", {"vars": self.parser.vars or []})]
+        events.append(sse_event("end", {"status": "success", "rows": self.count}))
+        return events
+
+    def error(self, error):
+        return sse_event("error", {"status": "error", "message": str(error), "rows": self.count})
+
+
+def _sse_events(sparql_query, events, max_rows):
+    yield from (sse_event(event, data) for event, data in events)
+    rows = _SSERows(max_rows)
+    try:
+        for chunk in fuseki_client.stream_query(sparql_query):
+            yield from rows.feed(chunk)
+        yield from rows.close()
+    except Exception as e:
+        yield rows.error(e)
+
+
+def _sse_response(events):
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Pas de mise en tampon par un proxy nginx
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def sse_select_response(sparql_query, events=(), max_rows=SSE_ROWS_PER_EVENT):
+    """
+    Réponse text/event-stream : les `events` (nom, données) donnés, envoyés avant d'interroger Fuseki,
+    puis "head" (variables), un événement "rows" (liste de lignes) par morceau reçu de Fuseki, et "end"
+    (nombre de lignes) ou "error". La requête part à la lecture du flux : le client reçoit les premiers
+    événements sans attendre Fuseki.
+    """
+    return _sse_response(_sse_events(sparql_query, events, max_rows))
+
+
+def streaming_select_response(sparql_query, stream_format):
+    """
+    Exécute un SELECT et renvoie les lignes au fil de l'eau (NDJSON, tableau JSON découpé ou SSE).
+    Les erreurs Fuseki survenant avant le premier octet donnent une réponse JSON classique (événement "error" en SSE).
+    """
+    if stream_format not in STREAM_FORMATS:
+        return JsonResponse({
+            "status": "error",
+            "message": f"Format de streaming invalide. Formats valides: {', '.join(STREAM_FORMATS)}"
+        }, status=400)
+    if stream_format == "sse":
+        return sse_select_response(sparql_query)
+    try:
+        chunks = fuseki_client.stream_query(sparql_query)
+        vars, rows = _with_head(chunks)
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=502)
+
+    if stream_format == "ndjson":
+        return StreamingHttpResponse(_ndjson_lines(vars, rows), content_type="application/x-ndjson")
+    return StreamingHttpResponse(_json_chunks(vars, rows), content_type="application/json")
+
+
+async def _ahead(chunks):
+    parser = BindingsParser()
+    iterator = aiter_bindings(chunks, parser)
+    first = await anext(iterator, None)
+    head = [] if first is None else [first]
+
+    async def all_rows():
+        for row in head:
+            yield row
+        async for row in iterator:
+            yield row
+
+    return parser.vars or [], all_rows()
+
+
+async def _andjson_lines(vars, rows):
+    yield json.dumps({"head": {"vars": vars}}) + "\n"
+    try:
+        async for row in rows:
+            yield json.dumps(row) + "\n"
+    except Exception as e:
+        yield json.dumps({"status": "error", "message": str(e)}) + "\n"
+
+
+async def _ajson_chunks(vars, rows):
+    yield '{"status": "success", "data": {"head": {"vars": %s}, "results": {"bindings": [' % json.dumps(vars)
+    error = None
+    try:
+        separator = ""
+        async for row in rows:
+            yield separator + json.dumps(row)
+            separator = ", "
+    except Exception as e:
+        error = str(e)
+    if error is None:
+        yield "]}}}"
+    else:
+        yield "]}}, \"error\": %s}" % json.dumps(error)
+
+
+async def _asse_events(sparql_query, events, max_rows):
+    for event, data in events:
+        yield sse_event(event, data)
+    rows = _SSERows(max_rows)
+    try:
+        async for chunk in fuseki_client.astream_query(sparql_query):
+            for event in rows.feed(chunk):
+                yield event
+        for event in rows.close():
+            yield event
+    except Exception as e:
+        yield rows.error(e)
+
+
+def asse_select_response(sparql_query, events=(), max_rows=SSE_ROWS_PER_EVENT):
+    """Version asynchrone de sse_select_response"""
+    return _sse_response(_asse_events(sparql_query, events, max_rows))
+
+
+async def astreaming_select_response(sparql_query, stream_format):
+    """Version asynchrone de streaming_select_response (vues async sous ASGI)"""
+    if stream_format not in STREAM_FORMATS:
+        return JsonResponse({
+            "status": "error",
+            "message": f"Format de streaming invalide. Formats valides: {', '.join(STREAM_FORMATS)}"
+        }, status=400)
+    if stream_format == "sse":
+        return asse_select_response(sparql_query)
+    try:
+        chunks = fuseki_client.astream_query(sparql_query)
+        vars, rows = await _ahead(chunks)
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=502)
+
+    if stream_format == "ndjson":
+        return StreamingHttpResponse(_andjson_lines(vars, rows), content_type="application/x-ndjson")
+    return StreamingHttpResponse(_ajson_chunks(vars, rows), content_type="application/json")
+
+
+def streaming_select(sparql_query, stream_format):
+    """Appel cédé par une vue (fuseki_views) : streaming_select_response, ou astreaming_select_response sous ASGI"""
+    return FusekiCall(lambda: streaming_select_response(sparql_query, stream_format),
+                      lambda: astreaming_select_response(sparql_query, stream_format))
@@ -0,0 +1,175 @@
+"""
+Durée des étapes de chaque requête (extraction des entités, génération SPARQL, aller-retour Fuseki,
+encodage JSON...) : en-tête Server-Timing de la réponse et histogrammes par vue (/api/metrics/).
+
+    with stage("fuseki"):
+        results = fuseki_client.execute_query(query)
+
+Hors d'une requête (commandes, benchmarks), stage() ne mesure rien.
+"""
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# En-tête Server-Timing sur les réponses (les histogrammes sont tenus dans tous les cas)
+SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", "true").lower() == "true"
+
+# Bornes supérieures des classes des histogrammes (ms), la dernière classe est illimitée
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_current = contextvars.ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    """Durées (ms) des étapes d'une requête, dans l'ordre de leur première mesure ; une étape répétée est cumulée"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    def add(self, name, duration_ms):
+        self.stages[name] = self.stages.get(name, 0.0) + duration_ms
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def header(self, total_ms):
+        """Valeur de l'en-tête Server-Timing : "extract;dur=1.2, fuseki;dur=8.4, total;dur=10.3" """
+        metrics = [f"{name};dur={duration:.2f}" for name, duration in self.stages.items()]
+        metrics.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(metrics)
+
+
+def current_timing():
+    """Mesures de la requête en cours (None hors requête)"""
+    return _current.get()
+
+
+@contextmanager
+def stage(name):
+    """Ajoute la durée du bloc à l'étape `name` de la requête en cours"""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, (time.perf_counter() - start) * 1000)
+
+
+class Histogram:
+    """Histogramme à classes fixes (BUCKETS_MS) : percentiles approchés par la borne de la classe"""
+
+    __slots__ = ("counts", "count", "sum_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.sum_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, fraction):
+        """Borne supérieure de la classe contenant le percentile (max observé pour la dernière classe)"""
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else round(self.max_ms, 2)
+        return 0.0
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": {f"le_{bound}": count for bound, count in zip(BUCKETS_MS + ("inf",), self.counts)},
+        }
+
+
+class TimingHistograms:
+    """Histogrammes par vue et par étape, cumulés depuis le démarrage du processus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, stages, total_ms):
+        with self._lock:
+            histograms = self._views.setdefault(view, {})
+            for name, duration in (*stages.items(), ("total", total_ms)):
+                histogram = histograms.get(name)
+                if histogram is None:
+                    histogram = histograms[name] = Histogram()
+                histogram.observe(duration)
+
+    def stats(self):
+        with self._lock:
+            return {view: {name: histogram.stats() for name, histogram in histograms.items()}
+                    for view, histograms in self._views.items()}
+
+
+timing_histograms = TimingHistograms()
+
+
+def _finish(request, timing, response):
+    total = timing.total_ms()
+    match = getattr(request, "resolver_match", None)
+    view = match.url_name if match is not None and match.url_name else "other"
+    timing_histograms.record(view, timing.stages, total)
+    if SERVER_TIMING_HEADER:
+        # Réponses en flux : l'en-tête part avant le corps, "total" s'arrête à la création de la réponse
+        response["Server-Timing"] = timing.header(total)
+    return response
+
+
+class ServerTimingMiddleware:
+    """Ouvre les mesures de chaque requête, ajoute l'en-tête Server-Timing et alimente les histogrammes"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return _finish(request, timing, response)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return _finish(request, timing, response)
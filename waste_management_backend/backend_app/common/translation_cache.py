@@ -0,0 +1,230 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.db import DatabaseError
+from django.utils import timezone
+from dotenv import load_dotenv
+
+from backend_app.common import ai_parser, nlp_client
+from backend_app.common.nlp_models import NLP_SENTENCE_MODEL
+from backend_app.common.vector_index import VECTOR_INDEX_MIN_SCORE
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Nombre de traductions gardées en mémoire (par worker), 0 pour désactiver le cache
+TRANSLATION_CACHE_SIZE = int(os.environ.get("TRANSLATION_CACHE_SIZE", "1000"))
+# Niveau persistant dans la base SQLite du projet (partagé par les workers, conservé au redémarrage)
+TRANSLATION_CACHE_PERSIST = os.environ.get("TRANSLATION_CACHE_PERSIST", "true").lower() == "true"
+# Âge (jours) au-delà duquel python manage.py purgetranslations supprime une traduction persistante
+TRANSLATION_CACHE_MAX_AGE_DAYS = float(os.environ.get("TRANSLATION_CACHE_MAX_AGE_DAYS", "30"))
+
+
+def fold_question(question):
+    """
+    Question en minuscules, telle que la lisent les mots-clés et le PhraseMatcher (attribut LOWER).
+    Accents et espaces sont gardés : "affectes a" et "affectés à", "tous  les" et "tous les" ne donnent
+    pas les mêmes mots-clés.
+    """
+    return question.lower()
+
+
+def lexicon_version():
+    """
+    Empreinte des règles de l'analyseur (RELATIONS, motifs d'attributs, modèle et seuil de l'index vectoriel...)
+    et du code de ai_parser.py : toute modification invalide les traductions mémorisées.
+    Le lexique des classes, rechargé à chaud, compte dans nlp_client.translation_version()
+    """
+    digest = hashlib.sha256()
+    lexicon = [ai_parser.RELATIONS, ai_parser.ATTRIBUTE_PATTERNS,
+               ai_parser.BOOLEAN_ATTRIBUTES, sorted(ai_parser.IGNORED_VALUES),
+               ai_parser.NLP_SEMANTIC_FALLBACK and [NLP_SENTENCE_MODEL, VECTOR_INDEX_MIN_SCORE]]
+    digest.update(json.dumps(lexicon, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    with open(ai_parser.__file__, "rb") as source:
+        digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+def has_free_text(entities):
+    """True si la traduction contient des valeurs recopiées de la question (nom, ville...)"""
+    return any(attr["value"] != "true" for attr in entities.get("attrs", []))
+
+
+class TranslationCache:
+    """
+    Cache des traductions question → (entités, SPARQL) : LRU en mémoire, puis table SQLite.
+
+    Une question est toujours retrouvée sous sa forme exacte. Elle est mémorisée sous sa forme en minuscules
+    si la traduction ne dépend pas de la casse : aucune valeur recopiée de la question (les valeurs sont
+    comparées telles quelles dans le SPARQL) et pas de repli sémantique (l'encodeur de phrases distingue
+    les majuscules).
+    """
+
+    def __init__(self, size=TRANSLATION_CACHE_SIZE, persist=TRANSLATION_CACHE_PERSIST):
+        self.size = size
+        self.persist = persist
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._lexicon = None
+        # (version du lexique et du générateur, version complète) de la dernière clé calculée
+        self._version = ("", None)
+
+        self._memory_hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._persistent_errors = 0
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    @property
+    def version(self):
+        """
+        Version des règles, du lexique des classes et du générateur SPARQL (hiérarchie chargée), incluse dans chaque clé.
+        None tant que le lexique du serveur NLP n'est pas connu
+        """
+        return self._full_version(nlp_client.translation_version())
+
+    def _full_version(self, runtime):
+        if runtime is None:
+            return None
+        if self._lexicon is None:
+            self._lexicon = lexicon_version()
+        cached_runtime, version = self._version
+        if version is None or runtime != cached_runtime:
+            version = hashlib.sha256(f"{self._lexicon}\0{runtime}".encode("utf-8")).hexdigest()[:16]
+            self._version = (runtime, version)
+        return version
+
+    def _key(self, version, kind, text):
+        return hashlib.sha256(f"{version}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _keys(self, version, question):
+        return self._key(version, "exact", question), self._key(version, "folded", fold_question(question))
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def _persistent_error(self, error):
+        with self._lock:
+            self._persistent_errors += 1
+            first = self._persistent_errors == 1
+        if first:
+            # Table absente (migrations non appliquées)... : le cache reste en mémoire
+            logger.warning("Cache de traductions persistant indisponible: %s", error)
+
+    def get(self, question):
+        """(entities, sparql) mémorisés pour cette question, ou None"""
+        if not self.enabled:
+            return None
+        version = self.version
+        if version is None:
+            with self._lock:
+                self._misses += 1
+            return None
+        keys = self._keys(version, question)
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    self._memory_hits += 1
+                    return value
+        if self.persist:
+            from backend_app.models import QuestionTranslation
+            try:
+                # Lecture seule : aucun verrou d'écriture SQLite sur le chemin des requêtes
+                row = QuestionTranslation.objects.filter(key__in=keys).first()
+            except DatabaseError as e:
+                self._persistent_error(e)
+                row = None
+            if row is not None:
+                value = (row.entities, row.sparql)
+                self._remember(row.key, value)
+                with self._lock:
+                    self._persistent_hits += 1
+                return value
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, question, entities, sparql, runtime=None):
+        """
+        Mémorise la traduction de `question`. `runtime` : nlp_client.translation_version() renvoyé avec les entités
+        (extract_entities_versioned), par défaut la version courante ; rien n'est mémorisé si elle est inconnue
+        """
+        if not self.enabled:
+            return
+        version = self._full_version(runtime or nlp_client.translation_version())
+        if version is None:
+            return
+        exact_key, folded_key = self._keys(version, question)
+        case_free = not has_free_text(entities) and not ai_parser.NLP_SEMANTIC_FALLBACK
+        key = folded_key if case_free else exact_key
+        value = (entities, sparql)
+        self._remember(key, value)
+        with self._lock:
+            self._stores += 1
+        if self.persist:
+            from backend_app.models import QuestionTranslation
+            try:
+                # Les lignes des autres versions restent : d'autres workers peuvent encore les lire
+                QuestionTranslation.objects.update_or_create(key=key, defaults={
+                    "lexicon_version": version,
+                    "question": question,
+                    "entities": entities,
+                    "sparql": sparql,
+                })
+            except DatabaseError as e:
+                self._persistent_error(e)
+
+    def purge(self, max_age_days=TRANSLATION_CACHE_MAX_AGE_DAYS):
+        """Supprime les traductions persistantes enregistrées il y a plus de `max_age_days` jours ; renvoie leur nombre"""
+        from backend_app.models import QuestionTranslation
+        limit = timezone.now() - timedelta(days=max_age_days)
+        deleted, _ = QuestionTranslation.objects.filter(created_at__lt=limit).delete()
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.persist:
+            from backend_app.models import QuestionTranslation
+            try:
+                QuestionTranslation.objects.all().delete()
+            except DatabaseError as e:
+                self._persistent_error(e)
+
+    def stats(self):
+        """Compteurs du cache de traductions"""
+        with self._lock:
+            hits = self._memory_hits + self._persistent_hits
+            lookups = hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "persistent": self.persist,
+                "lexicon_version": self._version[1],
+                "entries": len(self._entries),
+                "max_entries": self.size,
+                "memory_hits": self._memory_hits,
+                "persistent_hits": self._persistent_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "stores": self._stores,
+                "persistent_errors": self._persistent_errors,
+            }
+
+
+translation_cache = TranslationCache()
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Fichier des vecteurs calculés (rechargé au démarrage tant que les termes et le modèle n'ont pas changé)
+VECTOR_INDEX_PATH = os.environ.get("VECTOR_INDEX_PATH", os.path.join(BACKEND_DIR, ".cache", "vector_index.npz"))
+# Similarité cosinus minimale pour qu'un terme soit retenu
+VECTOR_INDEX_MIN_SCORE = float(os.environ.get("VECTOR_INDEX_MIN_SCORE", "0.6"))
+VECTOR_INDEX_TOP_K = int(os.environ.get("VECTOR_INDEX_TOP_K", "3"))
+
+
+def normalize(vectors):
+    """Vecteurs (lignes) de norme 1, en float32"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class VectorIndex:
+    """
+    Index des termes de l'ontologie : une matrice normalisée par type de terme ("class", "attr"...),
+    une ligne par texte, chaque texte renvoyant à un libellé (classe ou attribut).
+    La recherche est un produit matrice-vecteur : seul le vecteur de la question est calculé à la requête.
+    """
+
+    def __init__(self, encoder, model_name, path=VECTOR_INDEX_PATH):
+        self.encoder = encoder
+        self.model_name = model_name
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = ()
+        self._tables = {}
+        self._vectors = {}
+        self.fingerprint = None
+        self.encoded = 0
+
+    def _encode(self, texts):
+        return normalize(self.encoder.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True))
+
+    def _fingerprint(self, entries):
+        digest = hashlib.sha256(self.model_name.encode("utf-8"))
+        digest.update(json.dumps(entries, ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def update(self, entries):
+        """
+        Construit l'index pour `entries`, liste de (type, texte, libellé). Seuls les textes sans vecteur
+        (nouveaux termes) sont encodés ; à la première construction les vecteurs sont lus dans `path`.
+        Les vecteurs des termes retirés sont gardés (liste d'attributs de secours au démarrage...).
+        Sans effet si les termes n'ont pas changé.
+        """
+        entries = tuple(tuple(entry) for entry in entries)
+        with self._lock:
+            if entries == self._entries:
+                return
+            fingerprint = self._fingerprint(entries)
+            if not self._vectors:
+                self._vectors = self._read()
+            missing = sorted({text for _, text, _ in entries} - self._vectors.keys())
+            if missing:
+                self._vectors.update(zip(missing, self._encode(missing)))
+                self.encoded += len(missing)
+
+            tables = {}
+            for kind in dict.fromkeys(kind for kind, _, _ in entries):
+                rows = [(text, label) for entry_kind, text, label in entries if entry_kind == kind]
+                matrix = np.stack([self._vectors[text] for text, _ in rows])
+                tables[kind] = (matrix, [text for text, _ in rows], [label for _, label in rows])
+            self._tables = tables
+            self._entries = entries
+            self.fingerprint = fingerprint
+            if missing:
+                self._write(fingerprint)
+
+    def _read(self):
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["model"]) != self.model_name:
+                    return {}
+                vectors = dict(zip(data["texts"].tolist(), data["vectors"]))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning("Index vectoriel %s illisible, reconstruction: %s", self.path, e)
+            return {}
+        logger.info("Index vectoriel lu dans %s (%d vecteurs)", self.path, len(vectors))
+        return vectors
+
+    def _write(self, fingerprint):
+        texts = list(self._vectors)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary = f"{self.path}.{os.getpid()}.tmp.npz"
+            np.savez(temporary, model=np.array(self.model_name), fingerprint=np.array(fingerprint),
+                     texts=np.array(texts), vectors=np.stack([self._vectors[text] for text in texts]))
+            # Remplacement atomique : les autres workers lisent l'ancien ou le nouveau fichier
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning("Écriture de l'index vectoriel %s impossible: %s", self.path, e)
+
+    def encode_query(self, question):
+        return normalize(self.encoder.encode(question, convert_to_numpy=True, normalize_embeddings=True))
+
+    def search(self, query_vector, kind, k=VECTOR_INDEX_TOP_K, min_score=VECTOR_INDEX_MIN_SCORE):
+        """
+        Les `k` meilleurs libellés de type `kind` pour un vecteur normalisé : [(libellé, texte, score)],
+        un seul résultat par libellé, score décroissant
+        """
+        table = self._tables.get(kind)
+        if table is None:
+            return []
+        matrix, texts, labels = table
+        scores = matrix @ query_vector
+        # Marge pour les libellés présents plusieurs fois (mots-clés d'une même classe)
+        count = min(len(scores), k * 4)
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best])]
+        results = []
+        seen = set()
+        for row in best:
+            score = float(scores[row])
+            if score < min_score or len(results) == k:
+                break
+            if labels[row] not in seen:
+                seen.add(labels[row])
+                results.append((labels[row], texts[row], round(score, 4)))
+        return results
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "fingerprint": self.fingerprint,
+            "entries": {kind: len(table[1]) for kind, table in self._tables.items()},
+            "encoded": self.encoded,
+        }
@@ -0,0 +1,219 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from backend_app.common.query_cache import QueryDependencies
+from backend_app.common.query_templates import register
+from backend_app.common.sparql_utils import fuseki_client
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Âge maximal de la liste d'attributs avant un rechargement en arrière-plan (secondes)
+VOCABULARY_TTL = float(os.environ.get("VOCABULARY_TTL", "600"))
+# Délai avant un nouvel essai quand le rechargement échoue (Fuseki indisponible...)
+VOCABULARY_RETRY_DELAY = float(os.environ.get("VOCABULARY_RETRY_DELAY", "30"))
+
+# Attributs utilisés tant qu'aucune liste n'a pu être lue dans Fuseki
+ontology_terms = ["nom", "codePostal", "adresse", "email", "ville", "username", "mdp", "created_at"]
+
+
+class RefreshingSnapshot:
+    """
+    Valeur lue dans Fuseki et servie depuis la mémoire : get() ne fait que renvoyer la dernière valeur obtenue
+    (la valeur de secours avant le premier chargement), aucun appelant n'attend Fuseki ni ne lance de lecture.
+    start() (démarrage du serveur) la charge en arrière-plan puis la recharge tous les `ttl` ; un échec garde
+    la dernière bonne valeur et réessaie après `retry_delay`.
+    on_update() (écouteur des mises à jour du client) recharge la valeur quand une écriture peut la modifier.
+    """
+
+    def __init__(self, name, query, loader, fallback, ttl=VOCABULARY_TTL, retry_delay=VOCABULARY_RETRY_DELAY):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.retry_delay = retry_delay
+        self.dependencies = QueryDependencies(query)
+        self._lock = threading.Lock()
+        self._value = fallback
+        self._source = "fallback"
+        self._refresh_at = 0.0
+        self._loaded_at = None
+        self._thread = None
+        self._pending = False
+        # Rechargement périodique (start()) : prochain rechargement programmé
+        self._periodic = False
+        self._timer = None
+        self._refreshes = 0
+        self._failures = 0
+        self._error = None
+
+    def get(self):
+        """Dernière valeur connue"""
+        return self._value
+
+    def start(self):
+        """Charge la valeur en arrière-plan, puis la recharge tous les `ttl` (démarrage du serveur)"""
+        with self._lock:
+            self._periodic = True
+        self.refresh(again=False)
+
+    def refresh(self, again=True):
+        """
+        Recharge la valeur dans un thread. Pendant un rechargement, `again` en programme un autre :
+        la lecture en cours a pu commencer avant l'écriture qui a déclenché l'appel.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._pending = self._pending or again
+                return
+            self._thread = threading.Thread(target=self._run, name=f"refresh-{self.name}", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                value = self.loader()
+            except Exception as e:
+                logger.warning("Rechargement de %s impossible: %s", self.name, e)
+                with self._lock:
+                    self._failures += 1
+                    self._error = str(e)
+                    self._refresh_at = time.monotonic() + self.retry_delay
+            else:
+                with self._lock:
+                    self._value = value
+                    self._source = "fuseki"
+                    self._error = None
+                    self._refreshes += 1
+                    self._loaded_at = time.time()
+                    self._refresh_at = time.monotonic() + self.ttl
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    if self._periodic:
+                        self._schedule()
+                    return
+                self._pending = False
+
+    def _schedule(self):
+        # Un seul rechargement programmé : ceux déclenchés par les écritures repoussent le suivant
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(self._refresh_at - time.monotonic(), 0), self.refresh, kwargs={"again": False})
+        self._timer.name = f"refresh-timer-{self.name}"
+        self._timer.daemon = True
+        self._timer.start()
+
+    @property
+    def loaded(self):
+        """True une fois une valeur lue dans Fuseki (la valeur de secours n'est plus servie)"""
+        return self._source != "fallback"
+
+    def on_update(self, sparql_update):
+        """Écouteur des mises à jour : recharge si l'écriture touche les triplets lus"""
+        if self.dependencies.conflicts_with(QueryDependencies(sparql_update)):
+            self.refresh()
+
+    def stop(self):
+        """Arrête les rechargements périodiques (outils et tests)"""
+        with self._lock:
+            self._periodic = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def wait(self, timeout=None):
+        """Attend la fin du rechargement en cours (outils et tests)"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "source": self._source,
+                "size": len(self._value),
+                "loaded_at": self._loaded_at,
+                "ttl": self.ttl,
+                "refreshing": self._thread is not None,
+                "refreshes": self._refreshes,
+                "failures": self._failures,
+                "error": self._error,
+            }
+
+
+DYNAMIC_ATTRIBUTES_QUERY = register("dynamic_attributes", """
+SELECT DISTINCT ?attr WHERE { ?attr a rdf:Property . }
+""")
+
+
+def load_dynamic_attributes():
+    """Noms (en minuscules) des propriétés déclarées dans l'ontologie ; lève une exception si Fuseki échoue"""
+    response = fuseki_client.execute_query(DYNAMIC_ATTRIBUTES_QUERY.bind())
+    if response["status"] != "success":
+        raise RuntimeError(response["message"])
+    results = response["data"]["results"]["bindings"]
+    return [r["attr"]["value"].split("#")[-1].lower() for r in results]
+
+
+dynamic_attributes = RefreshingSnapshot("dynamic_attributes", DYNAMIC_ATTRIBUTES_QUERY.text,
+                                        load_dynamic_attributes, ontology_terms)
+fuseki_client.add_update_listener(dynamic_attributes.on_update)
+
+
+class ClassHierarchy:
+    """Sous-classes directes de chaque classe (IRI) et fermeture transitive de rdfs:subClassOf"""
+
+    def __init__(self, edges=()):
+        edges = sorted(set(edges))
+        self._children = {}
+        for subclass, superclass in edges:
+            self._children.setdefault(superclass, set()).add(subclass)
+        self._closures = {}
+        self.fingerprint = hashlib.sha256(repr(edges).encode("utf-8")).hexdigest()[:16] if edges else ""
+
+    def __len__(self):
+        return len(self._children)
+
+    def closure(self, class_iri):
+        """IRI triées de la classe et de toutes ses sous-classes, comme ?type rdfs:subClassOf* <classe>"""
+        closure = self._closures.get(class_iri)
+        if closure is None:
+            seen = {class_iri}
+            pending = [class_iri]
+            while pending:
+                for child in self._children.get(pending.pop(), ()):
+                    if child not in seen:
+                        seen.add(child)
+                        pending.append(child)
+            closure = tuple(sorted(seen))
+            self._closures[class_iri] = closure
+        return closure
+
+
+CLASS_HIERARCHY_QUERY = register("class_hierarchy", """
+SELECT ?subclass ?superclass WHERE {
+  ?subclass rdfs:subClassOf ?superclass .
+  FILTER(isIRI(?subclass) && isIRI(?superclass))
+}
+""")
+
+
+def load_class_hierarchy():
+    """Hiérarchie des classes lue dans Fuseki ; lève une exception si Fuseki échoue"""
+    response = fuseki_client.execute_query(CLASS_HIERARCHY_QUERY.bind())
+    if response["status"] != "success":
+        raise RuntimeError(response["message"])
+    results = response["data"]["results"]["bindings"]
+    return ClassHierarchy((r["subclass"]["value"], r["superclass"]["value"]) for r in results)
+
+
+# Rechargée après toute écriture mentionnant rdfs:subClassOf (mise à jour de l'ontologie)
+class_hierarchy = RefreshingSnapshot("class_hierarchy", CLASS_HIERARCHY_QUERY.text,
+                                     load_class_hierarchy, ClassHierarchy())
+fuseki_client.add_update_listener(class_hierarchy.on_update)
@@ -0,0 +1,98 @@
+import os
+
+from dotenv import load_dotenv
+
+from backend_app.common.query_templates import PREFIXES
+from backend_app.common.sparql_utils import fuseki_client
+
+load_dotenv()
+
+# Taille maximale d'une requête INSERT DATA envoyée par le batcher
+WRITE_BATCH_MAX_TRIPLES = int(os.environ.get("WRITE_BATCH_MAX_TRIPLES", "1000"))
+WRITE_BATCH_MAX_BYTES = int(os.environ.get("WRITE_BATCH_MAX_BYTES", str(512 * 1024)))
+
+
+def insert_data_query(triples):
+    """Requête INSERT DATA pour une liste de triplets ("<s> onto:p \"o\"", sans point final)"""
+    body = " .\n    ".join(triples)
+    return f"{PREFIXES}\nINSERT DATA {{\n    {body} .\n}}\n"
+
+
+class WriteBatcher:
+    """
+    Regroupe les triplets de nombreuses créations dans des requêtes INSERT DATA découpées
+    (au plus max_triples triplets et max_bytes octets par requête).
+    Les triplets d'un même élément restent toujours dans la même requête.
+    """
+
+    def __init__(self, client=None, max_triples=WRITE_BATCH_MAX_TRIPLES, max_bytes=WRITE_BATCH_MAX_BYTES):
+        self.client = client or fuseki_client
+        self.max_triples = max_triples
+        self.max_bytes = max_bytes
+        self._pending = []
+        self._results = []
+        self.requests = 0
+
+    def add(self, item_id, triples, **info):
+        """Ajoute les triplets d'un élément ; `info` est recopié dans son résultat"""
+        result = {"id": item_id, "status": "pending", **info}
+        self._results.append(result)
+        self._pending.append((result, list(triples)))
+
+    def fail(self, item_id, message, **info):
+        """Enregistre un élément rejeté avant envoi (validation)"""
+        self._results.append({"id": item_id, "status": "error", "message": message, **info})
+
+    def _chunks(self):
+        chunk = []
+        triples = 0
+        size = 0
+        for result, item_triples in self._pending:
+            item_size = sum(len(triple.encode("utf-8")) + 3 for triple in item_triples)
+            if chunk and (triples + len(item_triples) > self.max_triples or size + item_size > self.max_bytes):
+                yield chunk
+                chunk, triples, size = [], 0, 0
+            chunk.append((result, item_triples))
+            triples += len(item_triples)
+            size += item_size
+        if chunk:
+            yield chunk
+
+    def _send(self, chunk):
+        self.requests += 1
+        outcome = self.client.execute_update(
+            insert_data_query([triple for _, item_triples in chunk for triple in item_triples]))
+        if outcome["status"] == "success":
+            for result, _ in chunk:
+                result["status"] = "success"
+            return
+        # Requête rejetée (400) : on coupe en deux pour isoler les éléments invalides.
+        # Une autre erreur (Fuseki indisponible...) concerne tout le morceau.
+        if outcome.get("http_status") == 400 and len(chunk) > 1:
+            middle = len(chunk) // 2
+            self._send(chunk[:middle])
+            self._send(chunk[middle:])
+            return
+        for result, _ in chunk:
+            result["status"] = "error"
+            result["message"] = outcome["message"]
+
+    def flush(self):
+        """Envoie les éléments en attente et renvoie le résultat de chaque élément, dans l'ordre d'ajout"""
+        for chunk in self._chunks():
+            self._send(chunk)
+        self._pending = []
+        results, self._results = self._results, []
+        return results
+
+
+def summarize(results, requests):
+    """Réponse commune des API de création en masse"""
+    succeeded = sum(1 for result in results if result["status"] == "success")
+    return {
+        "status": "success" if succeeded == len(results) else ("partial" if succeeded else "error"),
+        "created": succeeded,
+        "failed": len(results) - succeeded,
+        "requests": requests,
+        "results": results,
+    }
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend_app.common.translation_cache import TRANSLATION_CACHE_MAX_AGE_DAYS, translation_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete persistent question translations older than --days, whatever their lexicon version. "
+        "Workers never delete rows themselves: run this periodically (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=float, default=TRANSLATION_CACHE_MAX_AGE_DAYS,
+                            help=f"maximum age in days (default: TRANSLATION_CACHE_MAX_AGE_DAYS, {TRANSLATION_CACHE_MAX_AGE_DAYS:g})")
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("--days must be positive")
+        deleted = translation_cache.purge(options["days"])
+        self.stdout.write(f"{deleted} translation(s) deleted")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend_app.common.nlp_server import serve
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the local NLP server that owns the spaCy and sentence-transformer models. "
+        "Web workers use it when NLP_SERVER_URL points to it, instead of loading their own copy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default="127.0.0.1:8765",
+                            help='"host:port" or "unix:/path/to/nlp.sock" (default: 127.0.0.1:8765)')
+        parser.add_argument("--workers", type=int, default=1,
+                            help="server processes sharing the socket, each with its own copy of the models")
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+        self.stdout.write(f"NLP server listening on {options['bind']} ({options['workers']} process(es))")
+        serve(options["bind"], options["workers"])
@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class QuestionTranslation(models.Model):
+    """
+    Traduction question → SPARQL mémorisée par le cache de traductions (niveau persistant,
+    partagé par les workers). La clé contient la version du lexique de l'analyseur : les lignes de plusieurs
+    versions cohabitent (workers en cours de rechargement) et sont supprimées par âge (purgetranslations).
+    """
+
+    key = models.CharField(max_length=64, primary_key=True)
+    lexicon_version = models.CharField(max_length=16, db_index=True)
+    question = models.TextField()
+    entities = models.JSONField()
+    sparql = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.question
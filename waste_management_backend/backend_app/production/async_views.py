@@ -0,0 +1,21 @@
+"""Vues async (ASGI, ASYNC_VIEWS=true) : les vues de views.py, dont les appels à Fuseki ne bloquent pas la boucle d'événements"""
+from backend_app.common.fuseki_views import asynchronous
+from backend_app.production import views
+
+TestConnectionView = asynchronous(views.TestConnectionView)
+GetClassesView = asynchronous(views.GetClassesView)
+GetClassPropertiesView = asynchronous(views.GetClassPropertiesView)
+GetAllProducersView = asynchronous(views.GetAllProducersView)
+GetProducersByTypeView = asynchronous(views.GetProducersByTypeView)
+GetProducerWastesView = asynchronous(views.GetProducerWastesView)
+GetProducersStatisticsView = asynchronous(views.GetProducersStatisticsView)
+SearchProducersView = asynchronous(views.SearchProducersView)
+GetProducerDetailsView = asynchronous(views.GetProducerDetailsView)
+GetProducersByCityView = asynchronous(views.GetProducersByCityView)
+GetProducerByIdView = asynchronous(views.GetProducerByIdView)
+CreateProducerView = asynchronous(views.CreateProducerView)
+BulkCreateProducersView = asynchronous(views.BulkCreateProducersView)
+UpdateProducerView = asynchronous(views.UpdateProducerView)
+DeleteProducerView = asynchronous(views.DeleteProducerView)
+GetProducerTypesView = asynchronous(views.GetProducerTypesView)
+GetProducerWastesDetailedView = asynchronous(views.GetProducerWastesDetailedView)
@@ -1,5 +1,10 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+
+if settings.ASYNC_VIEWS:
+    from . import async_views as views
+else:
+    from . import views
 
 urlpatterns = [
     path('test/', views.TestConnectionView.as_view(), name='test-connection'),
@@ -15,6 +20,7 @@ urlpatterns = [
     path('producers/city/', views.GetProducersByCityView.as_view(), name='get_producers_by_city'),
     path('producers/types/', views.GetProducerTypesView.as_view(), name='get_producer_types'),
     path('producers/create/', views.CreateProducerView.as_view(), name='create_producer'),
+    path('producers/bulk-create/', views.BulkCreateProducersView.as_view(), name='bulk_create_producers'),
     path('producers/<str:producer_id>/', views.GetProducerByIdView.as_view(), name='get_producer_by_id'),
     path('producers/update/<path:producer_uri>/', views.UpdateProducerView.as_view(), name='update_producer'),
     path('producers/delete/<path:producer_uri>', views.DeleteProducerView.as_view(), name='delete_producer'),
@@ -1,17 +1,23 @@
 from django.http import JsonResponse
 import json
-from django.views import View
+import logging
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from datetime import datetime
 from urllib.parse import unquote
 
 from backend_app.common.sparql_utils import (
+    blocking,
     test_sparql_connection, 
     get_all_classes,
     get_class_properties
 )
+from backend_app.common.formats import sparql_response
+from backend_app.common.fuseki_views import FusekiView
+from backend_app.common.streaming import streaming_select
 from backend_app.production.producer_queries import (
+    bulk_create_producers,
+    all_producers_query,
     get_all_producers,
     get_producers_by_type,
     get_producer_wastes,
@@ -30,35 +36,40 @@ from backend_app.production.producer_queries import (
 
 )
 
-class TestConnectionView(View):
+logger = logging.getLogger(__name__)
+
+class TestConnectionView(FusekiView):
     def get(self, request):
-        result = test_sparql_connection()
-        return JsonResponse(result)
+        result = yield from test_sparql_connection.steps()
+        return sparql_response(request, result)
 
-class GetClassesView(View):
+class GetClassesView(FusekiView):
     def get(self, request):
-        result = get_all_classes()
-        return JsonResponse(result)
+        result = yield from get_all_classes.steps()
+        return sparql_response(request, result)
 
-class GetClassPropertiesView(View):
+class GetClassPropertiesView(FusekiView):
     def get(self, request):
         class_uri = request.GET.get('class_uri', 'http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#Acteur')
-        result = get_class_properties(class_uri)
-        return JsonResponse(result)
+        result = yield from get_class_properties.steps(class_uri)
+        return sparql_response(request, result)
 
-class GetAllProducersView(View):
+class GetAllProducersView(FusekiView):
     def get(self, request):
         """Récupère tous les producteurs"""
-        result = get_all_producers()
-        return JsonResponse(result)
+        stream_format = request.GET.get('stream')
+        if stream_format:
+            return (yield streaming_select(all_producers_query(), stream_format))
+        result = yield from get_all_producers.steps()
+        return sparql_response(request, result)
 
-class GetProducersByTypeView(View):
+class GetProducersByTypeView(FusekiView):
     def get(self, request, producer_type):
         """Récupère les producteurs par type"""
-        result = get_producers_by_type(producer_type)
-        return JsonResponse(result)
+        result = yield from get_producers_by_type.steps(producer_type)
+        return sparql_response(request, result)
 
-class GetProducerWastesView(View):
+class GetProducerWastesView(FusekiView):
     def get(self, request):
         """Récupère les déchets d'un producteur spécifique"""
         
@@ -69,16 +80,16 @@ class GetProducerWastesView(View):
                 "message": "Le paramètre 'producer_uri' est requis"
             }, status=400)
         
-        result = get_producer_wastes(producer_uri)
-        return JsonResponse(result)
+        result = yield from get_producer_wastes.steps(producer_uri)
+        return sparql_response(request, result)
 
-class GetProducersStatisticsView(View):
+class GetProducersStatisticsView(FusekiView):
     def get(self, request):
         """Récupère les statistiques des producteurs"""
-        result = get_producers_statistics()
-        return JsonResponse(result)
+        result = yield from get_producers_statistics.steps()
+        return sparql_response(request, result)
 
-class SearchProducersView(View):
+class SearchProducersView(FusekiView):
     def get(self, request):
         """Recherche de producteurs par terme"""
         
@@ -89,10 +100,10 @@ class SearchProducersView(View):
                 "message": "Le paramètre de recherche 'q' est requis"
             }, status=400)
         
-        result = search_producers(search_term)
-        return JsonResponse(result)
+        result = yield from search_producers.steps(search_term)
+        return sparql_response(request, result)
 
-class GetProducerDetailsView(View):
+class GetProducerDetailsView(FusekiView):
     def get(self, request):
         """Récupère les détails complets d'un producteur spécifique"""
         
@@ -103,10 +114,10 @@ class GetProducerDetailsView(View):
                 "message": "Le paramètre 'producer_uri' est requis"
             }, status=400)
         
-        result = get_producer_details(producer_uri)
-        return JsonResponse(result)
+        result = yield from get_producer_details.steps(producer_uri)
+        return sparql_response(request, result)
 
-class GetProducersByCityView(View):
+class GetProducersByCityView(FusekiView):
     def get(self, request):
         """Récupère les producteurs par ville"""
         
@@ -117,18 +128,18 @@ class GetProducersByCityView(View):
                 "message": "Le paramètre 'city' est requis"
             }, status=400)
         
-        result = get_producers_by_city(city)
-        return JsonResponse(result)
+        result = yield from get_producers_by_city.steps(city)
+        return sparql_response(request, result)
 
 @method_decorator(csrf_exempt, name='dispatch')
-class GetProducerByIdView(View):
+class GetProducerByIdView(FusekiView):
     def get(self, request, producer_id):
         """Récupère un producteur par son ID"""
-        result = get_producer_by_id(producer_id)
-        return JsonResponse(result)
+        result = yield from get_producer_by_id.steps(producer_id)
+        return sparql_response(request, result)
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CreateProducerView(View):
+class CreateProducerView(FusekiView):
     def post(self, request):
         """Crée un nouveau producteur"""
         try:
@@ -142,7 +153,7 @@ class CreateProducerView(View):
                         "message": f"Le champ '{field}' est requis"
                     }, status=400)
             
-            result = create_producer(
+            result = yield from create_producer.steps(
                 producer_id=data['id'],
                 name=data['name'],
                 producer_type=data['type'],
@@ -159,14 +170,46 @@ class CreateProducerView(View):
             }, status=400)
 
 @method_decorator(csrf_exempt, name='dispatch')
-class UpdateProducerView(View):
+class BulkCreateProducersView(FusekiView):
+    def post(self, request):
+        """Crée plusieurs producteurs en quelques requêtes INSERT DATA"""
+        try:
+            data = json.loads(request.body)
+            producers = data.get('producers')
+            if not isinstance(producers, list) or not producers:
+                return JsonResponse({
+                    "status": "error", 
+                    "message": "Le champ 'producers' doit être une liste non vide"
+                }, status=400)
+            
+            result = yield blocking(bulk_create_producers, [
+                {
+                    "producer_id": producer.get('id'),
+                    "name": producer.get('name'),
+                    "producer_type": producer.get('type'),
+                    "city": producer.get('city'),
+                    "address": producer.get('address', ''),
+                    "postal_code": producer.get('postalCode', ''),
+                } if isinstance(producer, dict) else producer
+                for producer in producers
+            ])
+            return JsonResponse(result)
+            
+        except json.JSONDecodeError:
+            return JsonResponse({
+                "status": "error", 
+                "message": "Données JSON invalides"
+            }, status=400)
+
+@method_decorator(csrf_exempt, name='dispatch')
+class UpdateProducerView(FusekiView):
     def put(self, request, producer_uri):
         """Met à jour un producteur existant"""
         
         try:
             data = json.loads(request.body)
             
-            result = update_producer(
+            result = yield from update_producer.steps(
                 producer_uri=producer_uri,
                 name=data.get('name'),
                 city=data.get('city'),
@@ -182,18 +225,18 @@ class UpdateProducerView(View):
             }, status=400)
 
 @method_decorator(csrf_exempt, name='dispatch')
-class DeleteProducerView(View):
+class DeleteProducerView(FusekiView):
     def delete(self, request, producer_uri):
         """Supprime un producteur"""
         try:
             decoded_uri = unquote(producer_uri)
          
             
-            result = delete_producer(decoded_uri)
+            result = yield from delete_producer.steps(decoded_uri)
             return JsonResponse(result)
 
         except Exception as e:
-            print(f" Erreur dans la vue: {str(e)}")
+            logger.exception("Erreur dans la vue de suppression")
             return JsonResponse({
                 "status": "error",
                 "message": f"Erreur lors de la suppression: {str(e)}"
@@ -201,14 +244,14 @@ class DeleteProducerView(View):
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class GetProducerTypesView(View):
+class GetProducerTypesView(FusekiView):
     def get(self, request):
         """Récupère la liste des types de producteurs disponibles"""
         
-        result = get_producer_types()
-        return JsonResponse(result)
+        result = yield from get_producer_types.steps()
+        return sparql_response(request, result)
 
-class GetProducerWastesDetailedView(View):
+class GetProducerWastesDetailedView(FusekiView):
     def get(self, request):
         """Récupère les déchets détaillés d'un producteur spécifique"""
         
@@ -219,5 +262,5 @@ class GetProducerWastesDetailedView(View):
                 "message": "Le paramètre 'producer_uri' est requis"
             }, status=400)
         
-        result = get_producer_wastes_detailed(producer_uri)
-        return JsonResponse(result)
\ No newline at end of file
+        result = yield from get_producer_wastes_detailed.steps(producer_uri)
+        return sparql_response(request, result)
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""Vues async (ASGI, ASYNC_VIEWS=true) : les vues de views.py, dont les appels à Fuseki ne bloquent pas la boucle d'événements"""
+from backend_app.common.fuseki_views import asynchronous
+from backend_app.supervision import views
+
+GetAllSupervisorsView = asynchronous(views.GetAllSupervisorsView)
+GetSupervisorsByTypeView = asynchronous(views.GetSupervisorsByTypeView)
+GetSupervisorCentersView = asynchronous(views.GetSupervisorCentersView)
+GetSupervisorsStatisticsView = asynchronous(views.GetSupervisorsStatisticsView)
+SearchSupervisorsView = asynchronous(views.SearchSupervisorsView)
+GetSupervisorDetailsView = asynchronous(views.GetSupervisorDetailsView)
+AddSupervisorView = asynchronous(views.AddSupervisorView)
+BulkAddSupervisorsView = asynchronous(views.BulkAddSupervisorsView)
+UpdateSupervisorView = asynchronous(views.UpdateSupervisorView)
+DeleteSupervisorView = asynchronous(views.DeleteSupervisorView)
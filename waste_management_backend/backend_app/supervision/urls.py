@@ -1,9 +1,15 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+
+if settings.ASYNC_VIEWS:
+    from . import async_views as views
+else:
+    from . import views
 
 urlpatterns = [
     path('supervisors/', views.GetAllSupervisorsView.as_view(), name='get_all_supervisors'),
     path('supervisors/add/', views.AddSupervisorView.as_view(), name='add_supervisor'),
+    path('supervisors/bulk-add/', views.BulkAddSupervisorsView.as_view(), name='bulk_add_supervisors'),
     path('supervisors/update/', views.UpdateSupervisorView.as_view(), name='update_supervisor'),
     path('supervisors/delete/', views.DeleteSupervisorView.as_view(), name='delete_supervisor'),
     path('supervisors/type/<str:supervisor_type>/', views.GetSupervisorsByTypeView.as_view(), name='get_supervisors_by_type'),
@@ -1,9 +1,16 @@
 from django.http import JsonResponse
-from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
+import logging
+from backend_app.common.formats import sparql_response
+from backend_app.common.fuseki_views import FusekiView
+from backend_app.common.sparql_utils import blocking
+from backend_app.common.streaming import streaming_select
 from backend_app.supervision.supervisor_queries import (
+    bulk_add_supervisors,
+    VALID_SUPERVISOR_TYPES,
+    all_supervisors_query,
     get_all_supervisors,
     get_supervisors_by_type,
     get_supervisor_centers,
@@ -15,19 +22,24 @@ from backend_app.supervision.supervisor_queries import (
     update_supervisor,
 )
 
-class GetAllSupervisorsView(View):
+logger = logging.getLogger(__name__)
+
+class GetAllSupervisorsView(FusekiView):
     def get(self, request):
         """Récupère tous les superviseurs"""
-        result = get_all_supervisors()
-        return JsonResponse(result)
+        stream_format = request.GET.get('stream')
+        if stream_format:
+            return (yield streaming_select(all_supervisors_query(), stream_format))
+        result = yield from get_all_supervisors.steps()
+        return sparql_response(request, result)
 
-class GetSupervisorsByTypeView(View):
+class GetSupervisorsByTypeView(FusekiView):
     def get(self, request, supervisor_type):
         """Récupère les superviseurs par type"""
-        result = get_supervisors_by_type(supervisor_type)
-        return JsonResponse(result)
+        result = yield from get_supervisors_by_type.steps(supervisor_type)
+        return sparql_response(request, result)
 
-class GetSupervisorCentersView(View):
+class GetSupervisorCentersView(FusekiView):
     def get(self, request):
         """Récupère les centres de traitement assignés à un superviseur spécifique"""
         
@@ -38,16 +50,16 @@ class GetSupervisorCentersView(View):
                 "message": "Le paramètre 'supervisor_uri' est requis"
             }, status=400)
         
-        result = get_supervisor_centers(supervisor_uri)
-        return JsonResponse(result)
+        result = yield from get_supervisor_centers.steps(supervisor_uri)
+        return sparql_response(request, result)
 
-class GetSupervisorsStatisticsView(View):
+class GetSupervisorsStatisticsView(FusekiView):
     def get(self, request):
         """Récupère les statistiques des superviseurs"""
-        result = get_supervisors_statistics()
-        return JsonResponse(result)
+        result = yield from get_supervisors_statistics.steps()
+        return sparql_response(request, result)
 
-class SearchSupervisorsView(View):
+class SearchSupervisorsView(FusekiView):
     def get(self, request):
         """Recherche de superviseurs par terme"""
         
@@ -58,10 +70,10 @@ class SearchSupervisorsView(View):
                 "message": "Le paramètre de recherche 'q' est requis"
             }, status=400)
         
-        result = search_supervisors(search_term)
-        return JsonResponse(result)
+        result = yield from search_supervisors.steps(search_term)
+        return sparql_response(request, result)
 
-class GetSupervisorDetailsView(View):
+class GetSupervisorDetailsView(FusekiView):
     def get(self, request):
         """Récupère les détails complets d'un superviseur spécifique"""
         
@@ -72,11 +84,11 @@ class GetSupervisorDetailsView(View):
                 "message": "Le paramètre 'supervisor_uri' est requis"
             }, status=400)
         
-        result = get_supervisor_details(supervisor_uri)
-        return JsonResponse(result)
+        result = yield from get_supervisor_details.steps(supervisor_uri)
+        return sparql_response(request, result)
 
 @method_decorator(csrf_exempt, name='dispatch')
-class AddSupervisorView(View):
+class AddSupervisorView(FusekiView):
     def post(self, request):
         """Ajoute un nouveau superviseur dans l'ontologie"""
         try:
@@ -99,19 +111,10 @@ class AddSupervisorView(View):
                 }, status=400)
             
             # Types valides
-            valid_types = [
-                'Superviseur_Environnemental',
-                'Superviseur_Municipal',
-                'Superviseur_National',
-                'Superviseur_Regional',
-                'Superviseur_Securite',
-                'Superviseur_Qualite'
-            ]
-            
-            if supervisor_type not in valid_types:
+            if supervisor_type not in VALID_SUPERVISOR_TYPES:
                 return JsonResponse({
                     "status": "error",
-                    "message": f"Type invalide. Types valides: {', '.join(valid_types)}"
+                    "message": f"Type invalide. Types valides: {', '.join(VALID_SUPERVISOR_TYPES)}"
                 }, status=400)
             
             # Champs optionnels
@@ -123,14 +126,11 @@ class AddSupervisorView(View):
             id_superviseur = data.get('idSuperviseur')
             center_uri = data.get('centerUri')
             
-            # Debug: imprimer les données reçues
-            print(f"DEBUG - Données reçues pour l'ajout de superviseur:")
-            print(f"  nomComplet: {nom_complet}")
-            print(f"  type: {supervisor_type}")
-            print(f"  centerUri: {center_uri}")
+            logger.debug("Données reçues pour l'ajout de superviseur: nomComplet=%s, type=%s, centerUri=%s",
+                         nom_complet, supervisor_type, center_uri)
             
             # Ajouter le superviseur
-            result = add_supervisor(
+            result = yield from add_supervisor.steps(
                 nom_complet=nom_complet,
                 supervisor_type=supervisor_type,
                 email=email,
@@ -156,7 +156,47 @@ class AddSupervisorView(View):
             }, status=500)
 
 @method_decorator(csrf_exempt, name='dispatch')
-class UpdateSupervisorView(View):
+class BulkAddSupervisorsView(FusekiView):
+    def post(self, request):
+        """Ajoute plusieurs superviseurs en quelques requêtes INSERT DATA"""
+        try:
+            data = json.loads(request.body)
+            supervisors = data.get('supervisors')
+            if not isinstance(supervisors, list) or not supervisors:
+                return JsonResponse({
+                    "status": "error",
+                    "message": "Le champ 'supervisors' doit être une liste non vide"
+                }, status=400)
+            
+            result = yield blocking(bulk_add_supervisors, [
+                {
+                    "nom_complet": supervisor.get('nomComplet'),
+                    "supervisor_type": supervisor.get('type'),
+                    "email": supervisor.get('email'),
+                    "telephone": supervisor.get('telephone'),
+                    "fonction": supervisor.get('fonction'),
+                    "zone_affectation": supervisor.get('zoneAffectation'),
+                    "actif": supervisor.get('actif', True),
+                    "id_superviseur": supervisor.get('idSuperviseur'),
+                    "center_uri": supervisor.get('centerUri'),
+                } if isinstance(supervisor, dict) else supervisor
+                for supervisor in supervisors
+            ])
+            return JsonResponse(result)
+            
+        except json.JSONDecodeError:
+            return JsonResponse({
+                "status": "error",
+                "message": "Données JSON invalides"
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                "status": "error",
+                "message": str(e)
+            }, status=500)
+
+@method_decorator(csrf_exempt, name='dispatch')
+class UpdateSupervisorView(FusekiView):
     def put(self, request):
         """Met à jour un superviseur dans l'ontologie"""
         try:
@@ -180,19 +220,12 @@ class UpdateSupervisorView(View):
             actif = data.get('actif')
             center_uri = data.get('centerUri')
             
-            # Debug: imprimer les données reçues
-            print(f"DEBUG - Données reçues pour la mise à jour de superviseur:")
-            print(f"  supervisorUri: {supervisor_uri}")
-            print(f"  nomComplet: {nom_complet}")
-            print(f"  email: {email}")
-            print(f"  telephone: {telephone}")
-            print(f"  fonction: {fonction}")
-            print(f"  zoneAffectation: {zone_affectation}")
-            print(f"  actif: {actif}")
-            print(f"  centerUri: {center_uri}")
+            logger.debug("Données reçues pour la mise à jour de superviseur %s: nomComplet=%s, email=%s, "
+                         "telephone=%s, fonction=%s, zoneAffectation=%s, actif=%s, centerUri=%s",
+                         supervisor_uri, nom_complet, email, telephone, fonction, zone_affectation, actif, center_uri)
             
             # Mettre à jour le superviseur
-            result = update_supervisor(
+            result = yield from update_supervisor.steps(
                 supervisor_uri=supervisor_uri,
                 nom_complet=nom_complet,
                 email=email,
@@ -216,7 +249,7 @@ class UpdateSupervisorView(View):
             }, status=500)
 
 @method_decorator(csrf_exempt, name='dispatch')
-class DeleteSupervisorView(View):
+class DeleteSupervisorView(FusekiView):
     def delete(self, request):
         """Supprime un superviseur de l'ontologie"""
         try:
@@ -229,7 +262,7 @@ class DeleteSupervisorView(View):
                 }, status=400)
             
             # Supprimer le superviseur
-            result = delete_supervisor(supervisor_uri)
+            result = yield from delete_supervisor.steps(supervisor_uri)
             return JsonResponse(result)
             
         except Exception as e:
@@ -1,3 +1,1101 @@
-from django.test import TestCase
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from backend_app import views
+from backend_app.production import async_views as production_async_views
+from backend_app.production import views as production_views
+from backend_app.production.views import BulkCreateProducersView
+from backend_app.common import ai_parser, nlp_client, nlp_server
+from backend_app.common.embedded_store import AsyncEmbeddedTransport, EmbeddedTransport, load_graph
+from backend_app.common.fuseki_transport import FusekiError
+from backend_app.common.keyword_automaton import KeywordAutomaton
+from backend_app.common.lexicon import Lexicon, load_class_lexicon, read_lexicon_file
+from backend_app.common.nlp_models import LazyModel, ModelNotReady
+from backend_app.common.pagination import CursorError, decode_cursor, encode_cursor, page_query, page_size, run_page
+from backend_app.common.query_cache import QueryCache
+from backend_app.common.query_templates import QueryTemplate, TemplateError, render, template_errors
+from backend_app.common.sparql_utils import FusekiClient, run_steps
+from backend_app.common.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from backend_app.common.streaming import BindingsParser, asse_select_response, sse_select_response
+from backend_app.common.translation_cache import TranslationCache
+from backend_app.common.vocabulary import DYNAMIC_ATTRIBUTES_QUERY, RefreshingSnapshot, load_dynamic_attributes
+from backend_app.common.write_batcher import WriteBatcher
+from backend_app.models import QuestionTranslation
+
+ONTO = "http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#"
+PREFIX = f"PREFIX onto: <{ONTO}>\n"
+
+
+class FakeFusekiClient:
+    """Client Fuseki des opérations (select, update) : note chaque appel et son mode, synchrone ou async"""
+
+    def __init__(self, update_error=None, query_errors=()):
+        self.update_error = update_error
+        # Fragments des requêtes SELECT qui échouent
+        self.query_errors = query_errors
+        self.calls = []
+
+    def execute_query(self, sparql_query):
+        self.calls.append(("sync", "query"))
+        if any(fragment in sparql_query for fragment in self.query_errors):
+            raise FusekiError(500, "erreur")
+        return self._rows()
+
+    async def aexecute_query(self, sparql_query):
+        self.calls.append(("async", "query"))
+        return self._rows()
+
+    def execute_update(self, sparql_update):
+        self.calls.append(("sync", "update"))
+        return self._updated()
+
+    async def aexecute_update(self, sparql_update):
+        self.calls.append(("async", "update"))
+        return self._updated()
+
+    def _rows(self):
+        bindings = [{"name": {"type": "literal", "value": "Usine"}}]
+        return {"status": "success", "data": {"head": {"vars": ["name"]}, "results": {"bindings": bindings}}}
+
+    def _updated(self):
+        if self.update_error is not None:
+            raise self.update_error
+        return {"status": "success", "message": "Mise à jour effectuée"}
+
+
+class FusekiViewTests(SimpleTestCase):
+    """Une même FusekiView servie par WSGI (views.py) et par ASGI (async_views.py) : mêmes réponses, appels synchrones ou async"""
+
+    PRODUCER = {"id": "p1", "name": "Usine", "type": "Industriel", "city": "Tunis"}
+
+    def setUp(self):
+        self.client_mock = FakeFusekiClient()
+        patcher = mock.patch("backend_app.common.sparql_utils.fuseki_client", self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_request(self, factory):
+        return factory.post("/api/production/producers/create/", json.dumps(self.PRODUCER), content_type="application/json")
+
+    def test_wsgi_view_calls_fuseki_synchronously(self):
+        response = production_views.GetAllProducersView.as_view()(RequestFactory().get("/api/production/producers/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["data"]["results"]["bindings"][0]["name"]["value"], "Usine")
+        self.assertEqual(self.client_mock.calls, [("sync", "query")])
+
+    async def test_asgi_view_gives_same_response(self):
+        wsgi_response = production_views.GetAllProducersView.as_view()(RequestFactory().get("/api/production/producers/"))
+        view = production_async_views.GetAllProducersView.as_view()
+        asgi_response = await view(AsyncRequestFactory().get("/api/production/producers/"))
+        self.assertEqual(asgi_response.status_code, 200)
+        self.assertEqual(json.loads(asgi_response.content), json.loads(wsgi_response.content))
+        self.assertEqual(self.client_mock.calls, [("sync", "query"), ("async", "query")])
+
+    def test_wsgi_update_error_reaches_operation(self):
+        self.client_mock.update_error = FusekiError(503, "indisponible")
+        response = production_views.CreateProducerView.as_view()(self.create_request(RequestFactory()))
+        self.assertEqual(json.loads(response.content)["status"], "error")
+
+    async def test_asgi_update_error_reaches_operation(self):
+        self.client_mock.update_error = FusekiError(503, "indisponible")
+        view = production_async_views.CreateProducerView.as_view()
+        response = await view(self.create_request(AsyncRequestFactory()))
+        self.assertEqual(json.loads(response.content)["status"], "error")
+        self.assertEqual(self.client_mock.calls, [("async", "update")])
+
+    async def test_asgi_validation_needs_no_fuseki(self):
+        request = AsyncRequestFactory().post("/api/production/producers/create/", "{}", content_type="application/json")
+        response = await production_async_views.CreateProducerView.as_view()(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client_mock.calls, [])
+
+
+class BatchViewTests(SimpleTestCase):
+    """/api/batch/ : opérations de lecture nommées, exécutées en parallèle, chacune avec son propre statut"""
+
+    def setUp(self):
+        self.client_mock = FakeFusekiClient(query_errors=("idProducteur",))
+        patcher = mock.patch("backend_app.common.sparql_utils.fuseki_client", self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, operations):
+        body = json.dumps({"operations": operations})
+        return views.batch_view(RequestFactory().post("/api/batch/", body, content_type="application/json"))
+
+    def test_results_keyed_by_id(self):
+        response = self.post([{"id": "classes", "op": "get_all_classes"},
+                              {"op": "get_class_properties", "params": {"class_uri": ONTO + "Producteur"}}])
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.content)["results"]
+        self.assertEqual(set(results), {"classes", "get_class_properties"})
+        self.assertEqual({result["status"] for result in results.values()}, {"success"})
+        self.assertEqual(len(self.client_mock.calls), 2)
+
+    def test_failed_operation_keeps_others(self):
+        response = self.post([{"op": "get_all_classes"}, {"op": "get_all_producers"}])
+        results = json.loads(response.content)["results"]
+        self.assertEqual(results["get_all_classes"]["status"], "success")
+        self.assertEqual(results["get_all_producers"]["status"], "error")
+        self.assertIn("duration_ms", results["get_all_producers"])
+
+    def test_invalid_batches_rejected_before_any_call(self):
+        for operations in ([], [{"op": "delete_producer"}], [{"op": "get_all_classes"}, {"op": "get_all_classes"}],
+                           [{"op": "get_class_properties", "params": {"inconnu": 1}}], ["get_all_classes"]):
+            with self.subTest(operations=operations):
+                self.assertEqual(self.post(operations).status_code, 400)
+        self.assertEqual(self.client_mock.calls, [])
+
+
+class QueryCacheTests(SimpleTestCase):
+    """Cache des résultats : invalidation par IRI touchées et par génération"""
+
+    def setUp(self):
+        self.cache = QueryCache(max_bytes=1024 * 1024, ttl=60)
+
+    def store(self, query, body='{"results": {"bindings": []}}'):
+        self.cache.put(query, query, body, self.cache.generation)
+        return query
+
+    def test_update_on_other_iris_keeps_entry(self):
+        query = self.store(PREFIX + "SELECT ?ville WHERE { onto:p1 onto:ville ?ville }")
+        removed = self.cache.invalidate(PREFIX + 'INSERT DATA { onto:p2 onto:nom "Usine" }')
+        self.assertEqual(removed, 0)
+        self.assertIsNotNone(self.cache.get(query))
+
+    def test_update_on_same_iri_removes_entry(self):
+        query = self.store(PREFIX + "SELECT ?nom WHERE { onto:p1 onto:nom ?nom }")
+        self.assertEqual(self.cache.invalidate(f'INSERT DATA {{ <{ONTO}p1> <{ONTO}nom> "Usine" }}'), 1)
+        self.assertIsNone(self.cache.get(query))
+
+    def test_variable_predicate_depends_on_every_triple_of_subject(self):
+        query = self.store(PREFIX + "SELECT ?p ?o WHERE { onto:p1 ?p ?o }")
+        self.assertEqual(self.cache.invalidate(PREFIX + 'INSERT DATA { onto:p2 onto:ville "Tunis" }'), 1)
+        self.assertIsNone(self.cache.get(query))
+
+    def test_open_type_query_invalidated_by_type_write(self):
+        query = self.store(PREFIX + "SELECT ?s WHERE { ?s a ?type }")
+        self.assertEqual(self.cache.invalidate(PREFIX + "INSERT DATA { onto:p9 a onto:Producteur }"), 1)
+        self.assertIsNone(self.cache.get(query))
+
+    def test_read_started_before_write_is_not_stored(self):
+        query = PREFIX + "SELECT ?nom WHERE { onto:p1 onto:nom ?nom }"
+        generation = self.cache.generation
+        self.cache.invalidate(PREFIX + 'INSERT DATA { onto:p2 onto:nom "Usine" }')
+        self.cache.put(query, query, "{}", generation)
+        self.assertIsNone(self.cache.get(query))
+        self.cache.put(query, query, "{}", self.cache.generation)
+        self.assertEqual(self.cache.get(query), "{}")
+
+
+class FakeSharedGeneration:
+    """Jeton partagé en mémoire, comme SharedGeneration sur un cache Django commun à plusieurs processus"""
+
+    alias = "fake"
+    errors = 0
+
+    def __init__(self):
+        self.token = ""
+        self.available = True
+        self.changes = 0
+
+    def current(self):
+        return self.token if self.available else None
+
+    def change(self):
+        self.changes += 1
+        self.token = f"jeton-{self.changes}"
+
+
+class SharedQueryCacheTests(SimpleTestCase):
+    """Caches de deux workers liés par le jeton partagé : une écriture de l'un vide l'autre"""
+
+    QUERY = PREFIX + "SELECT ?nom WHERE { onto:p1 onto:nom ?nom }"
+
+    def setUp(self):
+        self.shared = FakeSharedGeneration()
+        self.worker_a = QueryCache(max_bytes=1024 * 1024, ttl=60, shared=self.shared)
+        self.worker_b = QueryCache(max_bytes=1024 * 1024, ttl=60, shared=self.shared)
+
+    def store(self, cache):
+        cache.get(self.QUERY)
+        cache.put(self.QUERY, self.QUERY, "{}", cache.generation)
+
+    def test_write_on_other_worker_invalidates(self):
+        self.store(self.worker_a)
+        self.assertEqual(self.worker_a.get(self.QUERY), "{}")
+        # Même une écriture sans rapport avec la requête : l'autre worker ne sait pas ce qu'elle touche
+        self.worker_b.invalidate(PREFIX + 'INSERT DATA { onto:p2 onto:ville "Tunis" }')
+        self.assertIsNone(self.worker_a.get(self.QUERY))
+
+    def test_read_started_before_remote_write_is_not_stored(self):
+        self.worker_a.get(self.QUERY)
+        generation = self.worker_a.generation
+        self.worker_b.invalidate(PREFIX + 'INSERT DATA { onto:p1 onto:nom "Usine" }')
+        self.worker_a.put(self.QUERY, self.QUERY, "{}", generation)
+        self.assertIsNone(self.worker_a.get(self.QUERY))
+
+    def test_writer_drops_its_own_entries(self):
+        self.store(self.worker_a)
+        self.worker_a.invalidate(PREFIX + 'INSERT DATA { onto:p2 onto:ville "Tunis" }')
+        self.assertIsNone(self.worker_a.get(self.QUERY))
+
+    def test_unavailable_shared_cache_bypasses_cache(self):
+        self.store(self.worker_a)
+        self.shared.available = False
+        self.assertIsNone(self.worker_a.get(self.QUERY))
+        self.worker_a.put(self.QUERY, self.QUERY, "{}", self.worker_a.generation)
+        self.shared.available = True
+        self.assertEqual(self.worker_a.get(self.QUERY), "{}")
+
+
+class BindingsParserTests(SimpleTestCase):
+    """Lecture incrémentale d'une réponse SPARQL JSON"""
+
+    BODY = json.dumps({
+        "head": {"vars": ["s", "label"]},
+        "results": {"bindings": [
+            {"s": {"type": "uri", "value": ONTO + "p1"},
+             "label": {"type": "literal", "value": 'crochet ] et "guillemets" \\ échappés'}},
+            {"s": {"type": "uri", "value": ONTO + "p2"}, "label": {"type": "literal", "value": "[]}], "}},
+            {"s": {"type": "uri", "value": ONTO + "p3"}, "label": {"type": "literal", "value": "déchets ♻"}},
+        ]},
+    }, ensure_ascii=False).encode("utf-8")
+
+    def test_byte_by_byte(self):
+        parser = BindingsParser()
+        rows = []
+        for index in range(len(self.BODY)):
+            rows.extend(parser.feed(self.BODY[index:index + 1]))
+        parser.close()
+        self.assertEqual(parser.vars, ["s", "label"])
+        self.assertEqual(rows, json.loads(self.BODY)["results"]["bindings"])
+
+    def test_rows_returned_as_soon_as_complete(self):
+        parser = BindingsParser()
+        first_row_end = self.BODY.index(b"}}, {") + 2
+        self.assertEqual(len(parser.feed(self.BODY[:first_row_end])), 1)
+        self.assertEqual(len(parser.feed(self.BODY[first_row_end:])), 2)
+
+    def test_truncated_body(self):
+        parser = BindingsParser()
+        parser.feed(self.BODY[:-10])
+        with self.assertRaises(ValueError):
+            parser.close()
+
+
+class FakeUpdateClient:
+    """execute_update refuse (400) toute requête contenant un triplet "invalide" """
+
+    def __init__(self, status=400):
+        self.status = status
+        self.updates = []
+
+    def execute_update(self, sparql_update):
+        self.updates.append(sparql_update)
+        if "invalide" in sparql_update:
+            return {"status": "error", "message": "Parse error", "http_status": self.status}
+        return {"status": "success", "message": "Update executed successfully"}
+
+
+class WriteBatcherTests(SimpleTestCase):
+    """Écritures groupées : une requête refusée (400) est coupée en deux jusqu'à isoler l'élément invalide"""
+
+    def add_items(self, batcher, bad=("c",)):
+        for item_id in "abcd":
+            value = "invalide" if item_id in bad else item_id
+            batcher.add(item_id, [f'<{ONTO}{item_id}> <{ONTO}nom> "{value}"'])
+
+    def test_bisects_on_bad_request(self):
+        client = FakeUpdateClient()
+        batcher = WriteBatcher(client=client)
+        self.add_items(batcher)
+        results = batcher.flush()
+        self.assertEqual([result["status"] for result in results], ["success", "success", "error", "success"])
+        self.assertEqual(results[2]["message"], "Parse error")
+        # abcd refusé, ab accepté, cd refusé, c refusé, d accepté
+        self.assertEqual(batcher.requests, 5)
+
+    def test_other_errors_fail_whole_chunk(self):
+        client = FakeUpdateClient(status=503)
+        batcher = WriteBatcher(client=client)
+        self.add_items(batcher)
+        results = batcher.flush()
+        self.assertEqual({result["status"] for result in results}, {"error"})
+        self.assertEqual(batcher.requests, 1)
+
+    def test_chunks_respect_max_triples(self):
+        client = FakeUpdateClient()
+        batcher = WriteBatcher(client=client, max_triples=2)
+        self.add_items(batcher, bad=())
+        batcher.flush()
+        self.assertEqual(batcher.requests, 2)
+
+
+class BulkCreateViewTests(SimpleTestCase):
+    """Création en masse : un élément qui n'est pas un objet JSON est rejeté seul, sans erreur 500"""
+
+    def test_non_object_items_are_reported(self):
+        body = json.dumps({"producers": [1, "producteur", {"id": "p1"}]})
+        request = RequestFactory().post("/api/production/producers/bulk-create/", body, content_type="application/json")
+        response = BulkCreateProducersView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        result = json.loads(response.content)
+        self.assertEqual(result["status"], "error")
+        self.assertEqual([item["id"] for item in result["results"]], [0, 1, "p1"])
+        self.assertEqual(result["results"][0]["message"], "Objet JSON attendu")
+        self.assertEqual(result["requests"], 0)
+
+
+class FakeQueryClient:
+    """execute_query renvoie `rows` lignes numérotées, quelle que soit la requête"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def execute_query(self, sparql_query):
+        self.queries.append(sparql_query)
+        bindings = [{"n": {"type": "literal", "value": str(index)}} for index in range(self.rows)]
+        return {"status": "success", "data": {"head": {"vars": ["n"]}, "results": {"bindings": bindings}}}
+
+
+class PaginationTests(SimpleTestCase):
+    """Curseurs opaques et requête de page (LIMIT taille + 1)"""
+
+    QUERY = PREFIX + "SELECT ?s ?nom WHERE { ?s onto:nom ?nom }"
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(self.QUERY, 200), self.QUERY), 200)
+
+    def test_cursor_bound_to_query(self):
+        cursor = encode_cursor(self.QUERY, 100)
+        with self.assertRaises(CursorError):
+            decode_cursor(cursor, self.QUERY.replace("?nom", "?name"))
+
+    def test_invalid_cursor(self):
+        for cursor in ("pas-un-curseur", "", "e30"):
+            with self.assertRaises(CursorError):
+                decode_cursor(cursor, self.QUERY)
+
+    def test_page_query_fetches_one_extra_row(self):
+        query = page_query(self.QUERY, 10, 30)
+        self.assertIn("ORDER BY ?s ?nom", query)
+        self.assertIn("LIMIT 11", query)
+        self.assertIn("OFFSET 30", query)
+        self.assertNotIn("OFFSET", page_query(self.QUERY, 10))
+
+    def test_run_page_with_more_rows(self):
+        client = FakeQueryClient(rows=11)
+        result = run_page(client, self.QUERY, size=10)
+        self.assertEqual(len(result["data"]["results"]["bindings"]), 10)
+        self.assertEqual(result["page"]["rows"], 10)
+        self.assertEqual(decode_cursor(result["page"]["next_cursor"], self.QUERY), 10)
+
+    def test_run_page_last_page(self):
+        client = FakeQueryClient(rows=4)
+        cursor = encode_cursor(self.QUERY, 10)
+        result = run_page(client, self.QUERY, size=10, cursor=cursor)
+        self.assertIsNone(result["page"]["next_cursor"])
+        self.assertEqual(result["page"]["offset"], 10)
+        self.assertIn("OFFSET 10", client.queries[0])
+
+    def test_page_size_bounds(self):
+        self.assertEqual(page_size("25"), 25)
+        for value in ("0", "abc", "100000"):
+            with self.assertRaises(CursorError):
+                page_size(value)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    """Disjoncteur : fermé, ouvert après N erreurs transitoires, semi-ouvert après le délai"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("backend_app.common.resilience.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failures=2, reset_timeout=30)
+
+    def fail(self, status=503):
+        self.breaker.before_call()
+        self.breaker.record(FusekiError(status, "indisponible"))
+
+    def state(self):
+        return self.breaker.stats()["state"]
+
+    def test_opens_after_consecutive_transient_failures(self):
+        self.fail()
+        self.assertEqual(self.state(), CLOSED)
+        self.fail()
+        self.assertEqual(self.state(), OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+        self.assertEqual(self.breaker.stats()["rejected"], 1)
+
+    def test_query_errors_do_not_count(self):
+        for _ in range(5):
+            self.fail(status=400)
+        self.assertEqual(self.state(), CLOSED)
+
+    def test_success_resets_failure_count(self):
+        self.fail()
+        self.breaker.before_call()
+        self.breaker.record()
+        self.fail()
+        self.assertEqual(self.state(), CLOSED)
+
+    def test_half_open_lets_one_probe_through(self):
+        self.fail()
+        self.fail()
+        self.now += 31
+        self.breaker.before_call()
+        self.assertEqual(self.state(), HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+        self.breaker.record()
+        self.assertEqual(self.state(), CLOSED)
+        self.breaker.before_call()
+
+    def test_failed_probe_reopens(self):
+        self.fail()
+        self.fail()
+        self.now += 31
+        self.fail()
+        self.assertEqual(self.state(), OPEN)
+        self.assertEqual(self.breaker.stats()["opened"], 2)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+
+class NaturalLanguageBatchTests(SimpleTestCase):
+    """/api/nlp_query/batch/ : questions distinctes analysées en un lot, chaque requête SPARQL distincte exécutée une fois"""
+
+    PRODUCERS = {"classes": ["Producteur"], "relations": [], "attrs": []}
+
+    def setUp(self):
+        self.extracted = []
+        self.query_client = FakeQueryClient(3)
+        for patcher in (
+            mock.patch("backend_app.common.batch.translation_cache", TranslationCache(size=10, persist=False)),
+            mock.patch("backend_app.common.batch.extract_entities_versioned", side_effect=self.extract),
+            mock.patch("backend_app.common.batch.wait_until_ready"),
+            mock.patch("backend_app.common.batch.fuseki_client", self.query_client),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def extract(self, questions):
+        self.extracted.append(list(questions))
+        return [self.PRODUCERS for _ in questions], nlp_client.translation_version()
+
+    def post(self, payload):
+        request = RequestFactory().post("/api/nlp_query/batch/", json.dumps(payload), content_type="application/json")
+        return views.nl_batch_view(request)
+
+    def test_identical_queries_run_once(self):
+        questions = ["liste des producteurs", "tous les producteurs", "liste des producteurs"]
+        response = self.post({"questions": questions, "page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content)
+        self.assertEqual(body["questions"], 2)
+        self.assertEqual(body["distinct_queries"], 1)
+        self.assertEqual(self.extracted, [["liste des producteurs", "tous les producteurs"]])
+        self.assertEqual(len(self.query_client.queries), 1)
+        self.assertEqual(len(body["results"]["tous les producteurs"]["result"]["data"]["results"]["bindings"]), 2)
+
+    def test_translations_are_cached(self):
+        self.post({"questions": ["liste des producteurs"], "execute": False})
+        body = json.loads(self.post({"questions": ["liste des producteurs"], "execute": False}).content)
+        self.assertEqual(len(self.extracted), 1)
+        self.assertNotIn("result", body["results"]["liste des producteurs"])
+        self.assertEqual(self.query_client.queries, [])
+
+    def test_invalid_questions_rejected(self):
+        for questions in ([], "liste des producteurs", ["liste des producteurs", "  "], ["ok", 3]):
+            with self.subTest(questions=questions):
+                self.assertEqual(self.post({"questions": questions}).status_code, 400)
+        self.assertEqual(self.extracted, [])
+
+    def test_models_loading_gives_503(self):
+        with mock.patch("backend_app.common.batch.wait_until_ready", side_effect=ModelNotReady("spacy")):
+            response = self.post({"questions": ["liste des producteurs"]})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+
+
+class EmbeddedStoreTests(SimpleTestCase):
+    """Store rdflib embarqué (SPARQL_BACKEND=embedded) derrière le client Fuseki de l'application"""
+
+    DATA = f"""
+    @prefix onto: <{ONTO}> .
+    onto:p1 a onto:Producteur ; onto:nom "Usine" .
+    onto:p2 a onto:Producteur ; onto:nom "Ferme" .
+    """
+    NAMES = PREFIX + "SELECT ?name WHERE { ?p a onto:Producteur ; onto:nom ?name } ORDER BY ?name"
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".ttl", delete=False) as data:
+            data.write(self.DATA)
+        self.addCleanup(os.remove, data.name)
+        self.data_path = data.name
+        self.transport = EmbeddedTransport(data=data.name)
+        self.client = FusekiClient(transport=self.transport, async_transport=AsyncEmbeddedTransport(self.transport),
+                                   backend="embedded")
+
+    def names(self, result):
+        self.assertEqual(result["status"], "success", result)
+        return [row["name"]["value"] for row in result["data"]["results"]["bindings"]]
+
+    def test_select(self):
+        self.assertEqual(self.names(self.client.execute_query(self.NAMES)), ["Ferme", "Usine"])
+
+    def test_update_invalidates_cached_reads(self):
+        self.client.execute_query(self.NAMES)
+        result = self.client.execute_update(PREFIX + 'INSERT DATA { onto:p3 a onto:Producteur ; onto:nom "Atelier" }')
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(self.names(self.client.execute_query(self.NAMES)), ["Atelier", "Ferme", "Usine"])
+
+    def test_delete_where(self):
+        result = self.client.execute_update(PREFIX + "DELETE WHERE { onto:p1 ?property ?value }")
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(self.names(self.client.execute_query(self.NAMES)), ["Ferme"])
+
+    def test_syntax_error_is_400(self):
+        result = self.client.execute_query("SELEC ?s WHERE { ?s ?p ?o }")
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["http_status"], 400)
+        self.assertEqual(self.transport.stats()["errors"], 1)
+
+    def test_stream_is_whole_body(self):
+        chunks = list(self.transport.query_stream(None, self.NAMES, chunk_size=16))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(len(json.loads(b"".join(chunks))["results"]["bindings"]), 2)
+
+    async def test_async_transport(self):
+        self.assertEqual(self.names(await self.client.aexecute_query(self.NAMES)), ["Ferme", "Usine"])
+        await self.client.aexecute_update(PREFIX + "DELETE WHERE { onto:p2 ?property ?value }")
+        self.assertEqual(self.transport.stats()["updates"], 1)
+        self.assertEqual(self.names(await self.client.aexecute_query(self.NAMES)), ["Usine"])
+
+    def test_load_graph_from_several_files(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".nt", delete=False) as data:
+            data.write(f'<{ONTO}p9> <{ONTO}nom> "Dépôt" .\n')
+        self.addCleanup(os.remove, data.name)
+        graph = load_graph(os.pathsep.join([self.data_path, data.name]))
+        self.assertEqual(len(graph), 5)
+
+
+class QueryTemplateTests(SimpleTestCase):
+    """Modèles de requêtes : chaque valeur est échappée selon son type, une valeur invalide lève TemplateError"""
+
+    ECHO = QueryTemplate("test_echo", "SELECT ?value WHERE { BIND({{value}} AS ?value) }", value="string")
+
+    def echo(self, value):
+        graph = EmbeddedTransport(data="").graph
+        rows = list(graph.query(self.ECHO.bind(value=value)))
+        return [str(row.value) for row in rows]
+
+    def test_string_cannot_leave_literal(self):
+        for value in ('" } ; DROP ALL #', 'a\\" . ?s ?p ?o', "ligne 1\nligne 2\t\r"):
+            with self.subTest(value=value):
+                self.assertEqual(self.echo(value), [value])
+
+    def test_invalid_terms(self):
+        template = QueryTemplate("test_terms", "SELECT * WHERE { {{s}} {{p}} ?o . FILTER(?o > {{n}}) }",
+                                 s="iri", p="onto", n="decimal")
+        for values in ({"s": ONTO + "p1> ?x <y", "p": "nom", "n": 1}, {"s": "", "p": "nom", "n": 1},
+                       {"s": ONTO + "p1", "p": "onto:nom", "n": 1}, {"s": ONTO + "p1", "p": "nom", "n": "NaN"},
+                       {"s": ONTO + "p1", "p": "nom", "n": "dix"}, {"s": ONTO + "p1", "p": "nom"}):
+            with self.subTest(values=values), self.assertRaises(TemplateError):
+                template.bind(**values)
+        query = template.bind(s=ONTO + "p1", p="nom", n="2.5")
+        self.assertIn(f"<{ONTO}p1> onto:nom ?o", query)
+        self.assertIn('"2.5"^^xsd:decimal', query)
+        self.assertEqual(query.template, "test_terms")
+
+    def test_declared_params_must_match_slots(self):
+        with self.assertRaises(TemplateError):
+            QueryTemplate("test_missing", "SELECT * WHERE { {{s}} ?p ?o }")
+        with self.assertRaises(TemplateError):
+            QueryTemplate("test_unused", "SELECT * WHERE { ?s ?p ?o }", s="iri")
+        with self.assertRaises(TemplateError):
+            QueryTemplate("test_kind", "SELECT * WHERE { {{s}} ?p ?o }", s="uri")
+        with self.assertRaises(TemplateError):
+            render("modele_inconnu")
+
+    def test_operation_returns_error_response(self):
+        @template_errors
+        def operation(subject):
+            return (yield render("producer_wastes", producer_uri=subject))
+
+        self.assertEqual(run_steps(operation("pas une <iri>")),
+                         {"status": "error", "message": "IRI invalide: 'pas une <iri>'"})
+
+
+class KeywordAutomatonTests(SimpleTestCase):
+    """Automate de mots-clés : mêmes résultats que `in` (sous-chaînes) et que \\b...\\b (mots entiers)"""
+
+    def test_overlapping_keywords(self):
+        hits = KeywordAutomaton(["he", "she", "his", "hers"]).scan("ushers")
+        self.assertEqual(hits.anywhere, {"he", "she", "hers"})
+        self.assertEqual(hits.words, set())
+
+    def test_word_boundaries(self):
+        automaton = KeywordAutomaton(["tri", "trie", "centre de tri", "l'usine"])
+        hits = automaton.scan("le centre de tri trie. l'usine")
+        self.assertEqual(hits.words, {"tri", "trie", "centre de tri", "l'usine"})
+        hits = automaton.scan("triage et centres de triage")
+        self.assertIn("tri", hits)
+        self.assertFalse(hits.word("tri"))
+
+    def test_same_as_substring_and_regex(self):
+        alphabet = "ab é-_"
+        generator = random.Random(18)
+        for _ in range(200):
+            keywords = ["".join(generator.choice(alphabet) for _ in range(generator.randint(1, 3))) for _ in range(6)]
+            text = "".join(generator.choice(alphabet) for _ in range(generator.randint(0, 25)))
+            hits = KeywordAutomaton(keywords).scan(text)
+            with self.subTest(keywords=keywords, text=text):
+                self.assertEqual(hits.anywhere, {keyword for keyword in keywords if keyword in text})
+                self.assertEqual(hits.words, {keyword for keyword in keywords
+                                              if re.search(rf"\b{re.escape(keyword)}\b", text)})
+
+    def test_relation_keywords(self):
+        self.assertEqual(ai_parser.detect_relation("quels superviseurs sont affectés à un centre de tri"), "affecteA")
+        self.assertIsNone(ai_parser.detect_relation("liste des producteurs de Tunis"))
+        self.assertEqual(ai_parser.detect_intent("quel produit final sort de l'usine de recyclage"), "recycling_chain")
+
+
+class LazyModelTests(SimpleTestCase):
+    """Chargement paresseux : wait() réveillé par la fin du chargement voit le modèle prêt"""
+
+    def test_wait_sees_model_loaded_by_background_thread(self):
+        release = threading.Event()
+        model = LazyModel("test", lambda: release.wait(5) and "modèle")
+        model.start()
+        release.set()
+        self.assertTrue(model.wait(5))
+        self.assertEqual(model.get(), "modèle")
+        self.assertIsNotNone(model.load_seconds)
+
+    def test_failed_load_is_retried(self):
+        attempts = []
+
+        def loader():
+            attempts.append(None)
+            if len(attempts) == 1:
+                raise OSError("modèle absent")
+            return "modèle"
+
+        model = LazyModel("test", loader)
+        with self.assertLogs("backend_app.common.nlp_models", level="ERROR"):
+            model.start()
+            self.assertFalse(model.wait(5))
+            model._thread.join(5)
+        self.assertEqual(model.error, "OSError: modèle absent")
+        self.assertEqual(model.get(), "modèle")
+        self.assertTrue(model.wait(0))
+        self.assertIsNone(model.error)
+
+
+class TranslationCacheTests(SimpleTestCase):
+    """Cache des traductions : une question n'est retrouvée sous une autre forme que si la casse seule diffère"""
+
+    QUESTION = "quels superviseurs sont affectes a un centre de compostage"
+    ENTITIES = {"classes": ["Superviseur", "Centre_compostage"], "relations": [], "attrs": []}
+
+    def setUp(self):
+        patcher = mock.patch.object(ai_parser, "NLP_SEMANTIC_FALLBACK", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = TranslationCache(size=10, persist=False)
+
+    def test_accents_are_not_folded(self):
+        # Sans accents, "affectes a" n'est pas un mot-clé de relation ; "affectés à" donne affecteA
+        self.cache.put(self.QUESTION, self.ENTITIES, "SELECT 1")
+        self.assertIsNone(self.cache.get("quels superviseurs sont affectés à un centre de compostage"))
+        self.assertEqual(self.cache.get(self.QUESTION), (self.ENTITIES, "SELECT 1"))
+
+    def test_case_is_folded(self):
+        self.cache.put(self.QUESTION.capitalize(), self.ENTITIES, "SELECT 1")
+        self.assertEqual(self.cache.get(self.QUESTION), (self.ENTITIES, "SELECT 1"))
+
+    def test_spaces_are_not_folded(self):
+        self.cache.put(self.QUESTION, self.ENTITIES, "SELECT 1")
+        self.assertIsNone(self.cache.get(self.QUESTION.replace(" ", "  ")))
+
+    def test_free_text_kept_exact(self):
+        entities = {"classes": ["Producteur"], "relations": [], "attrs": [{"name": "ville", "value": "Tunis"}]}
+        self.cache.put("producteurs de la ville Tunis", entities, "SELECT 2")
+        self.assertIsNone(self.cache.get("producteurs de la ville tunis"))
+        self.assertEqual(self.cache.get("producteurs de la ville Tunis"), (entities, "SELECT 2"))
+
+
+class PersistentTranslationCacheTests(TestCase):
+    """Niveau SQLite du cache de traductions, partagé par des workers dont les versions diffèrent"""
+
+    ENTITIES = {"classes": ["Producteur"], "relations": [], "attrs": []}
+
+    def worker(self):
+        return TranslationCache(size=10, persist=True)
+
+    def version(self, runtime):
+        return mock.patch("backend_app.common.translation_cache.ai_parser.translation_version", return_value=runtime)
+
+    def test_workers_keep_each_others_rows(self):
+        with self.version("lexique-1"):
+            self.worker().put("liste des producteurs", self.ENTITIES, "SELECT 1")
+        with self.version("lexique-2"):
+            self.worker().put("tous les producteurs", self.ENTITIES, "SELECT 2")
+        self.assertEqual(QuestionTranslation.objects.count(), 2)
+        with self.version("lexique-1"):
+            self.assertEqual(self.worker().get("liste des producteurs"), (self.ENTITIES, "SELECT 1"))
+
+    def test_persistent_hit_only_reads(self):
+        with self.version("lexique-1"):
+            self.worker().put("liste des producteurs", self.ENTITIES, "SELECT 1")
+            cache = self.worker()
+            with self.assertNumQueries(1):
+                self.assertIsNotNone(cache.get("liste des producteurs"))
+
+    def test_purge_by_age(self):
+        with self.version("lexique-1"):
+            cache = self.worker()
+            cache.put("liste des producteurs", self.ENTITIES, "SELECT 1")
+            cache.put("tous les producteurs", self.ENTITIES, "SELECT 2")
+        QuestionTranslation.objects.filter(question="tous les producteurs").update(
+            created_at=timezone.now() - timedelta(days=40))
+        self.assertEqual(cache.purge(30), 1)
+        self.assertEqual(list(QuestionTranslation.objects.values_list("question", flat=True)), ["liste des producteurs"])
+
+
+class NLPServerVersionTests(SimpleTestCase):
+    """Avec un serveur NLP, les traductions sont rangées sous la version du lexique qui a extrait les entités"""
+
+    ENTITIES = {"classes": ["Producteur"], "relations": [], "attrs": []}
+
+    def setUp(self):
+        self.remote = nlp_client.NLPClient("http://127.0.0.1:9")
+        self.addCleanup(self.remote._http.close)
+        for patcher in (mock.patch.object(nlp_client, "remote", self.remote),
+                        mock.patch.object(ai_parser, "NLP_SEMANTIC_FALLBACK", False)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cache = TranslationCache(size=10, persist=False)
+
+    def server(self, parser_version):
+        body = {"status": "success", "entities": [self.ENTITIES], "parser_version": parser_version}
+        return mock.patch.object(self.remote, "_request", return_value=body)
+
+    def translate(self, question):
+        entities, version = nlp_client.extract_entities_versioned([question])
+        if version is not None:
+            self.cache.put(question, entities[0], "SELECT 1", version)
+        return version
+
+    def test_version_unknown_before_first_reply(self):
+        self.assertIsNone(nlp_client.translation_version())
+        self.assertIsNone(self.cache.get("liste des producteurs"))
+
+    def test_server_lexicon_in_key(self):
+        with self.server("serveur-1"):
+            version = self.translate("liste des producteurs")
+        self.assertIn("serveur-1", version)
+        self.assertNotIn(ai_parser.parser_version(), version)
+        self.assertEqual(self.cache.get("liste des producteurs"), (self.ENTITIES, "SELECT 1"))
+        with self.server("serveur-2"):
+            self.translate("tous les producteurs")
+        self.assertIsNone(self.cache.get("liste des producteurs"))
+
+    def test_swap_during_extraction_not_cached(self):
+        with self.server(None):
+            self.assertIsNone(self.translate("liste des producteurs"))
+        self.assertEqual(self.cache.stats()["stores"], 0)
+
+    def test_worker_lexicon_change_forgets_server_version(self):
+        with self.server("serveur-1"):
+            self.translate("liste des producteurs")
+        lexicon = mock.Mock(fingerprint="autre-lexique")
+        with mock.patch.object(nlp_client.class_lexicon, "get", return_value=lexicon):
+            self.assertIsNone(self.remote.parser_version())
+            self.assertIsNone(self.cache.get("liste des producteurs"))
+
+    def test_class_write_reloads_server_lexicon(self):
+        with mock.patch.object(self.remote, "_request") as request:
+            nlp_client._on_update(PREFIX + 'INSERT DATA { onto:p1 onto:nom "Usine" }')
+            request.assert_not_called()
+            nlp_client._on_update(PREFIX + 'INSERT DATA { onto:Verre <http://www.w3.org/2000/01/rdf-schema#label> "verre" }')
+        request.assert_called_once_with("POST", "/reload")
+
+
+class NLPServerUnavailableTests(SimpleTestCase):
+    """Serveur NLP injoignable ou en cours de chargement : NLPServerUnavailable côté worker, 503 côté API"""
+
+    def start_server(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        address = "unix:" + os.path.join(directory.name, "nlp.sock")
+        server = nlp_server.make_server(address)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = nlp_client.NLPClient(address, timeout=5)
+        self.addCleanup(client._http.close)
+        return client
+
+    def test_unreachable_server(self):
+        client = nlp_client.NLPClient("unix:/nonexistent/nlp.sock", timeout=1)
+        self.addCleanup(client._http.close)
+        with self.assertRaises(nlp_client.NLPServerUnavailable) as raised:
+            client.extract(["liste des producteurs"])
+        self.assertIsInstance(raised.exception, ModelNotReady)
+
+    def test_models_loading(self):
+        client = self.start_server()
+        with mock.patch.object(nlp_server.ai_parser, "wait_until_ready", side_effect=ModelNotReady("spacy")):
+            with self.assertRaisesRegex(nlp_client.NLPServerUnavailable, "spacy"):
+                client.extract(["liste des producteurs"])
+            response = client._http.post("/extract", json={"questions": ["liste des producteurs"]})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "5")
+
+    def test_invalid_body_is_not_unavailable(self):
+        client = self.start_server()
+        with self.assertRaises(RuntimeError) as raised:
+            client._request("POST", "/extract", {"questions": "liste des producteurs"})
+        self.assertNotIsInstance(raised.exception, nlp_client.NLPServerUnavailable)
+
+    def test_query_view_answers_503(self):
+        unavailable = nlp_client.NLPServerUnavailable("ConnectError: refused")
+        with mock.patch.object(views, "translation_cache", TranslationCache(size=10, persist=False)), \
+                mock.patch.object(views, "wait_until_ready"), \
+                mock.patch.object(views, "extract_entities_versioned", side_effect=unavailable):
+            request = RequestFactory().post("/api/nlp_query/", json.dumps({"question": "liste des producteurs"}),
+                                            content_type="application/json")
+            response = views.query_view(request)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+        self.assertIn("Serveur NLP indisponible", json.loads(response.content)["message"])
+
+
+class RefreshingSnapshotTests(SimpleTestCase):
+    """Valeurs lues dans Fuseki : get() ne lance aucune lecture, start() et les écritures rechargent"""
+
+    def snapshot(self, loader, ttl=600):
+        snapshot = RefreshingSnapshot("test", DYNAMIC_ATTRIBUTES_QUERY.text, loader, ["secours"], ttl=ttl)
+        self.addCleanup(snapshot.stop)
+        return snapshot
+
+    def test_get_does_not_load(self):
+        loads = []
+        snapshot = self.snapshot(lambda: loads.append(None) or ["nom"], ttl=0)
+        self.assertEqual(snapshot.get(), ["secours"])
+        self.assertEqual(loads, [])
+        self.assertFalse(snapshot.loaded)
+
+    def test_start_reloads_every_ttl(self):
+        reloaded = threading.Event()
+        loads = []
+
+        def loader():
+            loads.append(None)
+            if len(loads) == 2:
+                reloaded.set()
+            return ["nom"]
+
+        snapshot = self.snapshot(loader, ttl=0.01)
+        snapshot.start()
+        self.assertTrue(reloaded.wait(5))
+        self.assertEqual(snapshot.get(), ["nom"])
+
+    def test_failed_load_keeps_value(self):
+        def loader():
+            raise RuntimeError("Fuseki indisponible")
+
+        snapshot = self.snapshot(loader)
+        with self.assertLogs("backend_app.common.vocabulary", level="WARNING"):
+            snapshot.refresh()
+            snapshot.wait(5)
+        self.assertEqual(snapshot.get(), ["secours"])
+        self.assertEqual(snapshot.stats()["failures"], 1)
+
+    def test_write_on_properties_reloads_from_client(self):
+        bindings = [{"attr": {"type": "uri", "value": ONTO + "Poids"}}]
+        client = mock.Mock()
+        client.execute_query.return_value = {"status": "success", "data": {"results": {"bindings": bindings}}}
+        snapshot = self.snapshot(load_dynamic_attributes)
+        with mock.patch("backend_app.common.vocabulary.fuseki_client", client):
+            snapshot.on_update(PREFIX + 'INSERT DATA { onto:p1 onto:nom "Usine" }')
+            snapshot.wait(5)
+            self.assertEqual(client.execute_query.call_count, 0)
+            snapshot.on_update(PREFIX + "INSERT DATA { onto:Poids a <http://www.w3.org/1999/02/22-rdf-syntax-ns#Property> }")
+            snapshot.wait(5)
+        self.assertEqual(snapshot.get(), ["poids"])
+
+
+class LexiconTests(SimpleTestCase):
+    """Lexique des classes : expressions normalisées sans doublons, empreinte, fichier de mots-clés validé"""
+
+    def write_file(self, data):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as source:
+            json.dump(data, source)
+        self.addCleanup(os.remove, source.name)
+        return source.name
+
+    def test_phrases_deduplicated(self):
+        lexicon = Lexicon(["Producteur"], {"Producteur": ["Producteurs", "producteurs ", "  ", "usine"]},
+                          {"Producteur": ["producteurs"]})
+        self.assertEqual(lexicon.phrases, {"Producteur": ["producteurs", "usine"]})
+        self.assertEqual(lexicon.duplicates, 2)
+
+    def test_fingerprint(self):
+        lexicon = Lexicon(["Producteur"], {"Producteur": ["usine"]})
+        self.assertEqual(Lexicon(["Producteur"], {"Producteur": ["Usine", "usine"]}).fingerprint, lexicon.fingerprint)
+        self.assertNotEqual(Lexicon(["Producteur"], {"Producteur": ["usine", "ferme"]}).fingerprint,
+                            lexicon.fingerprint)
+
+    def test_shipped_file_is_valid(self):
+        classes, keywords = read_lexicon_file()
+        self.assertTrue(classes)
+        self.assertTrue(keywords)
+
+    def test_malformed_file_rejected(self):
+        for data in ({"classes": "Producteur"}, {"keywords": {"Producteur": "usine"}},
+                     {"keywords": ["usine"]}, {"classes": [1]}):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                read_lexicon_file(self.write_file(data))
+
+    def test_ontology_labels_and_keywords(self):
+        bindings = [
+            {"class": {"type": "uri", "value": ONTO + "Producteur"}, "label": {"type": "literal", "value": "Producteur"}},
+            {"class": {"type": "uri", "value": ONTO + "Camion"}},
+            {"class": {"type": "uri", "value": "http://www.w3.org/2002/07/owl#Thing"}},
+        ]
+        client = mock.Mock()
+        client.execute_query.return_value = {"status": "success", "data": {"results": {"bindings": bindings}}}
+        path = self.write_file({"keywords": {"Producteur": ["usine"], "Centre_tri": ["centre de tri"]}})
+        with mock.patch("backend_app.common.lexicon.fuseki_client", client), \
+                mock.patch("backend_app.common.lexicon.read_lexicon_file", lambda: read_lexicon_file(path)):
+            lexicon = load_class_lexicon()
+        self.assertEqual(lexicon.classes, ["Producteur", "Camion", "Centre_tri"])
+        self.assertEqual(lexicon.phrases["Producteur"], ["producteur", "usine"])
+        self.assertEqual(lexicon.unknown_classes, ["Centre_tri"])
+
+
+class FakeStreamClient:
+    """stream_query / astream_query : corps JSON de `rows` lignes découpé en morceaux, erreur après `fail_after` morceaux"""
+
+    def __init__(self, rows, chunk_size=40, fail_after=None):
+        bindings = [{"n": {"type": "literal", "value": str(index)}} for index in range(rows)]
+        body = json.dumps({"head": {"vars": ["n"]}, "results": {"bindings": bindings}}).encode("utf-8")
+        self.chunks = [body[start:start + chunk_size] for start in range(0, len(body), chunk_size)]
+        self.fail_after = fail_after
+        self.queries = []
+
+    def stream_query(self, sparql_query):
+        self.queries.append(sparql_query)
+        return self._chunks()
+
+    def _chunks(self):
+        for index, chunk in enumerate(self.chunks):
+            if index == self.fail_after:
+                raise FusekiError(503, "flux interrompu")
+            yield chunk
+
+    async def astream_query(self, sparql_query):
+        for chunk in self.stream_query(sparql_query):
+            yield chunk
+
+
+def parse_sse(messages):
+    """[(événement, données)] d'un flux text/event-stream"""
+    events = []
+    for message in "".join(messages).split("\n\n"):
+        if message:
+            event, data = message.split("\n")
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+class SSEResponseTests(SimpleTestCase):
+    """Réponse SSE : événements donnés d'abord, puis head / rows / end (ou error) au fil des morceaux reçus"""
+
+    def stream(self, client):
+        patcher = mock.patch("backend_app.common.streaming.fuseki_client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_events_before_fuseki(self):
+        client = FakeStreamClient(30)
+        self.stream(client)
+        response = sse_select_response("SELECT ?n", [("query", {"sparql": "SELECT ?n"})], max_rows=4)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = iter(response.streaming_content)
+        first = next(content)
+        self.assertEqual(client.queries, [])
+        events = parse_sse([first.decode("utf-8"), *(chunk.decode("utf-8") for chunk in content)])
+        names = [event for event, _ in events]
+        self.assertEqual(names[:2], ["query", "head"])
+        self.assertEqual(names[-1], "end")
+        rows = [row for event, data in events if event == "rows" for row in data]
+        self.assertEqual([row["n"]["value"] for row in rows], [str(index) for index in range(30)])
+        self.assertTrue(all(len(data) <= 4 for event, data in events if event == "rows"))
+        self.assertEqual(events[-1][1], {"status": "success", "rows": 30})
+
+    def test_empty_result(self):
+        self.stream(FakeStreamClient(0))
+        events = parse_sse(chunk.decode("utf-8") for chunk in sse_select_response("SELECT ?n").streaming_content)
+        self.assertEqual(events, [("head", {"vars": ["n"]}), ("end", {"status": "success", "rows": 0})])
+
+    def test_error_after_some_rows(self):
+        self.stream(FakeStreamClient(30, fail_after=5))
+        events = parse_sse(chunk.decode("utf-8") for chunk in sse_select_response("SELECT ?n").streaming_content)
+        event, data = events[-1]
+        self.assertEqual(event, "error")
+        self.assertIn("flux interrompu", data["message"])
+        self.assertEqual(data["rows"], sum(len(rows) for name, rows in events if name == "rows"))
+        self.assertNotIn("end", [name for name, _ in events])
+
+    async def test_async_response(self):
+        self.stream(FakeStreamClient(12))
+        response = asse_select_response("SELECT ?n", [("query", {})], max_rows=5)
+        events = parse_sse([chunk.decode("utf-8") async for chunk in response.streaming_content])
+        self.assertEqual(events[0], ("query", {}))
+        self.assertEqual(events[-1], ("end", {"status": "success", "rows": 12}))
+
+
+class MetricsViewTests(SimpleTestCase):
+    """/api/metrics/ : réservé au staff et aux adresses de METRICS_ALLOWED_IPS"""
+
+    def get(self, user=None, address="203.0.113.7"):
+        request = RequestFactory().get("/api/metrics/", REMOTE_ADDR=address)
+        request.user = user or AnonymousUser()
+        return views.metrics_view(request)
+
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_anonymous_client_is_refused(self):
+        self.assertEqual(self.get().status_code, 403)
+        self.assertEqual(self.get(address="127.0.0.1").status_code, 403)
+
+    @override_settings(METRICS_ALLOWED_IPS=["203.0.113.7"])
+    def test_allowed_address(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("fuseki", json.loads(response.content))
+
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_staff_user(self):
+        staff = mock.Mock(is_active=True, is_staff=True)
+        self.assertEqual(self.get(user=staff).status_code, 200)
+        self.assertEqual(self.get(user=mock.Mock(is_active=True, is_staff=False)).status_code, 403)
@@ -11,6 +11,7 @@ urlpatterns = [
     # Ajout de centres
     path('ajouter-tri/', views.ajouter_centre_tri, name='ajouter_centre_tri'),
     path('ajouter-compostage/', views.ajouter_centre_compostage, name='ajouter_centre_compostage'),
+    path('ajouter-centres/', views.ajouter_centres, name='ajouter_centres'),
     
     # Statistiques
     path('stats-tri/', views.get_statistiques_tri, name='get_statistiques_tri'),
@@ -2,60 +2,36 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
+from backend_app.common.formats import sparql_response
 from backend_app.common.sparql_utils import fuseki_client
+from backend_app.common.write_batcher import insert_data_query
+from backend_app.tri_compostage.center_queries import (
+    CENTRES_COMPOSTAGE_QUERY,
+    CENTRES_TRI_QUERY,
+    DECHETS_COMPOSTABLES_QUERY,
+    DECHETS_TRIES_QUERY,
+    STATISTIQUES_COMPOSTAGE_QUERY,
+    STATISTIQUES_TRI_QUERY,
+    bulk_create_centers,
+    centre_compostage_triples,
+    centre_tri_triples,
+)
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def get_centres_tri(request):
     """Récupère tous les centres de tri"""
-    sparql_query = """
-    PREFIX ex: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT ?centre ?nom ?type ?localisation ?capacite ?statut ?debit_tri ?taux_purete WHERE {
-        ?centre rdf:type ?centreType .
-        ?centreType rdfs:subClassOf* ex:Centre_tri .
-        
-        ?centre ex:nom ?nom .
-        OPTIONAL { ?centre ex:localisation ?localisation }
-        OPTIONAL { ?centre ex:capacite_journaliere ?capacite }
-        OPTIONAL { ?centre ex:statut_actif ?statut }
-        OPTIONAL { ?centre ex:debit_tri_heure ?debit_tri }
-        OPTIONAL { ?centre ex:taux_purete_sortie ?taux_purete }
-        
-        BIND(STRAFTER(STR(?centreType), "#") AS ?type)
-    }
-    ORDER BY ?nom
-    """
+    sparql_query = CENTRES_TRI_QUERY.bind()
     result = fuseki_client.execute_query(sparql_query)
-    return JsonResponse(result)
+    return sparql_response(request, result)
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def get_centres_compostage(request):
     """Récupère tous les centres de compostage"""
-    sparql_query = """
-    PREFIX ex: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT ?centre ?nom ?type ?localisation ?temperature ?temps_compostage ?statut WHERE {
-        ?centre rdf:type ?centreType .
-        ?centreType rdfs:subClassOf* ex:Centre_compostage .
-        
-        ?centre ex:nom ?nom .
-        OPTIONAL { ?centre ex:localisation ?localisation }
-        OPTIONAL { ?centre ex:temperature_moyenne ?temperature }
-        OPTIONAL { ?centre ex:temps_compostage_jours ?temps_compostage }
-        OPTIONAL { ?centre ex:statut_actif ?statut }
-        
-        BIND(STRAFTER(STR(?centreType), "#") AS ?type)
-    }
-    ORDER BY ?nom
-    """
+    sparql_query = CENTRES_COMPOSTAGE_QUERY.bind()
     result = fuseki_client.execute_query(sparql_query)
-    return JsonResponse(result)
+    return sparql_response(request, result)
 
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -65,19 +41,9 @@ def get_dechets_tries(request):
         data = json.loads(request.body)
         centre_nom = data.get('centre_nom', '')
         
-        sparql_query = f"""
-        PREFIX ex: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        
-        SELECT ?dechet ?type_dechet ?quantite WHERE {{
-            ?centre ex:nom "{centre_nom}" ;
-                    ex:trie ?dechet .
-            ?dechet ex:nom ?type_dechet ;
-                    ex:quantite ?quantite .
-        }}
-        """
+        sparql_query = DECHETS_TRIES_QUERY.bind(centre_nom=centre_nom)
         result = fuseki_client.execute_query(sparql_query)
-        return JsonResponse(result)
+        return sparql_response(request, result)
         
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
@@ -90,19 +56,9 @@ def get_dechets_compostables(request):
         data = json.loads(request.body)
         centre_nom = data.get('centre_nom', '')
         
-        sparql_query = f"""
-        PREFIX ex: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        
-        SELECT ?dechet ?type_dechet ?quantite WHERE {{
-            ?centre ex:nom "{centre_nom}" ;
-                    ex:traite_par_compostage ?dechet .
-            ?dechet ex:nom ?type_dechet ;
-                    ex:quantite ?quantite .
-        }}
-        """
+        sparql_query = DECHETS_COMPOSTABLES_QUERY.bind(centre_nom=centre_nom)
         result = fuseki_client.execute_query(sparql_query)
-        return JsonResponse(result)
+        return sparql_response(request, result)
         
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
@@ -114,20 +70,10 @@ def ajouter_centre_tri(request):
     try:
         data = json.loads(request.body)
         
-        sparql_update = f"""
-        PREFIX ex: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-        PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-        
-        INSERT DATA {{
-            ex:{data['id']} a ex:{data['type_centre']} ;
-                ex:nom "{data['nom']}" ;
-                ex:localisation "{data['localisation']}" ;
-                ex:capacite_journaliere "{data['capacite']}"^^xsd:decimal ;
-                ex:debit_tri_heure "{data['debit_tri']}"^^xsd:decimal ;
-                ex:taux_purete_sortie "{data['taux_purete']}"^^xsd:decimal ;
-                ex:statut_actif "{data['statut']}"^^xsd:boolean .
-        }}
-        """
+        sparql_update = insert_data_query(centre_tri_triples(
+            data['id'], data['type_centre'], data['nom'], data['localisation'],
+            data['capacite'], data['debit_tri'], data['taux_purete'], data['statut']
+        ))
         result = fuseki_client.execute_update(sparql_update)
         return JsonResponse(result)
         
@@ -141,66 +87,46 @@ def ajouter_centre_compostage(request):
     try:
         data = json.loads(request.body)
         
-        sparql_update = f"""
-        PREFIX ex: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-        PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-        
-        INSERT DATA {{
-            ex:{data['id']} a ex:{data['type_centre']} ;
-                ex:nom "{data['nom']}" ;
-                ex:localisation "{data['localisation']}" ;
-                ex:capacite_journaliere "{data['capacite']}"^^xsd:decimal ;
-                ex:temperature_moyenne "{data['temperature']}"^^xsd:decimal ;
-                ex:temps_compostage_jours "{data['temps_compostage']}"^^xsd:integer ;
-                ex:statut_actif "{data['statut']}"^^xsd:boolean .
-        }}
-        """
+        sparql_update = insert_data_query(centre_compostage_triples(
+            data['id'], data['type_centre'], data['nom'], data['localisation'],
+            data['capacite'], data['temperature'], data['temps_compostage'], data['statut']
+        ))
         result = fuseki_client.execute_update(sparql_update)
         return JsonResponse(result)
         
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def ajouter_centres(request):
+    """Ajoute plusieurs centres (tri et/ou compostage) en quelques requêtes INSERT DATA"""
+    try:
+        data = json.loads(request.body)
+        centres = data.get('centres')
+        if not isinstance(centres, list) or not centres:
+            return JsonResponse({'status': 'error', 'message': "Le champ 'centres' doit être une liste non vide"}, status=400)
+        
+        result = bulk_create_centers(centres)
+        return JsonResponse(result)
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Données JSON invalides'}, status=400)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def get_statistiques_tri(request):
     """Récupère les statistiques de tri"""
-    sparql_query = """
-    PREFIX ex: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT ?type_dechet (SUM(?quantite) as ?total_quantite) WHERE {
-        ?centre rdf:type ?centreType ;
-                ex:trie ?dechet .
-        ?centreType rdfs:subClassOf* ex:Centre_tri .
-        ?dechet ex:nom ?type_dechet ;
-                ex:quantite ?quantite .
-    }
-    GROUP BY ?type_dechet
-    ORDER BY DESC(?total_quantite)
-    """
+    sparql_query = STATISTIQUES_TRI_QUERY.bind()
     result = fuseki_client.execute_query(sparql_query)
-    return JsonResponse(result)
+    return sparql_response(request, result)
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def get_statistiques_compostage(request):
     """Récupère les statistiques de compostage"""
-    sparql_query = """
-    PREFIX ex: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT ?centre ?nom (SUM(?quantite) as ?total_traite) WHERE {
-        ?centre rdf:type ?centreType ;
-                ex:nom ?nom ;
-                ex:traite_par_compostage ?dechet .
-        ?centreType rdfs:subClassOf* ex:Centre_compostage .
-        ?dechet ex:quantite ?quantite .
-    }
-    GROUP BY ?centre ?nom
-    ORDER BY DESC(?total_traite)
-    """
+    sparql_query = STATISTIQUES_COMPOSTAGE_QUERY.bind()
     result = fuseki_client.execute_query(sparql_query)
-    return JsonResponse(result)
\ No newline at end of file
+    return sparql_response(request, result)
\ No newline at end of file
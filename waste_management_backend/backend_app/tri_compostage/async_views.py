@@ -0,0 +1,10 @@
+"""Vues async (ASGI, ASYNC_VIEWS=true) : les vues de views.py, dont les appels à Fuseki ne bloquent pas la boucle d'événements"""
+from backend_app.common.fuseki_views import asynchronous
+from backend_app.tri_compostage import views
+
+GetAllSortingCentersView = asynchronous(views.GetAllSortingCentersView)
+GetSortingCentersByTypeView = asynchronous(views.GetSortingCentersByTypeView)
+GetCenterWastesView = asynchronous(views.GetCenterWastesView)
+GetSortingCentersStatisticsView = asynchronous(views.GetSortingCentersStatisticsView)
+SearchSortingCentersView = asynchronous(views.SearchSortingCentersView)
+GetCenterDetailsView = asynchronous(views.GetCenterDetailsView)
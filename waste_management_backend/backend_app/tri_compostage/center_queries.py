@@ -1,244 +1,343 @@
 # backend_app/tri_compostage/center_queries.py
-from SPARQLWrapper import SPARQLWrapper, JSON
-import os
+from backend_app.common.query_templates import boolean, decimal, integer, literal, onto_name, register, template_errors
+from backend_app.common.sparql_utils import fuseki_operation, select
+from backend_app.common.write_batcher import WriteBatcher, summarize
 
-# Configuration Fuseki
-FUSEKI_URL = os.environ.get("SPARQL_ENDPOINT")
+ALL_SORTING_CENTERS_QUERY = register("all_sorting_centers", """
+SELECT DISTINCT ?center ?id ?nomCentre ?type ?typeCentre ?statutOperationnel ?horairesOuverture ?adresse WHERE {
+    # Chercher toutes les instances de Centre_traitement et ses sous-classes
+    # (Centre_tri, Centre_compostage, Usine_recyclage)
+    {
+        ?center a onto:Centre_traitement .
+    }
+    UNION
+    {
+        ?center a ?subclass .
+        ?subclass rdfs:subClassOf onto:Centre_traitement .
+    }
 
+    # Récupérer les propriétés - rendre idCentre et nomCentre optionnels au cas où
+    OPTIONAL { ?center onto:idCentre ?idCentre }
+    OPTIONAL { ?center onto:nomCentre ?nomCentre }
+    OPTIONAL { ?center onto:typeCentre ?typeCentre }
+    OPTIONAL { ?center onto:statutOperationnel ?statutOperationnel }
+    OPTIONAL { ?center onto:horairesOuverture ?horairesOuverture }
+    OPTIONAL { ?center onto:adresse ?adresse }
+
+    # Utiliser idCentre si disponible, sinon l'URI comme ID
+    BIND(COALESCE(?idCentre, REPLACE(STR(?center), "^.*#", "")) AS ?id)
+
+    # Récupérer le type spécifique (la classe réelle la plus spécifique)
+    ?center a ?type .
+    FILTER(STRSTARTS(STR(?type), STR(onto:)))
+    # Exclure Centre_traitement et Acteur pour garder les types spécifiques
+    FILTER(?type != onto:Centre_traitement)
+    FILTER(?type != onto:Acteur)
+    # S'assurer qu'on prend le type le plus spécifique (pas une super-classe)
+    FILTER(NOT EXISTS {
+        ?center a ?moreSpecific .
+        ?moreSpecific rdfs:subClassOf ?type .
+        FILTER(?moreSpecific != ?type)
+        FILTER(STRSTARTS(STR(?moreSpecific), STR(onto:)))
+    })
+}
+ORDER BY ?nomCentre
+""")
+
+def all_sorting_centers_query():
+    """Construit la requête SPARQL de get_all_sorting_centers"""
+    return ALL_SORTING_CENTERS_QUERY.bind()
+
+@fuseki_operation
 def get_all_sorting_centers():
     """Récupère tous les centres de tri avec leurs détails"""
-    try:
-        sparql = SPARQLWrapper(FUSEKI_URL + "/query")
-        query = """
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        PREFIX onto: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-        
-        SELECT DISTINCT ?center ?id ?nomCentre ?type ?typeCentre ?statutOperationnel ?horairesOuverture ?adresse WHERE {
-            # Chercher toutes les instances de Centre_traitement et ses sous-classes
-            # (Centre_tri, Centre_compostage, Usine_recyclage)
-            {
-                ?center a onto:Centre_traitement .
-            }
-            UNION
-            {
-                ?center a ?subclass .
-                ?subclass rdfs:subClassOf onto:Centre_traitement .
-            }
-            
-            # Récupérer les propriétés - rendre idCentre et nomCentre optionnels au cas où
-            OPTIONAL { ?center onto:idCentre ?idCentre }
-            OPTIONAL { ?center onto:nomCentre ?nomCentre }
-            OPTIONAL { ?center onto:typeCentre ?typeCentre }
-            OPTIONAL { ?center onto:statutOperationnel ?statutOperationnel }
-            OPTIONAL { ?center onto:horairesOuverture ?horairesOuverture }
-            OPTIONAL { ?center onto:adresse ?adresse }
-            
-            # Utiliser idCentre si disponible, sinon l'URI comme ID
-            BIND(COALESCE(?idCentre, REPLACE(STR(?center), "^.*#", "")) AS ?id)
-            
-            # Récupérer le type spécifique (la classe réelle la plus spécifique)
-            ?center a ?type .
-            FILTER(STRSTARTS(STR(?type), STR(onto:)))
-            # Exclure Centre_traitement et Acteur pour garder les types spécifiques
-            FILTER(?type != onto:Centre_traitement)
-            FILTER(?type != onto:Acteur)
-            # S'assurer qu'on prend le type le plus spécifique (pas une super-classe)
-            FILTER(NOT EXISTS {
-                ?center a ?moreSpecific .
-                ?moreSpecific rdfs:subClassOf ?type .
-                FILTER(?moreSpecific != ?type)
-                FILTER(STRSTARTS(STR(?moreSpecific), STR(onto:)))
-            })
-        }
-        ORDER BY ?nomCentre
-        """
-        sparql.setQuery(query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        return {"status": "success", "data": results}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    return (yield select(all_sorting_centers_query()))
 
+SORTING_CENTERS_BY_TYPE_QUERY = register("sorting_centers_by_type", """
+SELECT ?center ?id ?nomCentre ?typeCentre ?statutOperationnel ?horairesOuverture ?adresse WHERE {
+    ?center a {{center_class}} .
+    ?center onto:idCentre ?id .
+    ?center onto:nomCentre ?nomCentre .
+    OPTIONAL { ?center onto:typeCentre ?typeCentre }
+    OPTIONAL { ?center onto:statutOperationnel ?statutOperationnel }
+    OPTIONAL { ?center onto:horairesOuverture ?horairesOuverture }
+    OPTIONAL { ?center onto:adresse ?adresse }
+}
+ORDER BY ?nomCentre
+""", center_class="onto")
+
+def sorting_centers_by_type_query(center_type):
+    """Construit la requête SPARQL de get_sorting_centers_by_type"""
+    # Mapping des types pour faciliter l'utilisation
+    type_mapping = {
+        "automatise": "Centre_Tri_Automatise",
+        "manuel": "Centre_Tri_Manuel",
+        "optique": "Centre_Tri_Optique",
+        "magnetique": "Centre_Tri_Magnetique",
+        "densite": "Centre_Tri_Densite",
+        "mixte": "Centre_Tri_Mixte"
+    }
+    
+    center_class = type_mapping.get(center_type.lower(), "Centre_tri")
+    
+    return SORTING_CENTERS_BY_TYPE_QUERY.bind(center_class=center_class)
+
+@fuseki_operation
 def get_sorting_centers_by_type(center_type):
     """Récupère les centres de tri par type spécifique"""
-    try:
-        sparql = SPARQLWrapper(FUSEKI_URL + "/query")
-        
-        # Mapping des types pour faciliter l'utilisation
-        type_mapping = {
-            "automatise": "onto:Centre_Tri_Automatise",
-            "manuel": "onto:Centre_Tri_Manuel",
-            "optique": "onto:Centre_Tri_Optique",
-            "magnetique": "onto:Centre_Tri_Magnetique",
-            "densite": "onto:Centre_Tri_Densite",
-            "mixte": "onto:Centre_Tri_Mixte"
-        }
-        
-        center_class = type_mapping.get(center_type.lower(), "onto:Centre_tri")
-        
-        query = f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        PREFIX onto: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-        
-        SELECT ?center ?id ?nomCentre ?typeCentre ?statutOperationnel ?horairesOuverture ?adresse WHERE {{
-            ?center a {center_class} .
-            ?center onto:idCentre ?id .
-            ?center onto:nomCentre ?nomCentre .
-            OPTIONAL {{ ?center onto:typeCentre ?typeCentre }}
-            OPTIONAL {{ ?center onto:statutOperationnel ?statutOperationnel }}
-            OPTIONAL {{ ?center onto:horairesOuverture ?horairesOuverture }}
-            OPTIONAL {{ ?center onto:adresse ?adresse }}
-        }}
-        ORDER BY ?nomCentre
-        """
-        sparql.setQuery(query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        return {"status": "success", "data": results}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    return (yield select(sorting_centers_by_type_query(center_type)))
+
+CENTER_WASTES_QUERY = register("center_wastes", """
+SELECT ?waste ?id ?name ?type ?weight ?quantity ?dangerLevel WHERE {
+    {{center_uri}} onto:trié_par ?waste .
+    ?waste onto:idDechet ?id .
+    OPTIONAL { ?waste onto:nom ?name }
+    OPTIONAL { ?waste onto:poids ?weight }
+    OPTIONAL { ?waste onto:quantite ?quantity }
+    OPTIONAL { ?waste onto:niveauDangerosite ?dangerLevel }
+
+    # Récupérer le type de déchet
+    OPTIONAL {
+        ?waste a ?type .
+        FILTER(?type != onto:Dechets)
+        FILTER(STRSTARTS(STR(?type), STR(onto:)))
+    }
+}
+ORDER BY ?id
+""", center_uri="iri")
 
+def center_wastes_query(center_uri):
+    """Construit la requête SPARQL de get_center_wastes"""
+    return CENTER_WASTES_QUERY.bind(center_uri=center_uri)
+
+@fuseki_operation
+@template_errors
 def get_center_wastes(center_uri):
     """Récupère les déchets triés par un centre de tri spécifique"""
-    try:
-        sparql = SPARQLWrapper(FUSEKI_URL + "/query")
-        query = f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        PREFIX onto: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-        
-        SELECT ?waste ?id ?name ?type ?weight ?quantity ?dangerLevel WHERE {{
-            <{center_uri}> onto:trié_par ?waste .
-            ?waste onto:idDechet ?id .
-            OPTIONAL {{ ?waste onto:nom ?name }}
-            OPTIONAL {{ ?waste onto:poids ?weight }}
-            OPTIONAL {{ ?waste onto:quantite ?quantity }}
-            OPTIONAL {{ ?waste onto:niveauDangerosite ?dangerLevel }}
-            
-            # Récupérer le type de déchet
-            OPTIONAL {{
-                ?waste a ?type .
-                FILTER(?type != onto:Dechets)
-                FILTER(STRSTARTS(STR(?type), STR(onto:)))
-            }}
-        }}
-        ORDER BY ?id
-        """
-        sparql.setQuery(query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        return {"status": "success", "data": results}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    return (yield select(center_wastes_query(center_uri)))
+
+SORTING_CENTERS_STATISTICS_QUERY = register("sorting_centers_statistics", """
+SELECT 
+    (COUNT(DISTINCT ?center) AS ?totalCenters)
+    (COUNT(DISTINCT ?automatise) AS ?automatiseCenters)
+    (COUNT(DISTINCT ?manuel) AS ?manuelCenters) 
+    (COUNT(DISTINCT ?optique) AS ?optiqueCenters)
+    (COUNT(DISTINCT ?magnetique) AS ?magnetiqueCenters)
+    (COUNT(DISTINCT ?densite) AS ?densiteCenters)
+    (COUNT(DISTINCT ?mixte) AS ?mixteCenters)
+    (COUNT(DISTINCT ?enService) AS ?enServiceCenters)
+WHERE {
+    { ?center a onto:Centre_tri }
+    UNION
+    { ?automatise a onto:Centre_Tri_Automatise }
+    UNION  
+    { ?manuel a onto:Centre_Tri_Manuel }
+    UNION
+    { ?optique a onto:Centre_Tri_Optique }
+    UNION
+    { ?magnetique a onto:Centre_Tri_Magnetique }
+    UNION
+    { ?densite a onto:Centre_Tri_Densite }
+    UNION
+    { ?mixte a onto:Centre_Tri_Mixte }
+    UNION
+    { 
+        ?center onto:statutOperationnel ?statut .
+        FILTER(?statut = "en_service")
+    }
+}
+""")
 
+def sorting_centers_statistics_query():
+    """Construit la requête SPARQL de get_sorting_centers_statistics"""
+    return SORTING_CENTERS_STATISTICS_QUERY.bind()
+
+@fuseki_operation
 def get_sorting_centers_statistics():
     """Récupère des statistiques sur les centres de tri"""
-    try:
-        sparql = SPARQLWrapper(FUSEKI_URL + "/query")
-        query = """
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        PREFIX onto: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-        
-        SELECT 
-            (COUNT(DISTINCT ?center) AS ?totalCenters)
-            (COUNT(DISTINCT ?automatise) AS ?automatiseCenters)
-            (COUNT(DISTINCT ?manuel) AS ?manuelCenters) 
-            (COUNT(DISTINCT ?optique) AS ?optiqueCenters)
-            (COUNT(DISTINCT ?magnetique) AS ?magnetiqueCenters)
-            (COUNT(DISTINCT ?densite) AS ?densiteCenters)
-            (COUNT(DISTINCT ?mixte) AS ?mixteCenters)
-            (COUNT(DISTINCT ?enService) AS ?enServiceCenters)
-        WHERE {
-            { ?center a onto:Centre_tri }
-            UNION
-            { ?automatise a onto:Centre_Tri_Automatise }
-            UNION  
-            { ?manuel a onto:Centre_Tri_Manuel }
-            UNION
-            { ?optique a onto:Centre_Tri_Optique }
-            UNION
-            { ?magnetique a onto:Centre_Tri_Magnetique }
-            UNION
-            { ?densite a onto:Centre_Tri_Densite }
-            UNION
-            { ?mixte a onto:Centre_Tri_Mixte }
-            UNION
-            { 
-                ?center onto:statutOperationnel ?statut .
-                FILTER(?statut = "en_service")
-            }
-        }
-        """
-        sparql.setQuery(query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        return {"status": "success", "data": results}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    return (yield select(sorting_centers_statistics_query()))
+
+SEARCH_SORTING_CENTERS_QUERY = register("search_sorting_centers", """
+SELECT ?center ?id ?nomCentre ?type ?typeCentre ?statutOperationnel WHERE {
+    ?center a onto:Centre_tri .
+    ?center onto:idCentre ?id .
+    ?center onto:nomCentre ?nomCentre .
+    OPTIONAL { ?center onto:typeCentre ?typeCentre }
+    OPTIONAL { ?center onto:statutOperationnel ?statutOperationnel }
 
+    FILTER(REGEX(LCASE(STR(?nomCentre)), LCASE({{search_term}})) || 
+           REGEX(LCASE(STR(?typeCentre)), LCASE({{search_term}})))
+
+    # Récupérer le type spécifique
+    OPTIONAL {
+        ?center a ?type .
+        FILTER(?type != onto:Centre_tri)
+        FILTER(STRSTARTS(STR(?type), STR(onto:)))
+    }
+}
+ORDER BY ?nomCentre
+LIMIT 50
+""", search_term="string")
+
+def search_sorting_centers_query(search_term):
+    """Construit la requête SPARQL de search_sorting_centers"""
+    return SEARCH_SORTING_CENTERS_QUERY.bind(search_term=search_term)
+
+@fuseki_operation
 def search_sorting_centers(search_term):
     """Recherche de centres de tri par terme"""
-    try:
-        sparql = SPARQLWrapper(FUSEKI_URL + "/query")
-        query = f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        PREFIX onto: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-        
-        SELECT ?center ?id ?nomCentre ?type ?typeCentre ?statutOperationnel WHERE {{
-            ?center a onto:Centre_tri .
-            ?center onto:idCentre ?id .
-            ?center onto:nomCentre ?nomCentre .
-            OPTIONAL {{ ?center onto:typeCentre ?typeCentre }}
-            OPTIONAL {{ ?center onto:statutOperationnel ?statutOperationnel }}
-            
-            FILTER(REGEX(LCASE(STR(?nomCentre)), LCASE("{search_term}")) || 
-                   REGEX(LCASE(STR(?typeCentre)), LCASE("{search_term}")))
-            
-            # Récupérer le type spécifique
-            OPTIONAL {{
-                ?center a ?type .
-                FILTER(?type != onto:Centre_tri)
-                FILTER(STRSTARTS(STR(?type), STR(onto:)))
-            }}
-        }}
-        ORDER BY ?nomCentre
-        LIMIT 50
-        """
-        sparql.setQuery(query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        return {"status": "success", "data": results}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    return (yield select(search_sorting_centers_query(search_term)))
+
+CENTER_DETAILS_QUERY = register("center_details", """
+SELECT ?property ?value WHERE {
+    {{center_uri}} ?property ?value .
+    FILTER(STRSTARTS(STR(?property), STR(onto:)))
+}
+ORDER BY ?property
+""", center_uri="iri")
 
+def center_details_query(center_uri):
+    """Construit la requête SPARQL de get_center_details"""
+    return CENTER_DETAILS_QUERY.bind(center_uri=center_uri)
+
+@fuseki_operation
+@template_errors
 def get_center_details(center_uri):
     """Récupère les détails complets d'un centre de tri spécifique"""
-    try:
-        sparql = SPARQLWrapper(FUSEKI_URL + "/query")
-        query = f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        PREFIX onto: <http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#>
-        
-        SELECT ?property ?value WHERE {{
-            <{center_uri}> ?property ?value .
-            FILTER(STRSTARTS(STR(?property), STR(onto:)))
-        }}
-        ORDER BY ?property
-        """
-        sparql.setQuery(query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        return {"status": "success", "data": results}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    return (yield select(center_details_query(center_uri)))
+
+def centre_tri_triples(centre_id, type_centre, nom, localisation, capacite, debit_tri, taux_purete, statut):
+    """Triplets d'un nouveau centre de tri"""
+    subject = onto_name(centre_id)
+    return [
+        f"{subject} a {onto_name(type_centre)}",
+        f"{subject} onto:nom {literal(nom)}",
+        f"{subject} onto:localisation {literal(localisation)}",
+        f"{subject} onto:capacite_journaliere {decimal(capacite)}",
+        f"{subject} onto:debit_tri_heure {decimal(debit_tri)}",
+        f"{subject} onto:taux_purete_sortie {decimal(taux_purete)}",
+        f"{subject} onto:statut_actif {boolean(statut)}",
+    ]
+
+def centre_compostage_triples(centre_id, type_centre, nom, localisation, capacite, temperature, temps_compostage, statut):
+    """Triplets d'un nouveau centre de compostage"""
+    subject = onto_name(centre_id)
+    return [
+        f"{subject} a {onto_name(type_centre)}",
+        f"{subject} onto:nom {literal(nom)}",
+        f"{subject} onto:localisation {literal(localisation)}",
+        f"{subject} onto:capacite_journaliere {decimal(capacite)}",
+        f"{subject} onto:temperature_moyenne {decimal(temperature)}",
+        f"{subject} onto:temps_compostage_jours {integer(temps_compostage)}",
+        f"{subject} onto:statut_actif {boolean(statut)}",
+    ]
+
+# Champs attendus (format JSON des vues ajouter-tri / ajouter-compostage) par catégorie de centre
+CENTER_FIELDS = {
+    "tri": (centre_tri_triples, ("id", "type_centre", "nom", "localisation", "capacite", "debit_tri", "taux_purete", "statut")),
+    "compostage": (centre_compostage_triples, ("id", "type_centre", "nom", "localisation", "capacite", "temperature", "temps_compostage", "statut")),
+}
+
+def bulk_create_centers(centers):
+    """
+    Crée plusieurs centres (tri ou compostage) en regroupant leurs triplets dans quelques requêtes INSERT DATA.
+    Chaque centre porte "categorie" ("tri" ou "compostage") et les champs des vues d'ajout unitaires.
+    """
+    batcher = WriteBatcher()
+    for index, center in enumerate(centers):
+        if not isinstance(center, dict):
+            batcher.fail(index, "Objet JSON attendu")
+            continue
+        item_id = center.get("id", index)
+        if center.get("categorie") not in CENTER_FIELDS:
+            batcher.fail(item_id, f"Catégorie invalide. Catégories valides: {', '.join(CENTER_FIELDS)}")
+            continue
+        build, fields = CENTER_FIELDS[center["categorie"]]
+        missing = [field for field in fields if center.get(field) in (None, "")]
+        if missing:
+            batcher.fail(item_id, f"Champs requis manquants: {', '.join(missing)}")
+            continue
+        try:
+            triples = build(*(center[field] for field in fields))
+        except ValueError as e:
+            batcher.fail(item_id, str(e))
+            continue
+        batcher.add(item_id, triples,
+                    uri=f"http://www.semanticweb.org/wiemb/ontologies/2025/8/untitled-ontology-2#{center['id']}")
+    return summarize(batcher.flush(), batcher.requests)
+
+# Requêtes des vues tri & compostage (backend_app/tri&compostage/views.py)
+CENTRES_TRI_QUERY = register("centres_tri", """
+SELECT ?centre ?nom ?type ?localisation ?capacite ?statut ?debit_tri ?taux_purete WHERE {
+    ?centre rdf:type ?centreType .
+    ?centreType rdfs:subClassOf* onto:Centre_tri .
+
+    ?centre onto:nom ?nom .
+    OPTIONAL { ?centre onto:localisation ?localisation }
+    OPTIONAL { ?centre onto:capacite_journaliere ?capacite }
+    OPTIONAL { ?centre onto:statut_actif ?statut }
+    OPTIONAL { ?centre onto:debit_tri_heure ?debit_tri }
+    OPTIONAL { ?centre onto:taux_purete_sortie ?taux_purete }
+
+    BIND(STRAFTER(STR(?centreType), "#") AS ?type)
+}
+ORDER BY ?nom
+""")
+
+CENTRES_COMPOSTAGE_QUERY = register("centres_compostage", """
+SELECT ?centre ?nom ?type ?localisation ?temperature ?temps_compostage ?statut WHERE {
+    ?centre rdf:type ?centreType .
+    ?centreType rdfs:subClassOf* onto:Centre_compostage .
+
+    ?centre onto:nom ?nom .
+    OPTIONAL { ?centre onto:localisation ?localisation }
+    OPTIONAL { ?centre onto:temperature_moyenne ?temperature }
+    OPTIONAL { ?centre onto:temps_compostage_jours ?temps_compostage }
+    OPTIONAL { ?centre onto:statut_actif ?statut }
+
+    BIND(STRAFTER(STR(?centreType), "#") AS ?type)
+}
+ORDER BY ?nom
+""")
+
+DECHETS_TRIES_QUERY = register("dechets_tries", """
+SELECT ?dechet ?type_dechet ?quantite WHERE {
+    ?centre onto:nom {{centre_nom}} ;
+            onto:trie ?dechet .
+    ?dechet onto:nom ?type_dechet ;
+            onto:quantite ?quantite .
+}
+""", centre_nom="string")
+
+DECHETS_COMPOSTABLES_QUERY = register("dechets_compostables", """
+SELECT ?dechet ?type_dechet ?quantite WHERE {
+    ?centre onto:nom {{centre_nom}} ;
+            onto:traite_par_compostage ?dechet .
+    ?dechet onto:nom ?type_dechet ;
+            onto:quantite ?quantite .
+}
+""", centre_nom="string")
+
+STATISTIQUES_TRI_QUERY = register("statistiques_tri", """
+SELECT ?type_dechet (SUM(?quantite) as ?total_quantite) WHERE {
+    ?centre rdf:type ?centreType ;
+            onto:trie ?dechet .
+    ?centreType rdfs:subClassOf* onto:Centre_tri .
+    ?dechet onto:nom ?type_dechet ;
+            onto:quantite ?quantite .
+}
+GROUP BY ?type_dechet
+ORDER BY DESC(?total_quantite)
+""")
+
+STATISTIQUES_COMPOSTAGE_QUERY = register("statistiques_compostage", """
+SELECT ?centre ?nom (SUM(?quantite) as ?total_traite) WHERE {
+    ?centre rdf:type ?centreType ;
+            onto:nom ?nom ;
+            onto:traite_par_compostage ?dechet .
+    ?centreType rdfs:subClassOf* onto:Centre_compostage .
+    ?dechet onto:quantite ?quantite .
+}
+GROUP BY ?centre ?nom
+ORDER BY DESC(?total_traite)
+""")
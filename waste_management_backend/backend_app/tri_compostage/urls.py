@@ -1,5 +1,10 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+
+if settings.ASYNC_VIEWS:
+    from . import async_views as views
+else:
+    from . import views
 
 urlpatterns = [
     path('centers/', views.GetAllSortingCentersView.as_view(), name='get_all_sorting_centers'),
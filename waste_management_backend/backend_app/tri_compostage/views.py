@@ -1,6 +1,9 @@
 from django.http import JsonResponse
-from django.views import View
+from backend_app.common.formats import sparql_response
+from backend_app.common.fuseki_views import FusekiView
+from backend_app.common.streaming import streaming_select
 from backend_app.tri_compostage.center_queries import (
+    all_sorting_centers_query,
     get_all_sorting_centers,
     get_sorting_centers_by_type,
     get_center_wastes,
@@ -9,19 +12,22 @@ from backend_app.tri_compostage.center_queries import (
     get_center_details,
 )
 
-class GetAllSortingCentersView(View):
+class GetAllSortingCentersView(FusekiView):
     def get(self, request):
         """Récupère tous les centres de tri"""
-        result = get_all_sorting_centers()
-        return JsonResponse(result)
+        stream_format = request.GET.get('stream')
+        if stream_format:
+            return (yield streaming_select(all_sorting_centers_query(), stream_format))
+        result = yield from get_all_sorting_centers.steps()
+        return sparql_response(request, result)
 
-class GetSortingCentersByTypeView(View):
+class GetSortingCentersByTypeView(FusekiView):
     def get(self, request, center_type):
         """Récupère les centres de tri par type"""
-        result = get_sorting_centers_by_type(center_type)
-        return JsonResponse(result)
+        result = yield from get_sorting_centers_by_type.steps(center_type)
+        return sparql_response(request, result)
 
-class GetCenterWastesView(View):
+class GetCenterWastesView(FusekiView):
     def get(self, request):
         """Récupère les déchets triés par un centre de tri spécifique"""
         
@@ -32,16 +38,16 @@ class GetCenterWastesView(View):
                 "message": "Le paramètre 'center_uri' est requis"
             }, status=400)
         
-        result = get_center_wastes(center_uri)
-        return JsonResponse(result)
+        result = yield from get_center_wastes.steps(center_uri)
+        return sparql_response(request, result)
 
-class GetSortingCentersStatisticsView(View):
+class GetSortingCentersStatisticsView(FusekiView):
     def get(self, request):
         """Récupère les statistiques des centres de tri"""
-        result = get_sorting_centers_statistics()
-        return JsonResponse(result)
+        result = yield from get_sorting_centers_statistics.steps()
+        return sparql_response(request, result)
 
-class SearchSortingCentersView(View):
+class SearchSortingCentersView(FusekiView):
     def get(self, request):
         """Recherche de centres de tri par terme"""
         
@@ -52,10 +58,10 @@ class SearchSortingCentersView(View):
                 "message": "Le paramètre de recherche 'q' est requis"
             }, status=400)
         
-        result = search_sorting_centers(search_term)
-        return JsonResponse(result)
+        result = yield from search_sorting_centers.steps(search_term)
+        return sparql_response(request, result)
 
-class GetCenterDetailsView(View):
+class GetCenterDetailsView(FusekiView):
     def get(self, request):
         """Récupère les détails complets d'un centre de tri spécifique"""
         
@@ -66,5 +72,5 @@ class GetCenterDetailsView(View):
                 "message": "Le paramètre 'center_uri' est requis"
             }, status=400)
         
-        result = get_center_details(center_uri)
-        return JsonResponse(result)
+        result = yield from get_center_details.steps(center_uri)
+        return sparql_response(request, result)
@@ -1,8 +1,11 @@
 from django.urls import path ,include
-from .views import query_view,sparql_query_view
+from .views import query_view,sparql_query_view,metrics_view,batch_view,nl_batch_view
 
 urlpatterns = [
     path("nlp_query/", query_view, name="nlp_query"),
+    path("nlp_query/batch/", nl_batch_view, name="nlp_query_batch"),
     path("sparql/", sparql_query_view, name="sparql_query"),
+    path("metrics/", metrics_view, name="metrics"),
+    path("batch/", batch_view, name="batch"),
     path('tri-compostage/', include('backend_app.tri&compostage.urls')),
 ]
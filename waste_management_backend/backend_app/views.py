@@ -1,37 +1,96 @@
+from django.conf import settings
 from django.shortcuts import render
 
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 import json
+import logging
 import re
+import time
 from backend_app.common.sparql_utils import fuseki_client
-from backend_app.common.ai_parser import extract_entities,generate_sparql_from_entities
+from backend_app.common.batch import BatchError, run_batch, run_question_batch
+from backend_app.common.lexicon import class_lexicon
+from backend_app.common.formats import sparql_response, to_columnar, wants_columnar
+from backend_app.common.streaming import sse_select_response, streaming_select_response
+from backend_app.common.ai_parser import generate_sparql_from_entities
+from backend_app.common import nlp_client
+from backend_app.common.nlp_client import extract_entities_versioned, wait_until_ready
+from backend_app.common.nlp_models import ModelNotReady
+from backend_app.common.pagination import CursorError, page_size, run_page
+from backend_app.common.timing import stage, timing_histograms
+from backend_app.common.translation_cache import translation_cache
+from backend_app.common.vocabulary import class_hierarchy, dynamic_attributes
+
+logger = logging.getLogger(__name__)
 
 @csrf_exempt
 def query_view(request):
     """
     Handle user question, extract entities, generate SPARQL, and return results.
+    Results come one page at a time: {"page_size": 100, "cursor": "<page.next_cursor>", "count": true}.
+    "stream": "sse" (or Accept: text/event-stream) sends a "query" event with the entities and SPARQL as soon
+    as the question is parsed, then the rows as Fuseki delivers them; GET ?question=...&stream=sse works with EventSource.
     """
-    if request.method == "POST":
+    wants_sse = request.GET.get("stream") == "sse" or "text/event-stream" in request.headers.get("Accept", "")
+    if request.method == "POST" or (request.method == "GET" and wants_sse):
         try:
-            data = json.loads(request.body)
+            data = json.loads(request.body) if request.method == "POST" else request.GET.dict()
             question = data.get("question", "")
-            print("DEBUG question text:", question)
+            logger.debug("question text: %s", question)
             if not question:
                 return JsonResponse({"status": "error", "message": "Question is required"}, status=400)
 
-            entities = extract_entities(question)
-            sparql_query = generate_sparql_from_entities(entities)
-            print("DEBUG entities:", entities)
-            print("DEBUG generated SPARQL:\n", sparql_query)
-            results = fuseki_client.execute_query(sparql_query)
+            # Questions already translated skip the NLP pipeline (and the model wait)
+            with stage("translation_cache"):
+                cached = translation_cache.get(question)
+            if cached is not None:
+                entities, sparql_query = cached
+            else:
+                # Models load in the background at startup; other endpoints do not wait for them.
+                # With NLP_SERVER_URL, the server answers 503 (or cannot be reached) while extracting
+                try:
+                    with stage("nlp_wait"):
+                        wait_until_ready()
+                    with stage("extract"):
+                        [entities], version = extract_entities_versioned([question])
+                except ModelNotReady as e:
+                    response = JsonResponse({"status": "error", "message": str(e)}, status=503)
+                    response["Retry-After"] = "5"
+                    return response
 
-            return JsonResponse(results)
+                with stage("generate"):
+                    sparql_query = generate_sparql_from_entities(entities)
+                if version is not None:
+                    with stage("translation_cache"):
+                        translation_cache.put(question, entities, sparql_query, version)
+            logger.debug("entities: %s", entities)
+            logger.debug("generated SPARQL:\n%s", sparql_query)
+            stream_format = data.get("stream") or request.GET.get("stream") or ("sse" if wants_sse else None)
+            if stream_format == "sse":
+                # Fuseki is queried while the response streams, after the "query" event
+                return sse_select_response(sparql_query, [("query", {
+                    "question": question, "entities": entities, "sparql": sparql_query, "cached": cached is not None,
+                })])
+            if stream_format:
+                # Only up to the first rows: the rest is sent after the view returns, outside any stage
+                with stage("stream_setup"):
+                    return streaming_select_response(sparql_query, stream_format)
+            # One page at a time (cursor from the previous page's "next_cursor"), total only on request
+            size = page_size(data.get("page_size") or request.GET.get("page_size"))
+            cursor = data.get("cursor") or request.GET.get("cursor")
+            count = str(data.get("count") or request.GET.get("count", "")).lower() in ("1", "true")
+            with stage("fuseki"):
+                results = run_page(fuseki_client, sparql_query, size, cursor, count)
 
+            with stage("encode"):
+                return sparql_response(request, results)
+
+        except CursorError as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
         except Exception as e:
             return JsonResponse({"status": "error", "message": str(e)}, status=500)
     else:
-        return JsonResponse({"status": "error", "message": "Only POST method allowed"}, status=405)
+        return JsonResponse({"status": "error", "message": "Only POST method allowed (or GET with stream=sse)"}, status=405)
 
 @csrf_exempt
 def sparql_query_view(request):
@@ -41,7 +100,6 @@ def sparql_query_view(request):
     if request.method == "POST":
         try:
             data = json.loads(request.body)
-            print(data)
             sparql_query = data.get("sparql", "")
             if not sparql_query:
                 return JsonResponse({"status": "error", "message": "SPARQL query is required"}, status=400)
@@ -62,11 +120,103 @@ def sparql_query_view(request):
                 )
                 sparql_query = prefixes + s
 
-            print("DEBUG received SPARQL query (possibly normalized):\n", sparql_query)
-            results = fuseki_client.execute_query(sparql_query)
-            return JsonResponse(results)
+            logger.debug("received SPARQL query (possibly normalized):\n%s", sparql_query)
+            # Optional "stream": "ndjson" | "json" sends rows as Fuseki produces them
+            stream_format = data.get("stream") or request.GET.get("stream")
+            if stream_format:
+                with stage("stream_setup"):
+                    return streaming_select_response(sparql_query, stream_format)
+            with stage("fuseki"):
+                results = fuseki_client.execute_query(sparql_query)
+            with stage("encode"):
+                return sparql_response(request, results)
+
+        except Exception as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=500)
+    else:
+        return JsonResponse({"status": "error", "message": "Only POST method allowed"}, status=405)
+
+@csrf_exempt
+def batch_view(request):
+    """
+    Run several named read operations concurrently and return one combined response.
+    Body: {"operations": [{"id": "stats", "op": "get_producers_statistics", "params": {}}, ...]}
+    """
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+            start = time.perf_counter()
+            results = run_batch(data.get("operations"))
+            if wants_columnar(request):
+                results = {operation_id: to_columnar(result) for operation_id, result in results.items()}
+            return JsonResponse({
+                "status": "success",
+                "results": results,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            })
 
+        except (json.JSONDecodeError, BatchError) as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
         except Exception as e:
             return JsonResponse({"status": "error", "message": str(e)}, status=500)
     else:
-        return JsonResponse({"status": "error", "message": "Only POST method allowed"}, status=405)
\ No newline at end of file
+        return JsonResponse({"status": "error", "message": "Only POST method allowed"}, status=405)
+
+@csrf_exempt
+def nl_batch_view(request):
+    """
+    Translate and run many natural-language questions in one request.
+    Body: {"questions": ["...", ...], "execute": true, "page_size": 100}. Identical SPARQL queries run once;
+    each result (first page, see query_view) is keyed by its question. "execute": false only returns entities and SPARQL.
+    """
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+            start = time.perf_counter()
+            transform = to_columnar if wants_columnar(request) else None
+            results, distinct_queries = run_question_batch(data.get("questions"), data.get("execute", True), transform,
+                                                           page_size(data.get("page_size")))
+            return JsonResponse({
+                "status": "success",
+                "results": results,
+                "questions": len(results),
+                "distinct_queries": distinct_queries,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            })
+
+        except ModelNotReady as e:
+            response = JsonResponse({"status": "error", "message": str(e)}, status=503)
+            response["Retry-After"] = "5"
+            return response
+        except (json.JSONDecodeError, BatchError, CursorError) as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
+        except Exception as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=500)
+    else:
+        return JsonResponse({"status": "error", "message": "Only POST method allowed"}, status=405)
+
+def metrics_allowed(request):
+    """Active staff users, or clients whose address is listed in settings.METRICS_ALLOWED_IPS"""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_active and user.is_staff:
+        return True
+    return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+def metrics_view(request):
+    """
+    Expose internal counters (Fuseki connection pool, ...) as JSON, to staff users and METRICS_ALLOWED_IPS only.
+    "timing" holds per-view, per-stage latency histograms (same stages as the Server-Timing header).
+    Nothing here reads Fuseki: snapshots report their last loaded value.
+    """
+    if not metrics_allowed(request):
+        return JsonResponse({"status": "error", "message": "Forbidden"}, status=403)
+    if request.method == "GET":
+        return JsonResponse({"fuseki": fuseki_client.stats(), "nlp": nlp_client.stats(),
+                             "vocabulary": {"dynamic_attributes": dynamic_attributes.stats(),
+                                            "class_hierarchy": class_hierarchy.stats(),
+                                            "class_lexicon": {**class_lexicon.stats(),
+                                                              "lexicon": class_lexicon.get().stats()}},
+                             "translation_cache": translation_cache.stats(),
+                             "timing": timing_histograms.stats()})
+    else:
+        return JsonResponse({"status": "error", "message": "Only GET method allowed"}, status=405)
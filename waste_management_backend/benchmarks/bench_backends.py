@@ -0,0 +1,107 @@
+"""
+Compare la latence des requêtes de lecture de l'API sur les deux backends SPARQL :
+Fuseki (HTTP, SPARQL_ENDPOINT) et le store embarqué (rdflib dans le processus).
+
+    python benchmarks/bench_backends.py --data ontologie.ttl
+    python benchmarks/bench_backends.py            # embarqué = copie du dataset Fuseki
+
+Sans --data, le store embarqué est rempli avec un CONSTRUCT de tout le dataset Fuseki,
+les deux backends répondent donc sur les mêmes triplets. Le cache de résultats est désactivé
+pour mesurer le backend lui-même. Une ligne JSON par requête et par backend.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "waste_management_backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rdflib import Graph  # noqa: E402
+
+from backend_app.common.embedded_store import AsyncEmbeddedTransport, EmbeddedTransport, load_graph  # noqa: E402
+from backend_app.common.query_cache import QueryCache  # noqa: E402
+from backend_app.common.sparql_utils import FusekiClient, all_classes_query  # noqa: E402
+from backend_app.production import producer_queries  # noqa: E402
+from backend_app.supervision import supervisor_queries  # noqa: E402
+from backend_app.tri_compostage import center_queries  # noqa: E402
+
+QUERIES = {
+    "all_classes": all_classes_query,
+    "all_producers": producer_queries.all_producers_query,
+    "producers_by_type": lambda: producer_queries.producers_by_type_query("industriel"),
+    "producers_statistics": producer_queries.producers_statistics_query,
+    "search_producers": lambda: producer_queries.search_producers_query("usine"),
+    "producers_by_city": lambda: producer_queries.producers_by_city_query("Tunis"),
+    "producers_with_waste_stats": producer_queries.producers_with_waste_stats_query,
+    "producer_types": producer_queries.producer_types_query,
+    "all_supervisors": supervisor_queries.all_supervisors_query,
+    "supervisors_statistics": supervisor_queries.supervisors_statistics_query,
+    "search_supervisors": lambda: supervisor_queries.search_supervisors_query("ali"),
+    "all_sorting_centers": center_queries.all_sorting_centers_query,
+    "sorting_centers_statistics": center_queries.sorting_centers_statistics_query,
+    "search_sorting_centers": lambda: center_queries.search_sorting_centers_query("centre"),
+}
+
+SNAPSHOT_QUERY = "CONSTRUCT { ?s ?p ?o } WHERE { ?s ?p ?o }"
+
+
+def fuseki_snapshot(client):
+    """Copie du dataset Fuseki (graphe par défaut) dans un graphe en mémoire"""
+    response = client.transport.post(client.query_endpoint, {"query": SNAPSHOT_QUERY},
+                                     accept="application/n-triples")
+    graph = Graph(store="Memory")
+    graph.parse(data=response.text, format="nt")
+    return graph
+
+
+def measure(client, sparql_query, repeat):
+    timings = []
+    rows = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = client.execute_query(sparql_query)
+        timings.append(time.perf_counter() - start)
+        if result["status"] != "success":
+            return {"error": result["message"][:200]}
+        rows = len(result["data"].get("results", {}).get("bindings", []))
+    return {
+        "rows": rows,
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", action="append", help="fichier RDF à charger dans le store embarqué")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", choices=["fuseki", "embedded"])
+    args = parser.parse_args()
+
+    no_cache = QueryCache(max_bytes=0)
+    backends = {}
+    if args.only != "embedded":
+        backends["fuseki"] = FusekiClient(cache=no_cache, backend="fuseki")
+    if args.only != "fuseki":
+        start = time.perf_counter()
+        graph = load_graph(args.data) if args.data else fuseki_snapshot(FusekiClient(backend="fuseki"))
+        transport = EmbeddedTransport(graph)
+        backends["embedded"] = FusekiClient(transport, AsyncEmbeddedTransport(transport), cache=no_cache)
+        print(json.dumps({"embedded_triples": len(graph),
+                          "load_ms": round((time.perf_counter() - start) * 1000, 2)}))
+
+    for name, build in QUERIES.items():
+        sparql_query = build()
+        for backend, client in backends.items():
+            print(json.dumps({"query": name, "backend": backend, **measure(client, sparql_query, args.repeat)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Mesure le démarrage à froid d'un worker : chaque mesure est faite dans un nouveau processus.
+
+    python benchmarks/bench_cold_start.py
+    python benchmarks/bench_cold_start.py --runs 5 --question "liste des producteurs"
+
+- import : django.setup() et import des URL (ce que paient manage.py et chaque worker)
+- first_api : démarrage du serveur (wsgi.py) puis première réponse d'une API sans NLP
+- first_nlp : première réponse de /api/nlp_query/ (attend la fin du chargement des modèles)
+Temps en secondes depuis le lancement du processus, mémoire = RSS maximale (Mo).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, os, resource, sys, time
+start = time.perf_counter()
+sys.path.insert(0, %(backend_dir)r)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "waste_management_backend.settings")
+result = {}
+
+def mark(name):
+    result[name] = round(time.perf_counter() - start, 3)
+    result[name + "_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+
+if %(stage)r == "import":
+    import django
+    django.setup()
+    import backend_app.urls  # noqa: F401
+    mark("import")
+else:
+    from django.conf import settings
+    from django.test import Client
+    import waste_management_backend.wsgi  # noqa: F401
+    settings.ALLOWED_HOSTS.append("testserver")
+    client = Client()
+    client.get("/api/metrics/")
+    mark("first_api")
+    response = client.post("/api/nlp_query/", data=json.dumps({"question": %(question)r}),
+                           content_type="application/json")
+    mark("first_nlp")
+    result["nlp_status"] = response.status_code
+print("RESULT " + json.dumps(result))
+"""
+
+
+def run(stage, question):
+    code = PROBE % {"backend_dir": BACKEND_DIR, "stage": stage, "question": question}
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True)
+    for line in output.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(output.stderr[-2000:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--question", default="liste des producteurs industriels")
+    args = parser.parse_args()
+
+    for stage in ("import", "server"):
+        runs = [run(stage, args.question) for _ in range(args.runs)]
+        summary = {"stage": stage}
+        for key in runs[0]:
+            values = [r[key] for r in runs]
+            summary[key] = statistics.median(values) if key != "nlp_status" else values[-1]
+        print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
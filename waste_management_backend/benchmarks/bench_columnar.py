@@ -0,0 +1,92 @@
+"""
+Mesure la taille et le temps de sérialisation du format colonnes (?format=columnar)
+par rapport au SPARQL JSON brut, sur get_all_producers et get_all_supervisors.
+
+    python benchmarks/bench_columnar.py --scale 1 --scale 1000
+
+--scale N duplique les lignes renvoyées par Fuseki (URI renumérotées) pour simuler
+une base N fois plus grande. Le temps "columnar" inclut la conversion.
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "waste_management_backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.serializers.json import DjangoJSONEncoder  # noqa: E402
+
+from backend_app.common.formats import to_columnar  # noqa: E402
+from backend_app.production.producer_queries import get_all_producers  # noqa: E402
+from backend_app.supervision.supervisor_queries import get_all_supervisors  # noqa: E402
+
+ENDPOINTS = {
+    "get_all_producers": get_all_producers,
+    "get_all_supervisors": get_all_supervisors,
+}
+
+
+def scaled(result, factor):
+    """Copie du résultat dont les lignes sont répétées `factor` fois"""
+    if factor <= 1:
+        return result
+    result = copy.deepcopy(result)
+    bindings = result["data"]["results"]["bindings"]
+    rows = []
+    for n in range(factor):
+        for row in bindings:
+            row = copy.deepcopy(row)
+            for cell in row.values():
+                if cell["type"] == "uri" and "#" in cell["value"] and n:
+                    cell["value"] = f"{cell['value']}_{n}"
+            rows.append(row)
+    result["data"]["results"]["bindings"] = rows
+    return result
+
+
+def best_of(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, action="append", dest="scales")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, function in ENDPOINTS.items():
+        base = function()
+        if base["status"] != "success":
+            print(json.dumps({"endpoint": name, "error": base["message"]}))
+            continue
+        for factor in args.scales or [1, 100]:
+            result = scaled(base, factor)
+            raw_time, raw = best_of(lambda: json.dumps(result, cls=DjangoJSONEncoder), args.repeat)
+            columnar_time, columnar = best_of(
+                lambda: json.dumps(to_columnar(result), cls=DjangoJSONEncoder), args.repeat)
+            print(json.dumps({
+                "endpoint": name,
+                "rows": len(result["data"]["results"]["bindings"]),
+                "raw_bytes": len(raw.encode()),
+                "columnar_bytes": len(columnar.encode()),
+                "bytes_reduction": round(1 - len(columnar) / len(raw), 3),
+                "raw_ms": round(raw_time * 1000, 2),
+                "columnar_ms": round(columnar_time * 1000, 2),
+                "time_reduction": round(1 - columnar_time / raw_time, 3),
+            }))
+
+
+if __name__ == "__main__":
+    main()
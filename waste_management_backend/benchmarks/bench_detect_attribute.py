@@ -0,0 +1,77 @@
+"""
+Latence de l'analyse des questions de test du bloc __main__ de ai_parser.py.
+
+    python benchmarks/bench_detect_attribute.py
+    python benchmarks/bench_detect_attribute.py --repeat 2000 --target extract_entities
+
+Cibles : detect_attribute, detect_relation, extract_entities (une question à la fois) et extract_entities_batch
+(tout le corpus en un appel, tokenisé par nlp.pipe).
+Affiche une ligne JSON : temps médian par question et temps total du corpus (microsecondes).
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "waste_management_backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from backend_app.common import ai_parser  # noqa: E402
+
+
+def main_corpus():
+    """Liste `tests` du bloc if __name__ == "__main__" de ai_parser.py"""
+    with open(ai_parser.__file__, encoding="utf-8") as source:
+        tree = ast.parse(source.read())
+    for node in tree.body:
+        if isinstance(node, ast.If) and "__main__" in ast.dump(node.test):
+            for statement in node.body:
+                if isinstance(statement, ast.Assign) and statement.targets[0].id == "tests":
+                    return ast.literal_eval(statement.value)
+    raise RuntimeError("Corpus de test introuvable dans ai_parser.py")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--target", default="detect_attribute",
+                        choices=["detect_attribute", "detect_relation", "extract_entities", "extract_entities_batch"])
+    args = parser.parse_args()
+
+    corpus = main_corpus()
+    # Chargement des modèles hors mesure
+    ai_parser.extract_entities_batch(corpus)
+    per_question = []
+    totals = []
+    for _ in range(args.repeat):
+        start_corpus = time.perf_counter()
+        if args.target == "extract_entities_batch":
+            ai_parser.extract_entities_batch(corpus)
+            per_question.append((time.perf_counter() - start_corpus) / len(corpus))
+        else:
+            function = getattr(ai_parser, args.target)
+            for question in corpus:
+                start = time.perf_counter()
+                function(question)
+                per_question.append(time.perf_counter() - start)
+        totals.append(time.perf_counter() - start_corpus)
+    print(json.dumps({
+        "target": args.target,
+        "questions": len(corpus),
+        "repeat": args.repeat,
+        "median_us_per_question": round(statistics.median(per_question) * 1e6, 2),
+        "p95_us_per_question": round(sorted(per_question)[int(len(per_question) * 0.95)] * 1e6, 2),
+        "median_us_per_corpus": round(statistics.median(totals) * 1e6, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
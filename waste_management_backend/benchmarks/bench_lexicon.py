@@ -0,0 +1,79 @@
+"""
+Compilation du lexique des classes (common/lexicon.py) en PhraseMatcher spaCy, pour le lexique actuel
+et des lexiques synthétiques plusieurs fois plus grands.
+
+    python benchmarks/bench_lexicon.py --scales 1,5,10,20 --repeat 50
+
+Le lexique de taille N reprend class_lexicon.json et lui ajoute N-1 copies de chaque classe dont les
+mots-clés prolongent les vrais ("centre de tri v3") : mêmes premiers tokens, donc autant de débuts de
+correspondance à suivre dans les questions. Chaque mot-clé est aussi répété avec une autre casse
+(doublons à éliminer). Une ligne JSON par taille : expressions, motifs, doublons retirés, temps de
+compilation, mémoire Python allouée par la compilation (Ko, tracemalloc) et latence du PhraseMatcher
+sur le corpus de test (µs/question).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_parser_stages import CORPUS_PATH, percentiles  # noqa: E402
+
+from backend_app.common.lexicon import Lexicon, read_lexicon_file  # noqa: E402
+from backend_app.common.nlp_models import models  # noqa: E402
+
+
+def scaled_lexicon(scale):
+    classes, keywords = read_lexicon_file()
+    table = {cls: texts + [text.upper() for text in texts] for cls, texts in keywords.items()}
+    for copy in range(1, scale):
+        for cls, texts in keywords.items():
+            table[f"{cls}_v{copy}"] = [f"{text} v{copy}" for text in texts]
+    return Lexicon(classes + list(table), table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,5,10,20")
+    parser.add_argument("--repeat", type=int, default=50, help="passages du corpus par taille")
+    args = parser.parse_args()
+
+    nlp = models.get("spacy")
+    with open(CORPUS_PATH, encoding="utf-8") as source:
+        docs = [nlp.make_doc(entry["question"]) for entry in json.load(source)["questions"]]
+
+    for scale in (int(value) for value in args.scales.split(",")):
+        lexicon = scaled_lexicon(scale)
+        matcher = lexicon.matcher(nlp)
+        # Mémoire mesurée sur une seconde compilation : tracemalloc fausserait le temps
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        scaled_lexicon(scale).matcher(nlp)
+        allocated = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        durations = []
+        for _ in range(args.repeat):
+            for doc in docs:
+                start = time.perf_counter()
+                matcher(doc)
+                durations.append(time.perf_counter() - start)
+        stats = lexicon.stats()
+        print(json.dumps({
+            "scale": scale,
+            "classes": stats["classes"],
+            "phrases": stats["phrases"],
+            "duplicates_dropped": stats["duplicates_dropped"],
+            "patterns": stats["patterns"],
+            "build_seconds": stats["build_seconds"],
+            "allocated_kb": allocated // 1024,
+            "match_p50_us": percentiles(durations)["p50_us"],
+            "match_p99_us": percentiles(durations)["p99_us"],
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compare les workers web qui chargent leurs propres modèles (local) et ceux qui passent par le serveur NLP
+(python manage.py runnlpserver, démarré par le script sur une socket Unix temporaire).
+
+    python benchmarks/bench_nlp_server.py --workers 4 --threads 8 --seconds 10
+
+Chaque worker web est un processus qui analyse en boucle les questions de test de ai_parser.py
+depuis --threads threads (cache de traductions non utilisé), comme sous une charge /api/nlp_query/.
+Affiche, par mode : mémoire maximale (RSS, Mo) par worker et du serveur NLP, questions analysées par seconde.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_detect_attribute import BACKEND_DIR, main_corpus  # noqa: E402
+
+PROBE = r"""
+import json, os, resource, sys, threading, time
+sys.path.insert(0, %(backend_dir)r)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "waste_management_backend.settings")
+import django
+django.setup()
+from backend_app.common import nlp_client
+
+questions = %(questions)r
+nlp_client.wait_until_ready()
+nlp_client.extract_entities_batch(questions)
+counts = []
+end = time.monotonic() + %(seconds)r
+
+def load(offset):
+    count = 0
+    while time.monotonic() < end:
+        nlp_client.extract_entities(questions[(offset + count) %% len(questions)])
+        count += 1
+    counts.append(count)
+
+threads = [threading.Thread(target=load, args=(i,)) for i in range(%(threads)r)]
+start = time.monotonic()
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print("RESULT " + json.dumps({
+    "questions_per_s": round(sum(counts) / (time.monotonic() - start), 1),
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+}))
+"""
+
+
+def run_workers(args, questions, env):
+    code = PROBE % {"backend_dir": BACKEND_DIR, "questions": questions,
+                    "seconds": args.seconds, "threads": args.threads}
+    processes = [subprocess.Popen([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                 for _ in range(args.workers)]
+    results = []
+    for process in processes:
+        stdout, stderr = process.communicate()
+        lines = [line for line in stdout.splitlines() if line.startswith("RESULT ")]
+        if not lines:
+            raise RuntimeError(stderr[-2000:])
+        results.append(json.loads(lines[-1][len("RESULT "):]))
+    return {
+        "workers": args.workers,
+        "threads_per_worker": args.threads,
+        "questions_per_s": round(sum(r["questions_per_s"] for r in results), 1),
+        "worker_max_rss_mb": max(r["max_rss_mb"] for r in results),
+    }
+
+
+def start_server(socket_path, processes):
+    server = subprocess.Popen([sys.executable, "manage.py", "runnlpserver", "--bind", f"unix:{socket_path}",
+                               "--workers", str(processes)], cwd=BACKEND_DIR,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    client = httpx.Client(transport=httpx.HTTPTransport(uds=socket_path), base_url="http://nlp-server")
+    for _ in range(600):
+        try:
+            client.get("/health")
+            return server, client
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("Le serveur NLP ne répond pas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="processus web simulés")
+    parser.add_argument("--threads", type=int, default=8, help="requêtes concurrentes par processus web")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--server-workers", type=int, default=1, help="processus du serveur NLP")
+    args = parser.parse_args()
+    questions = main_corpus()
+
+    env = {key: value for key, value in os.environ.items() if key != "NLP_SERVER_URL"}
+    env["TRANSLATION_CACHE_SIZE"] = "0"
+    print(json.dumps({"mode": "local", **run_workers(args, questions, env)}))
+
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "nlp.sock")
+        server, client = start_server(socket_path, args.server_workers)
+        try:
+            result = run_workers(args, questions, {**env, "NLP_SERVER_URL": f"unix:{socket_path}"})
+            health = client.get("/health").json()
+            print(json.dumps({"mode": "server", **result, "server_workers": args.server_workers,
+                              "server_max_rss_mb": health["max_rss_mb"],
+                              "mean_batch": health["batches"]["extract"]["mean_batch"]}))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
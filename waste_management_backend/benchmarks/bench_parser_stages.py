@@ -0,0 +1,228 @@
+"""
+Latence par étape de la traduction question → SPARQL, sur le corpus versionné benchmarks/corpus/parser_questions.json.
+
+    python benchmarks/bench_parser_stages.py --repeat 200
+    python benchmarks/bench_parser_stages.py --compare benchmarks/results/parser_stages-20260101T120000Z.json
+    python benchmarks/bench_parser_stages.py --update-golden
+
+Étapes : tokenization (make_doc), matcher (Matcher spaCy), detect_attribute, detect_relation,
+extract_entities (extraction complète, Doc déjà tokenisé) et generate_sparql_from_entities.
+Les entités et le SPARQL de chaque question sont d'abord comparés aux sorties de référence du corpus
+(--update-golden les réenregistre après un changement voulu de l'analyseur).
+
+Le résultat (p50/p95/p99 par étape en microsecondes, environnement, écarts) est écrit en JSON dans
+benchmarks/results/ ; --compare affiche le rapport avec un résultat précédent. Code de sortie 1 si une
+sortie diffère de la référence ou si une étape est plus lente que --threshold fois la précédente.
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_detect_attribute import BACKEND_DIR  # noqa: E402
+
+import spacy  # noqa: E402
+
+from backend_app.common import ai_parser  # noqa: E402
+from backend_app.common.lexicon import class_lexicon  # noqa: E402
+from backend_app.common.nlp_models import NLP_SENTENCE_MODEL, models  # noqa: E402
+from backend_app.common.translation_cache import lexicon_version  # noqa: E402
+from backend_app.common.vocabulary import class_hierarchy, dynamic_attributes  # noqa: E402
+
+CORPUS_PATH = os.path.join(BACKEND_DIR, "benchmarks", "corpus", "parser_questions.json")
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+STAGES = ["tokenization", "matcher", "detect_attribute", "detect_relation", "extract_entities",
+          "generate_sparql_from_entities"]
+
+
+def load_vocabulary():
+    """Attributs, lexique et hiérarchie lus dans Fuseki, comme sur le serveur (valeurs de secours si Fuseki est absent)"""
+    for snapshot in (dynamic_attributes, class_lexicon, class_hierarchy):
+        snapshot.refresh()
+        snapshot.wait()
+
+
+def environment():
+    """Ce dont dépendent les sorties de référence : règles, lexique des classes, vocabulaire Fuseki et modèle de phrases"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "lexicon_version": lexicon_version(),
+        "generator_version": ai_parser.generator_version(),
+        "class_lexicon": class_lexicon.get().fingerprint,
+        "dynamic_attributes": sorted(dynamic_attributes.get()),
+        "sentence_model": NLP_SENTENCE_MODEL if ai_parser.NLP_SEMANTIC_FALLBACK else None,
+        "python": platform.python_version(),
+        "spacy": spacy.__version__,
+        "commit": commit,
+    }
+
+
+def translate(question):
+    entities = ai_parser.extract_entities(question)
+    return entities, ai_parser.generate_sparql_from_entities(entities)
+
+
+def check_golden(corpus):
+    """Écarts entre les sorties actuelles et celles enregistrées dans le corpus"""
+    mismatches = []
+    for entry in corpus["questions"]:
+        entities, sparql = translate(entry["question"])
+        if "entities" not in entry:
+            mismatches.append({"question": entry["question"], "field": "golden", "expected": None, "actual": None})
+            continue
+        for field, actual in (("entities", entities), ("sparql", sparql)):
+            if actual != entry[field]:
+                mismatches.append({"question": entry["question"], "field": field,
+                                   "expected": entry[field], "actual": actual})
+    return mismatches
+
+
+def update_golden(corpus, path):
+    for entry in corpus["questions"]:
+        entry["entities"], entry["sparql"] = translate(entry["question"])
+    corpus["environment"] = environment()
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(corpus, output, ensure_ascii=False, indent=2)
+        output.write("\n")
+
+
+def measure_stages(questions, repeat):
+    """Durées (secondes) de chaque étape, une mesure par question et par répétition"""
+    matcher = class_lexicon.get().matcher(models.get("spacy"))
+    samples = {stage: [] for stage in STAGES}
+    clock = time.perf_counter
+    for _ in range(repeat):
+        for question in questions:
+            start = clock()
+            doc = ai_parser.parse_question(question)
+            tokenized = clock()
+            matcher(doc)
+            matched = clock()
+            ai_parser.detect_attribute(question)
+            attributes = clock()
+            ai_parser.detect_relation(question)
+            relation = clock()
+            entities = ai_parser.extract_entities(question, doc)
+            extracted = clock()
+            ai_parser.generate_sparql_from_entities(entities)
+            generated = clock()
+            for stage, duration in zip(STAGES, (tokenized - start, matched - tokenized, attributes - matched,
+                                                relation - attributes, extracted - relation, generated - extracted)):
+                samples[stage].append(duration)
+    return samples
+
+
+def percentiles(durations):
+    durations = sorted(durations)
+
+    def rank(fraction):
+        return round(durations[min(len(durations) - 1, int(len(durations) * fraction))] * 1e6, 2)
+
+    return {"p50_us": rank(0.50), "p95_us": rank(0.95), "p99_us": rank(0.99),
+            "mean_us": round(sum(durations) / len(durations) * 1e6, 2), "samples": len(durations)}
+
+
+def compare(current, previous, threshold):
+    """Rapport actuel / précédent par étape et percentile ; liste des étapes ralenties au-delà de `threshold`"""
+    regressions = []
+    for stage in STAGES:
+        before = previous["stages"].get(stage)
+        if before is None:
+            continue
+        ratios = {key: round(current["stages"][stage][key] / before[key], 3) if before[key] else None
+                  for key in ("p50_us", "p95_us", "p99_us")}
+        print(json.dumps({"stage": stage, "ratio": ratios}))
+        if ratios["p50_us"] and ratios["p50_us"] > threshold:
+            regressions.append(stage)
+    return regressions
+
+
+def latest_result():
+    """Dernier résultat écrit dans benchmarks/results/ (comparaison par défaut)"""
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    names = sorted(name for name in os.listdir(RESULTS_DIR) if name.startswith("parser_stages-"))
+    return os.path.join(RESULTS_DIR, names[-1]) if names else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--output", help="fichier JSON du résultat (défaut : benchmarks/results/parser_stages-<date>.json)")
+    parser.add_argument("--compare", help="résultat précédent (défaut : le dernier de benchmarks/results/)")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ralentissement du p50 signalé comme régression")
+    parser.add_argument("--update-golden", action="store_true", help="réenregistre les sorties de référence du corpus")
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as source:
+        corpus = json.load(source)
+    # Modèles et vocabulaire chargés hors mesure
+    ai_parser.wait_until_ready()
+    load_vocabulary()
+
+    if args.update_golden:
+        update_golden(corpus, args.corpus)
+        print(f"Sorties de référence enregistrées pour {len(corpus['questions'])} questions dans {args.corpus}")
+        return
+
+    current_environment = environment()
+    recorded = corpus.get("environment", {})
+    changed = sorted(key for key in ("lexicon_version", "generator_version", "class_lexicon", "dynamic_attributes",
+                                     "sentence_model")
+                     if recorded.get(key) != current_environment[key])
+    mismatches = check_golden(corpus)
+    for mismatch in mismatches:
+        print(json.dumps({"mismatch": mismatch}, ensure_ascii=False))
+    if mismatches and changed:
+        print(f"Environnement différent de celui des sorties de référence ({', '.join(changed)})", file=sys.stderr)
+
+    questions = [entry["question"] for entry in corpus["questions"]]
+    samples = measure_stages(questions, args.repeat)
+    with open(args.corpus, "rb") as source:
+        corpus_digest = hashlib.sha256(source.read()).hexdigest()[:16]
+    result = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "corpus": {"path": os.path.relpath(args.corpus, BACKEND_DIR), "version": corpus.get("version"),
+                   "questions": len(questions), "sha256": corpus_digest},
+        "repeat": args.repeat,
+        "environment": current_environment,
+        "golden": {"checked": len(questions), "mismatches": len(mismatches), "environment_changes": changed},
+        "stages": {stage: percentiles(durations) for stage, durations in samples.items()},
+    }
+    for stage in STAGES:
+        print(json.dumps({"stage": stage, **result["stages"][stage]}))
+
+    previous_path = args.compare or latest_result()
+    regressions = []
+    if previous_path:
+        with open(previous_path, encoding="utf-8") as source:
+            previous = json.load(source)
+        if previous.get("corpus", {}).get("sha256") != corpus_digest:
+            print(f"{previous_path} : corpus différent, comparaison indicative", file=sys.stderr)
+        print(f"Comparaison avec {previous_path}")
+        regressions = compare(result, previous, args.threshold)
+        result["compared_with"] = os.path.relpath(previous_path, BACKEND_DIR)
+        result["regressions"] = regressions
+
+    output = args.output or os.path.join(RESULTS_DIR, f"parser_stages-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as destination:
+        json.dump(result, destination, ensure_ascii=False, indent=2)
+    print(f"Résultat écrit dans {output}")
+    if mismatches or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
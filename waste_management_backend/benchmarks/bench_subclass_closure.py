@@ -0,0 +1,67 @@
+"""
+Latence Fuseki des requêtes générées pour les questions de test de ai_parser.py :
+chemins rdfs:subClassOf* (avant) et blocs VALUES de la hiérarchie des classes en cache (après).
+
+    python benchmarks/bench_subclass_closure.py --repeat 20
+
+Le cache de résultats est désactivé pour mesurer Fuseki. Une ligne JSON par requête distincte
+(médiane en ms pour chaque forme), puis une ligne de synthèse.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_backends import measure  # noqa: E402
+from bench_detect_attribute import main_corpus  # noqa: E402
+
+from backend_app.common import ai_parser  # noqa: E402
+from backend_app.common.query_cache import QueryCache  # noqa: E402
+from backend_app.common.sparql_utils import FusekiClient  # noqa: E402
+from backend_app.common.vocabulary import class_hierarchy  # noqa: E402
+
+
+def generate(entities, subclass_values):
+    ai_parser.NLP_SUBCLASS_VALUES = subclass_values
+    return ai_parser.generate_sparql_from_entities(entities)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    class_hierarchy.refresh()
+    class_hierarchy.wait()
+    if not class_hierarchy.loaded:
+        sys.exit(f"Hiérarchie des classes illisible: {class_hierarchy.stats()['error']}")
+
+    client = FusekiClient(cache=QueryCache(max_bytes=0), backend="fuseki")
+    queries = {}
+    for question in main_corpus():
+        entities = ai_parser.extract_entities(question)
+        path_query = generate(entities, False)
+        if "rdfs:subClassOf*" in path_query:
+            queries.setdefault(path_query, (question, generate(entities, True)))
+
+    totals = {"path": [], "values": []}
+    for path_query, (question, values_query) in queries.items():
+        line = {"question": question}
+        for form, sparql_query in (("path", path_query), ("values", values_query)):
+            line[form] = measure(client, sparql_query, args.repeat)
+            totals[form].append(line[form].get("median_ms", 0.0))
+        line["same_rows"] = line["path"].get("rows") == line["values"].get("rows")
+        print(json.dumps(line, ensure_ascii=False))
+    print(json.dumps({
+        "queries": len(queries),
+        "classes": len(class_hierarchy.get()),
+        **{f"{form}_total_median_ms": round(sum(values), 2) for form, values in totals.items()},
+        **{f"{form}_median_ms": round(statistics.median(values), 2) if values else None for form, values in totals.items()},
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare le débit (requêtes/s) et la latence du backend servi en WSGI (vues sync)
+et en ASGI (vues async), à 50 et 500 clients simultanés.
+
+Lancer le serveur à mesurer dans un autre terminal, par exemple :
+
+    # WSGI, vues sync
+    gunicorn waste_management_backend.wsgi -w 4 --threads 8 -b 127.0.0.1:8000
+
+    # ASGI, vues async
+    ASYNC_VIEWS=true uvicorn waste_management_backend.asgi:application --workers 4 --port 8001
+
+puis :
+
+    python benchmarks/bench_wsgi_vs_asgi.py --url http://127.0.0.1:8000 --label wsgi
+    python benchmarks/bench_wsgi_vs_asgi.py --url http://127.0.0.1:8001 --label asgi
+
+Chaque exécution affiche une ligne JSON par niveau de concurrence.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/production/producers/",
+    "/api/production/producers/types/",
+    "/api/production/producers/statistics/",
+    "/api/supervision/supervisors/",
+    "/api/supervision/supervisors/statistics/",
+]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def run_level(base_url, paths, concurrency, duration):
+    """Lance `concurrency` clients pendant `duration` secondes et agrège les mesures"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker(offset):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                path = paths[i % len(paths)]
+                i += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--label", default="server")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--path", action="append", dest="paths")
+    args = parser.parse_args()
+
+    paths = args.paths or DEFAULT_PATHS
+    for concurrency in args.concurrency:
+        result = asyncio.run(run_level(args.url, paths, concurrency, args.duration))
+        result["label"] = args.label
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -75,6 +77,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    "backend_app.common.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -103,6 +106,29 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "waste_management_backend.wsgi.application"
+ASGI_APPLICATION = "waste_management_backend.asgi.application"
+
+# Vues async (production, supervision, tri_compostage) : à activer lorsque le serveur
+# tourne sous ASGI (uvicorn/daphne), sinon Django les exécute dans une boucle par requête
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "false").lower() == "true"
+
+# Adresses autorisées à lire /api/metrics/ sans session staff, séparées par des virgules (vide : staff uniquement).
+# Derrière un reverse proxy local toutes les requêtes viennent de 127.0.0.1 : ne lister que l'adresse du collecteur
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get("METRICS_ALLOWED_IPS", "").split(",") if ip.strip()]
+
+# "fuseki" : jeton d'invalidation du cache de résultats, lu par tous les workers (common/query_cache.py).
+# Fichiers locaux par défaut ; un cache réseau (Redis, Memcached) si les workers tournent sur plusieurs machines
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "fuseki": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("FUSEKI_CACHE_SHARED_LOCATION",
+                                   os.path.join(tempfile.gettempdir(), "waste_management_fuseki_cache")),
+        "TIMEOUT": None,
+    },
+}
 
 
 # Database
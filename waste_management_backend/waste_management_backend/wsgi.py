@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "waste_management_backend.settings")
 
 application = get_wsgi_application()
+
+# Load the NLP models in background threads (or use the NLP server, NLP_SERVER_URL): requests are served while they load
+from backend_app.common.nlp_client import warm_up  # noqa: E402
+
+warm_up()